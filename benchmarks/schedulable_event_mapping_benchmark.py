@@ -0,0 +1,123 @@
+"""
+Benchmark for loading persisted scheduled events at startup, comparing the event_id registry of
+EventDistributor.map_to_schedulable_event with the previous linear scan over all registered event types.
+Run from the repository root with: PYTHONPATH=src python benchmarks/schedulable_event_mapping_benchmark.py
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Union
+
+from core_modules.eventing.BaseEvent import BaseEvent
+from core_modules.eventing.EventDistributor import EventDistributor
+from core_modules.eventing.EventReceiver import EventReceiver
+from core_modules.scheduling.EventScheduler import EventScheduler
+from core_modules.scheduling.SchedulableEvent import SchedulableEvent
+from core_modules.scheduling.ScheduledEvent import ScheduledEvent
+from core_modules.scheduling.SchedulerJournal import SchedulerJournal
+from core_modules.scheduling.EventRepeatPolicy import EventRepeatPolicy
+from core_modules.storage.StorageManager import StorageManager
+from feature_modules.calendar import CalendarEvents
+from feature_modules.hue_integration import HueEvents
+from feature_modules.hue_integration.HueEvents import HueLampSetStateEvent
+from feature_modules.spotify_integration import SpotifyEvents
+from feature_modules.weather import WeatherEvents
+
+EVENT_MODULES = [CalendarEvents, HueEvents, SpotifyEvents, WeatherEvents]
+
+
+class BenchmarkReceiver(EventReceiver):
+    """
+    Receiver registered for all events of the feature modules, so the distributor knows the same event types as LIS.
+    """
+
+    async def handle_specific_event(self, event: BaseEvent):
+        pass
+
+    def fetch_events_to_register(self) -> list[type[BaseEvent]]:
+        return [member for module in EVENT_MODULES for member in vars(module).values()
+                if isinstance(member, type) and issubclass(member, BaseEvent) and member.__module__ == module.__name__]
+
+
+def map_by_linear_scan(event_distributor: EventDistributor, event_dict: dict) -> Union[SchedulableEvent | None]:
+    """
+    The previous implementation of map_to_schedulable_event trying every registered schedulable event type.
+    """
+    for event in event_distributor.get_registered_events():
+        if issubclass(event, SchedulableEvent):
+            try:
+                return event.from_api_json(event_dict)
+            except (KeyError, ValueError):
+                continue
+    return None
+
+
+def create_schedulable_events() -> list[SchedulableEvent]:
+    """
+    Creates one instance of every schedulable event of the feature modules.
+    """
+    schedulable_events = [HueLampSetStateEvent("1", True)]
+    for event_type in BenchmarkReceiver().fetch_events_to_register():
+        if issubclass(event_type, SchedulableEvent) and event_type is not HueLampSetStateEvent:
+            schedulable_events.append(event_type())
+    return schedulable_events
+
+
+def write_journal(path: str, event_count: int):
+    """
+    Writes a journal containing event_count persistent events cycling through all schedulable event types.
+    """
+    schedulable_events = create_schedulable_events()
+    exec_time = datetime.now() + timedelta(days=1)
+    journal = SchedulerJournal(path)
+    journal.put_all({str(i): ScheduledEvent(exec_time + timedelta(seconds=i),
+                                            schedulable_events[i % len(schedulable_events)], True,
+                                            EventRepeatPolicy.Daily, 1, str(i)).to_obj_rep()
+                     for i in range(event_count)})
+    journal.close()
+
+
+async def benchmark(event_count: int, rounds: int):
+    # the scheduler logs every loaded event which would dominate the measurement
+    EventScheduler.log.setLevel(logging.WARNING)
+    event_distributor = EventDistributor()
+    event_distributor.register_event_receivers([BenchmarkReceiver()])
+    mapping_funcs = {"linear scan": lambda event_dict: map_by_linear_scan(event_distributor, event_dict),
+                     "event_id registry": event_distributor.map_to_schedulable_event}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        journal_path = os.path.join(tmp_dir, "scheduler_journal.jsonl")
+        write_journal(journal_path, event_count)
+        journal = SchedulerJournal(journal_path)
+        event_dicts = [json.loads(entry["event"]) for entry in journal.get_entries().values()]
+        journal.close()
+        print(f"{len(event_distributor.get_registered_events())} registered event types, {event_count} events")
+        for name, mapping_func in mapping_funcs.items():
+            map_times = []
+            load_times = []
+            for _ in range(rounds):
+                start = time.perf_counter()
+                for event_dict in event_dicts:
+                    mapping_func(event_dict)
+                map_times.append(time.perf_counter() - start)
+
+                scheduler = EventScheduler(StorageManager(os.path.join(tmp_dir, "lis_data.toml")),
+                                           event_distributor.put_internal, SchedulerJournal(journal_path))
+                start = time.perf_counter()
+                scheduler.load_persistent_events(mapping_func)
+                load_times.append(time.perf_counter() - start)
+                scheduler.journal.close()
+            print(f"{name:>17}: mapping {min(map_times) * 1000:8.2f}ms, "
+                  f"load_persistent_events {min(load_times) * 1000:8.2f}ms (best of {rounds})")
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser()
+    argument_parser.add_argument("-n", "--events", type=int, default=10000, help="The number of persisted events")
+    argument_parser.add_argument("-r", "--rounds", type=int, default=5, help="The number of rounds per variant")
+    args = argument_parser.parse_args()
+    asyncio.run(benchmark(args.events, args.rounds))
@@ -0,0 +1,125 @@
+"""
+Benchmark for the REST latency while storage is persisting heavily, comparing mutations of the StorageManager running
+on the event loop with mutations running on the worker thread of the AsyncStorageManager.
+Run from the repository root with: PYTHONPATH=src python benchmarks/storage_latency_benchmark.py
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import tomli_w
+
+from core_modules.rest.PingApi import PingApi
+from core_modules.rest.RestServer import RestServer
+from core_modules.scheduling.EventRepeatPolicy import EventRepeatPolicy
+from core_modules.scheduling.ScheduledEvent import ScheduledEvent
+from core_modules.storage.AsyncStorageManager import AsyncStorageManager
+from core_modules.storage.SqliteStorageBackend import SqliteStorageBackend
+from core_modules.storage.StorageManager import StorageManager
+from feature_modules.hue_integration.HueEvents import HueLampSetStateEvent
+
+BENCHMARK_PORT = 5099
+PING_URL = f"http://127.0.0.1:{BENCHMARK_PORT}/v1/ping"
+PING_INTERVAL_IN_SECONDS = 0.005
+WRITE_INTERVAL_IN_SECONDS = 0.005
+
+
+def write_data_file(path: str, event_count: int):
+    """
+    Writes a lis_data.toml containing event_count scheduled events, as stored by the scheduler in the storage.
+    """
+    exec_time = datetime.now() + timedelta(days=1)
+    scheduled_events = [ScheduledEvent(exec_time + timedelta(seconds=i), HueLampSetStateEvent(str(i), True), True,
+                                       EventRepeatPolicy.Daily, 1, str(i)).to_obj_rep() for i in range(event_count)]
+    # toml can not represent the unset repeat_rule
+    scheduled_events = [{key: value for key, value in scheduled_event.items() if value is not None}
+                        for scheduled_event in scheduled_events]
+    with open(path, "wb") as f:
+        tomli_w.dump({"SCHEDULING": {"SCHEDULED_EVENTS": scheduled_events}, "SPOTIFY": {"ACCESS_TOKEN": ""}}, f)
+
+
+async def persist_heavily(storage: StorageManager | AsyncStorageManager, stop: asyncio.Event) -> int:
+    """
+    Updates the storage every WRITE_INTERVAL_IN_SECONDS until stop is set.
+    :return: The number of updates.
+    """
+    update_count = 0
+    while not stop.is_set():
+        result = storage.update(f"token-{update_count}", "ACCESS_TOKEN", "SPOTIFY")
+        if asyncio.iscoroutine(result):
+            await result
+        update_count += 1
+        await asyncio.sleep(WRITE_INTERVAL_IN_SECONDS)
+    return update_count
+
+
+def measure_ping_latencies(request_count: int) -> list[float]:
+    """
+    Sends request_count sequential requests to the ping endpoint. Runs in a separate process, so the measurement is
+    not delayed by a blocked event loop of the server itself.
+    :return: The latencies of the requests in seconds.
+    """
+    latencies = []
+    for _ in range(request_count):
+        start = time.perf_counter()
+        with urllib.request.urlopen(PING_URL) as response:
+            response.read()
+        latencies.append(time.perf_counter() - start)
+        time.sleep(PING_INTERVAL_IN_SECONDS)
+    return latencies
+
+
+def get_percentile(sorted_values: list[float], percentile: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * percentile / 100))]
+
+
+async def benchmark(event_count: int, request_count: int):
+    # every request and storage update is logged which would dominate the measurement
+    logging.disable(logging.INFO)
+    rest_server = RestServer(lambda event: None)
+    rest_server.register_apis([PingApi()])
+    rest_server.start_server("127.0.0.1", BENCHMARK_PORT)
+    with tempfile.TemporaryDirectory() as tmp_dir, ProcessPoolExecutor(max_workers=1) as client_executor:
+        data_file_path = os.path.join(tmp_dir, "lis_data.toml")
+        write_data_file(data_file_path, event_count)
+        print(f"lis_data.toml with {event_count} scheduled events ({os.path.getsize(data_file_path) // 1024} KiB), "
+              f"{request_count} requests")
+        variants = {
+            "StorageManager (toml)": lambda: StorageManager(data_file_path, write_behind_delay_in_seconds=0),
+            "AsyncStorageManager (toml)": lambda: AsyncStorageManager(
+                StorageManager(data_file_path, write_behind_delay_in_seconds=0)),
+            "AsyncStorageManager (sqlite)": lambda: AsyncStorageManager(
+                StorageManager(data_file_path, runtime_backend=SqliteStorageBackend(
+                    os.path.join(tmp_dir, "lis_runtime_data.sqlite3"))))
+        }
+        for name, create_storage in [("idle", None), *variants.items()]:
+            stop = asyncio.Event()
+            storage = None if create_storage is None else create_storage()
+            writer = None if storage is None else asyncio.create_task(persist_heavily(storage, stop))
+            latencies = sorted(await asyncio.get_running_loop().run_in_executor(client_executor,
+                                                                                measure_ping_latencies, request_count))
+            stop.set()
+            update_count = 0 if writer is None else await writer
+            if isinstance(storage, AsyncStorageManager):
+                await storage.close()
+            elif storage is not None:
+                storage.close()
+            print(f"{name:>28}: p50 {get_percentile(latencies, 50) * 1000:7.2f}ms, "
+                  f"p99 {get_percentile(latencies, 99) * 1000:7.2f}ms, max {latencies[-1] * 1000:7.2f}ms "
+                  f"({update_count} storage updates)")
+    rest_server.stop_server()
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser()
+    argument_parser.add_argument("-n", "--events", type=int, default=2000,
+                                 help="The number of scheduled events in the storage")
+    argument_parser.add_argument("-r", "--requests", type=int, default=500, help="The number of requests per variant")
+    args = argument_parser.parse_args()
+    asyncio.run(benchmark(args.events, args.requests))
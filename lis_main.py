@@ -3,38 +3,39 @@ Main file for running this LIS-System
 """
 import argparse
 import asyncio
+import signal
 
 from core_modules.eventing.EventDistributor import EventDistributor
+from core_modules.lifecycle.LifecycleManager import get_lifecycle_manager
 from core_modules.logging.lis_logging import get_logger
+from core_modules.rest.MetricsApi import MetricsApi
 from core_modules.rest.PingApi import PingApi
 from core_modules.rest.RestServer import RestServer
 from core_modules.rest.SessionManager import SessionManager
 from core_modules.rest.SysInfoApi import SysInfoApi
 from core_modules.scheduling.EventScheduler import EventScheduler
+from core_modules.scheduling.SchedulerJournal import SchedulerJournal
 from core_modules.scheduling.SchedulingApi import SchedulingApi
+from core_modules.storage.AsyncStorageManager import AsyncStorageManager
+from core_modules.storage.ConfigWatcher import ConfigWatcher
+from core_modules.storage.SqliteStorageBackend import SqliteStorageBackend
 from core_modules.storage.StorageManager import StorageManager, SECTION_HEADER_SERVER, FIELD_SERVER_IP, \
     FIELD_SERVER_PORT
 from feature_modules.calendar.CalendarApi import CalendarApi
 from feature_modules.calendar.CalendarInteractor import CalendarInteractor
 from feature_modules.hue_integration.HueApi import HueApi
+from feature_modules.hue_integration.HueConfig import HueConfig
 from feature_modules.hue_integration.HueInteractor import HueInteractor
 from feature_modules.spotify_integration.SpotifyApi import SpotifyApi
+from feature_modules.spotify_integration.SpotifyConfig import SpotifyConfig
 from feature_modules.spotify_integration.SpotifyInteractor import SpotifyInteractor
 from feature_modules.weather.WeatherApi import WeatherApi
+from feature_modules.weather.WeatherConfig import WeatherConfig
 from feature_modules.weather.WeatherInteractor import WeatherInteractor
 
 log = get_logger("lis_main")
 
 
-async def never_ending_function():
-    """
-    Never ending function that keeps the main thread and event loop running.
-    """
-    log.info("Starting infinite async loop...")
-    while True:
-        await asyncio.sleep(10)
-
-
 async def main():
     """
     Main Coroutine that gets run on the event loop.
@@ -45,39 +46,67 @@ async def main():
 
     args = argument_parser.parse_args()
 
-    storage = StorageManager(args.config + "/lis_data.toml")
+    lifecycle_manager = get_lifecycle_manager()
+    loop = asyncio.get_running_loop()
+    for shutdown_signal in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(shutdown_signal, lifecycle_manager.request_shutdown)
+
+    storage = StorageManager(args.config + "/lis_data.toml",
+                             runtime_backend=SqliteStorageBackend(args.config + "/lis_runtime_data.sqlite3"))
+    try:
+        # validate the configuration at boot instead of failing on the first request using it
+        for config_type in (HueConfig, SpotifyConfig, WeatherConfig):
+            storage.get_section(config_type)
+    except ValueError as e:
+        log.error("Invalid configuration: " + str(e))
+        exit(-1)
+
+    async_storage = AsyncStorageManager(storage)
 
     session_manager = SessionManager()
+    lifecycle_manager.register_shutdown_hook(session_manager.close)
 
     event_distributor = EventDistributor()
 
-    event_scheduler = EventScheduler(storage, event_distributor.put_internal)
+    # the journal writes on the storage worker, so it has to be closed before the worker is stopped
+    scheduler_journal = SchedulerJournal(args.config + "/scheduler_journal.jsonl", async_storage.submit_io)
+    lifecycle_manager.register_shutdown_hook(scheduler_journal.close)
+    lifecycle_manager.register_shutdown_hook(async_storage.close)
+
+    event_scheduler = EventScheduler(storage, event_distributor.put_internal, scheduler_journal)
 
     event_distributor.register_event_receivers([
         event_scheduler,
         HueInteractor(event_distributor.put_internal, storage, session_manager),
-        SpotifyInteractor(event_distributor.put_internal, storage, session_manager),
+        SpotifyInteractor(event_distributor.put_internal, event_distributor.request, async_storage,
+                          session_manager),
         WeatherInteractor(event_distributor.put_internal, storage, session_manager),
         CalendarInteractor(event_distributor.put_internal, storage, session_manager)
     ])
 
     event_scheduler.load_persistent_events(event_distributor.map_to_schedulable_event)
 
+    ConfigWatcher(async_storage, event_distributor.put_internal)
+
     rest_server = RestServer(event_distributor.put_internal)
     rest_server.register_apis([
         PingApi(),
         SysInfoApi(),
-        HueApi(event_distributor.put_internal),
-        SpotifyApi(event_distributor.put_internal),
-        WeatherApi(event_distributor.put_internal),
-        CalendarApi(event_distributor.put_internal),
-        SchedulingApi(event_distributor.put_internal, event_distributor.map_to_schedulable_event)
+        MetricsApi({"event_bus": event_distributor.get_metrics, "scheduler": event_scheduler.get_scheduler_metrics}),
+        HueApi(event_distributor.put_internal, event_distributor.request),
+        SpotifyApi(event_distributor.put_internal, event_distributor.request),
+        WeatherApi(event_distributor.put_internal, event_distributor.request),
+        CalendarApi(event_distributor.put_internal, event_distributor.request),
+        SchedulingApi(event_distributor.put_internal, event_distributor.request,
+                      event_distributor.map_to_schedulable_event)
     ])
     rest_server.start_server(storage.get(FIELD_SERVER_IP, section=SECTION_HEADER_SERVER, fallback="127.0.0.1"),
                              storage.get(FIELD_SERVER_PORT, section=SECTION_HEADER_SERVER, fallback=5000))
 
-    await never_ending_function()
-    # never reached!
+    log.info("LIS is running - waiting for shutdown signal...")
+    await lifecycle_manager.wait_for_shutdown_request()
+    rest_server.stop_server()
+    await lifecycle_manager.shutdown()
 
 
 if __name__ == "__main__":
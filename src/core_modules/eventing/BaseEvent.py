@@ -1,5 +1,16 @@
+from typing import Optional
+
+from core_modules.eventing.EventPriority import EventPriority
+
+
 class BaseEvent:
     """
     Base class every event needs to extend to be distributable via the EventDistributor
     """
-    ...
+
+    # priority class of the event type - queued events of a higher priority are handled first by the EventReceivers
+    priority: EventPriority = EventPriority.Normal
+
+    # set by the EventDistributor when the event is sent via EventDistributor.request to match the response to the
+    # waiting requester. None for fire-and-forget events.
+    correlation_id: Optional[int] = None
@@ -0,0 +1,10 @@
+from core_modules.eventing.BaseEvent import BaseEvent
+
+
+class BatchEvent(BaseEvent):
+    """
+    Base class for events that deliver multiple events of a high-rate producer at once (see EventCoalescer).
+    """
+
+    def __init__(self, events: list[BaseEvent]):
+        self.events = events
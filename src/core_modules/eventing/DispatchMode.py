@@ -0,0 +1,13 @@
+from enum import auto
+
+from core_modules.util.DescriptiveEnum import DescriptiveEnum
+
+
+class DispatchMode(DescriptiveEnum):
+    """
+    Enum containing the ways the EventDistributor can forward an event to multiple receivers.
+    """
+    # forward to one receiver after the other, waiting for each receiver to accept the event
+    Sequential = auto()
+    # forward to all receivers at once, receivers with a full blocking queue get the event as soon as it has room
+    Concurrent = auto()
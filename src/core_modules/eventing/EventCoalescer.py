@@ -0,0 +1,70 @@
+import asyncio
+from typing import Callable, Hashable, Optional
+
+from core_modules.eventing.BaseEvent import BaseEvent
+from core_modules.eventing.BatchEvent import BatchEvent
+from core_modules.lifecycle.LifecycleManager import get_lifecycle_manager
+from core_modules.logging.lis_logging import get_logger
+
+DEFAULT_COALESCING_WINDOW_IN_SECONDS = 0.05
+
+
+class EventCoalescer:
+    """
+    Coalescing stage for high-rate producers. Collects the events arriving within a short window, keeps only the
+    latest event per event type and key and sends the collected events as one BatchEvent to the EventDistributor.
+    Events still collected on shutdown are sent before the event queues are drained.
+    """
+
+    log = get_logger(__name__)
+
+    def __init__(self, put_event: Callable, key_func: Callable[[BaseEvent], Hashable],
+                 batch_event_factory: Callable[[list[BaseEvent]], BatchEvent],
+                 window_in_seconds: float = DEFAULT_COALESCING_WINDOW_IN_SECONDS):
+        """
+        Initializes the EventCoalescer.
+        :param put_event: The callable for sending an Event to the EventDistributor.
+        :param key_func: Returns the key of an event. Of all events with the same type and key arriving within a
+        window only the latest one is delivered.
+        :param batch_event_factory: Creates the BatchEvent delivering the coalesced events.
+        :param window_in_seconds: How long events are collected after the first event arrived.
+        """
+        self.put_event = put_event
+        self._key_func = key_func
+        self._batch_event_factory = batch_event_factory
+        self.window_in_seconds = window_in_seconds
+        self._pending_events: dict[Hashable, BaseEvent] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        # the flush task is a producer task and cancelled first on shutdown
+        get_lifecycle_manager().register_pre_drain_hook(self.flush)
+
+    async def put(self, event: BaseEvent):
+        """
+        Adds an event to the current window, replacing a pending event with the same type and key.
+        :param event: The event to add.
+        """
+        key = (type(event), self._key_func(event))
+        # re-insert so the batch is ordered by the latest update of each key
+        self._pending_events.pop(key, None)
+        self._pending_events[key] = event
+        if self._flush_task is None:
+            self._flush_task = get_lifecycle_manager().create_task(self._flush_after_window())
+
+    async def _flush_after_window(self):
+        """
+        Waits for the window to pass and sends the collected events.
+        """
+        await asyncio.sleep(self.window_in_seconds)
+        self._flush_task = None
+        await self.flush()
+
+    async def flush(self):
+        """
+        Sends all currently collected events as one BatchEvent.
+        """
+        if not self._pending_events:
+            return
+        events = list(self._pending_events.values())
+        self._pending_events = {}
+        self.log.debug(f"Sending batch of {len(events)} coalesced events")
+        await self.put_event(self._batch_event_factory(events))
@@ -1,23 +1,66 @@
-from typing import Union
+import asyncio
+import itertools
+import time
+from collections import Counter, deque
+from typing import Union, Hashable
 
 from core_modules.eventing.BaseEvent import BaseEvent
+from core_modules.eventing.DispatchMode import DispatchMode
 from core_modules.eventing.EventReceiver import EventReceiver
+from core_modules.eventing.ResponseEvent import ResponseEvent
 from core_modules.eventing.SystemEvents import SystemEvent, RegisterTempReceiverEvent, \
     UnregisterTempReceiverEvent
+from core_modules.lifecycle.LifecycleManager import get_lifecycle_manager
 from core_modules.logging.lis_logging import get_logger
-from core_modules.scheduling.SchedulableEvent import SchedulableEvent
+from core_modules.scheduling.SchedulableEvent import SchedulableEvent, EVENT_ID_DATA_FIELD
+from core_modules.util.LatencyHistogram import LatencyHistogram
+
+DEFAULT_REQUEST_TIMEOUT_IN_SECONDS = 10
+# events buffered per receiver with a full queue before the distributor waits for the receiver
+DEFAULT_MAX_PENDING_DELIVERIES = 100
 
 
 class EventDistributor(EventReceiver):
     """
     Central event distribution center. Responsible for registering handler for events and
     distributing the arriving events to all registered handlers.
+    Receivers registered for an event class also receive all events of its subclasses, which allows subscribing to
+    whole event families.
     """
 
     log = get_logger(__name__)
 
-    def __init__(self):
-        self.event_distribution_map = {}
+    def __init__(self, dispatch_mode: DispatchMode = DispatchMode.Concurrent,
+                 max_pending_deliveries: int = DEFAULT_MAX_PENDING_DELIVERIES):
+        """
+        Initializes the EventDistributor.
+        :param dispatch_mode: How events are forwarded to multiple receivers.
+        :param max_pending_deliveries: How many events are buffered for a receiver with a full queue in concurrent
+        mode before the distribution waits for the receiver, so a slow receiver still slows down the producers.
+        """
+        # receivers per event type - dicts are used as insertion ordered sets
+        self.event_distribution_map: dict[type[BaseEvent], dict[EventReceiver, None]] = {}
+        # reverse index of the event types each receiver is registered for
+        self._receiver_subscriptions: dict[EventReceiver, set[type[BaseEvent]]] = {}
+        # receivers per concrete event type including the receivers of its base classes - filled lazily on dispatch
+        # and invalidated whenever the registrations change
+        self._routing_cache: dict[type[BaseEvent], tuple[EventReceiver, ...]] = {}
+        # registered schedulable event types by their event_id for mapping their json representation back to an event
+        self._schedulable_events_by_id: dict[str, type[SchedulableEvent]] = {}
+        self.dispatch_mode = dispatch_mode
+        # events waiting for room in the full queue of a blocking receiver - delivered by one task per receiver, so
+        # the distribution of other events never waits for them
+        self._pending_deliveries: dict[EventReceiver, deque[BaseEvent]] = {}
+        self.max_pending_deliveries = max_pending_deliveries
+        # set whenever a pending delivery was made, to wake up the distribution waiting for room in a pending buffer
+        self._pending_delivery_progress = asyncio.Event()
+        # metrics per event type name
+        self._dispatched_event_counts: Counter[str] = Counter()
+        self._unrouted_event_counts: Counter[str] = Counter()
+        self._enqueue_to_dispatch_histograms: dict[str, LatencyHistogram] = {}
+        self._correlation_ids = itertools.count()
+        self._pending_requests: dict[int, asyncio.Future] = {}
+        self._in_flight_requests: dict[Hashable, asyncio.Future] = {}
         super().__init__()
 
     def get_registered_events(self) -> list[type[BaseEvent]]:
@@ -34,28 +77,115 @@ class EventDistributor(EventReceiver):
         """
         for ev_receiver in event_receivers:
             events = ev_receiver.fetch_events_to_register()
+            subscriptions = self._receiver_subscriptions.setdefault(ev_receiver, set())
             for event in events:
                 self.log.debug("Registering " + ev_receiver.__class__.__name__ + " for event " + str(event))
-                if event in self.event_distribution_map:
-                    self.event_distribution_map[event].append(ev_receiver)
-                else:
-                    self.event_distribution_map[event] = [ev_receiver]
+                self.event_distribution_map.setdefault(event, {})[ev_receiver] = None
+                subscriptions.add(event)
+                if issubclass(event, SchedulableEvent):
+                    self._schedulable_events_by_id[event.get_event_id()] = event
+        self._routing_cache.clear()
 
     def unregister_event_receivers(self, event_receivers: list[EventReceiver]):
         """
         Method to remove a list of event receivers from all events. Mostly used for TemporaryEventReceiver.
+        Only touches the events each receiver is registered for.
         :param event_receivers: The EventReceivers to unregister.
         """
-        modified_events = []
         for event_receiver in event_receivers:
-            for event in self.event_distribution_map:
-                if event_receiver in self.event_distribution_map[event]:
-                    self.log.info("Unregistering " + event_receiver.__class__.__name__ + " for event " + str(event))
-                    self.event_distribution_map[event].remove(event_receiver)
-                    modified_events.append(event)
-        for modified_event in modified_events:
-            if len(self.event_distribution_map[modified_event]) == 0:
-                self.event_distribution_map.pop(modified_event)
+            for event in self._receiver_subscriptions.pop(event_receiver, ()):
+                self.log.info("Unregistering " + event_receiver.__class__.__name__ + " for event " + str(event))
+                receivers = self.event_distribution_map[event]
+                receivers.pop(event_receiver)
+                if not receivers:
+                    self.event_distribution_map.pop(event)
+                    if issubclass(event, SchedulableEvent):
+                        self._schedulable_events_by_id.pop(event.get_event_id(), None)
+        self._routing_cache.clear()
+
+    def _get_receivers_for_event_type(self, event_type: type[BaseEvent]) -> tuple[EventReceiver, ...]:
+        """
+        Gets all receivers an event of the given type is distributed to. These are the receivers registered for the
+        type itself or any of its base classes. The result is cached per event type, so the class hierarchy only needs
+        to be walked once after the registrations changed.
+        :param event_type: The concrete type of the event to distribute.
+        :return: The receivers of the event type, each receiver only once.
+        """
+        receivers = self._routing_cache.get(event_type)
+        if receivers is None:
+            resolved_receivers = {}
+            for event_class in event_type.__mro__:
+                for recv in self.event_distribution_map.get(event_class, ()):
+                    resolved_receivers[recv] = None
+            receivers = tuple(resolved_receivers)
+            self._routing_cache[event_type] = receivers
+        return receivers
+
+    async def put_internal(self, event: BaseEvent):
+        """
+        Overrides the default put_internal to hand response events of pending requests directly to the waiting
+        requester instead of sending them through the event queue. Response events are never distributed to other
+        receivers, so concurrent requests can not receive each other's responses.
+        :param event: The event to distribute.
+        """
+        if isinstance(event, ResponseEvent) and event.correlation_id is not None:
+            response_future = self._pending_requests.pop(event.correlation_id, None)
+            if response_future is None:
+                self.log.warning(f"Dropping response {event} as its request {event.correlation_id} is no longer "
+                                 f"pending")
+            elif not response_future.done():
+                response_future.set_result(event)
+            return
+        await super().put_internal(event)
+
+    @staticmethod
+    def _get_request_key(event: BaseEvent) -> Union[Hashable | None]:
+        """
+        Builds the key identifying identical requests which is made up of the event type and the event attributes.
+        :param event: The request event to build the key for.
+        :return: The key of the request or None if the event carries unhashable attributes and can not be coalesced.
+        """
+        request_key = (type(event), tuple(sorted((name, value) for name, value in vars(event).items()
+                                                 if name != "correlation_id")))
+        try:
+            hash(request_key)
+        except TypeError:
+            return None
+        return request_key
+
+    async def request(self, event: BaseEvent,
+                      timeout_in_seconds: float = DEFAULT_REQUEST_TIMEOUT_IN_SECONDS) -> ResponseEvent:
+        """
+        Distributes the event and waits for the ResponseEvent answering it. The response is matched via the
+        correlation_id that is assigned to the event here, so no TemporaryEventReceiver needs to be registered.
+        If an identical request (same type and attributes) is already in flight, no new event is distributed and the
+        response of the in-flight request is shared instead.
+        :param event: The request event to distribute.
+        :param timeout_in_seconds: How long to wait for the response before giving up.
+        :return: The ResponseEvent sent in response to the event.
+        :raises asyncio.TimeoutError: If no response arrived in time.
+        """
+        request_key = self._get_request_key(event)
+        in_flight_future = self._in_flight_requests.get(request_key) if request_key is not None else None
+        if in_flight_future is not None:
+            self.log.debug(f"Coalescing request {event} with identical in-flight request")
+            return await asyncio.wait_for(asyncio.shield(in_flight_future), timeout_in_seconds)
+
+        event.correlation_id = next(self._correlation_ids)
+        response_future = asyncio.get_running_loop().create_future()
+        self._pending_requests[event.correlation_id] = response_future
+        if request_key is not None:
+            self._in_flight_requests[request_key] = response_future
+        try:
+            await super().put_internal(event)
+            return await asyncio.wait_for(asyncio.shield(response_future), timeout_in_seconds)
+        except asyncio.TimeoutError:
+            self.log.warning(f"Request {event} timed out after {timeout_in_seconds} seconds")
+            raise
+        finally:
+            self._pending_requests.pop(event.correlation_id, None)
+            if request_key is not None and self._in_flight_requests.get(request_key) is response_future:
+                self._in_flight_requests.pop(request_key)
 
     async def _handle_system_event(self, event: SystemEvent):
         """
@@ -69,6 +199,78 @@ class EventDistributor(EventReceiver):
         elif isinstance(event, UnregisterTempReceiverEvent):
             self.unregister_event_receivers([event.event_receiver])
 
+    def get_metrics(self) -> dict:
+        """
+        Collects the metrics of the event bus: dispatch counts and latencies per event type, unrouted events as well
+        as the metrics of the distributor queue and every registered receiver.
+        :return: JSON serializable dict containing the metrics.
+        """
+        event_type_names = self._dispatched_event_counts.keys() | self._unrouted_event_counts.keys()
+        return {"distributor_queue": self.get_queue_metrics(),
+                "event_types": {name: {"dispatched": self._dispatched_event_counts[name],
+                                       "unrouted": self._unrouted_event_counts[name],
+                                       "enqueue_to_dispatch": self._enqueue_to_dispatch_histograms[name].to_dict()
+                                       if name in self._enqueue_to_dispatch_histograms else None}
+                                for name in sorted(event_type_names)},
+                "receivers": [{"receiver": recv.__class__.__name__,
+                               "pending_deliveries": len(self._pending_deliveries.get(recv, ())),
+                               **recv.get_metrics()}
+                              for recv in self._receiver_subscriptions]}
+
+    def is_idle(self) -> bool:
+        """
+        Extends the idle check with the events still waiting to be delivered to receivers with full queues.
+        :return: True if all events were distributed and delivered, False otherwise.
+        """
+        return super().is_idle() and not self._pending_deliveries
+
+    async def _forward_event(self, event: BaseEvent, receivers: tuple[EventReceiver, ...]):
+        """
+        Forwards the event to all passed receivers according to the dispatch_mode. In concurrent mode the event is
+        handed to every receiver with room in its queue right away. Receivers that block on a full queue
+        (QueueFullPolicy.Block) get the event through their pending deliveries instead, so a full receiver does not hold
+        up the event bus for the others until max_pending_deliveries events are waiting for it.
+        :param event: The event to forward.
+        :param receivers: The receivers registered for the event.
+        """
+        if self.dispatch_mode is DispatchMode.Sequential:
+            for recv in receivers:
+                self.log.debug("Forwarding event " + str(event) + " to " + str(recv))
+                await recv.put_internal(event)
+            return
+        for recv in receivers:
+            pending_events = self._pending_deliveries.get(recv)
+            # only receivers with QueueFullPolicy.Block have pending deliveries, as the dropping policies always accept
+            # an event - past the limit their backpressure applies to the whole event bus
+            while pending_events is not None and len(pending_events) >= self.max_pending_deliveries:
+                self.log.debug(str(recv) + " has too many pending deliveries - waiting to add " + str(event))
+                self._pending_delivery_progress.clear()
+                await self._pending_delivery_progress.wait()
+                pending_events = self._pending_deliveries.get(recv)
+            # events queue up behind pending ones, so every receiver still gets its events in order
+            if pending_events is None and recv.offer(event):
+                continue
+            if pending_events is None:
+                self.log.debug(str(recv) + " has a full queue - delivering " + str(event) + " once it has room")
+                pending_events = self._pending_deliveries[recv] = deque()
+                get_lifecycle_manager().create_consumer_task(self._deliver_pending_events(recv, pending_events))
+            pending_events.append(event)
+
+    async def _deliver_pending_events(self, recv: EventReceiver, pending_events: deque[BaseEvent]):
+        """
+        Task delivering the pending events of a receiver with a full queue, waiting for room for each one.
+        :param recv: The receiver to deliver the events to.
+        :param pending_events: The events waiting for the receiver.
+        """
+        try:
+            while pending_events:
+                await recv.put_internal(pending_events[0])
+                pending_events.popleft()
+                self._pending_delivery_progress.set()
+        finally:
+            self._pending_deliveries.pop(recv, None)
+            self._pending_delivery_progress.set()
+
     async def _handle_events_task(self):
         """
         Overrides the default _handle_events_task of the EventReceiver to distribute the events instead of
@@ -77,30 +279,48 @@ class EventDistributor(EventReceiver):
         EventReceiver _handle_events_task
         """
         while True:
-            event = await self._event_queue.get()
-            if isinstance(event, SystemEvent):
-                await self._handle_system_event(event)
-            elif type(event) in self.event_distribution_map:
-                receivers = self.event_distribution_map[type(event)]
-                for recv in receivers:
-                    self.log.debug("Forwarding event " + str(event) + " to " + str(recv))
-                    await recv.put_internal(event)
-            else:
-                self.log.warning("Received event " + str(event) + " but no event receivers were registered")
+            event, enqueued_at = await self._event_queue.get_entry()
+            self._active_event_count += 1
+            try:
+                await self._distribute_event(event, enqueued_at)
+            finally:
+                self._active_event_count -= 1
+
+    async def _distribute_event(self, event: BaseEvent, enqueued_at: float):
+        """
+        Handles SystemEvents and forwards all other events to their receivers.
+        :param event: The event to distribute.
+        :param enqueued_at: The time.monotonic() timestamp the event was added to the queue at.
+        """
+        if isinstance(event, SystemEvent):
+            await self._handle_system_event(event)
+            return
+        event_type_name = type(event).__name__
+        receivers = self._get_receivers_for_event_type(type(event))
+        if receivers:
+            await self._forward_event(event, receivers)
+            self._dispatched_event_counts[event_type_name] += 1
+            if event_type_name not in self._enqueue_to_dispatch_histograms:
+                self._enqueue_to_dispatch_histograms[event_type_name] = LatencyHistogram()
+            self._enqueue_to_dispatch_histograms[event_type_name].record(time.monotonic() - enqueued_at)
+        else:
+            self._unrouted_event_counts[event_type_name] += 1
+            self.log.warning("Received event " + str(event) + " but no event receivers were registered")
 
     def map_to_schedulable_event(self, event_dict: dict) -> Union[SchedulableEvent | None]:
         """
-        Tries to map the event json dict to an event registered with the EventDistributor.
+        Tries to map the event json dict to an event registered with the EventDistributor. The event type is looked up
+        by the event_id of the dict.
         :param event_dict: The dict to map to a known Event.
         :return: The SchedulableEvent the dict was mapped to if it exists, None otherwise
         """
-        for event in self.get_registered_events():
-            if issubclass(event, SchedulableEvent):
-                try:
-                    self.log.debug(f"mapping {event_dict} to {event}")
-                    return event.from_api_json(event_dict)
-                except (KeyError, ValueError):
-                    self.log.debug(f"{event_dict} is not mappable to event {event} - skipping!")
-                    continue
-        self.log.error(f"Event {event_dict} could not be mapped to registered event!")
-        return None
+        event_id = event_dict.get(EVENT_ID_DATA_FIELD) if isinstance(event_dict, dict) else None
+        event = self._schedulable_events_by_id.get(event_id) if isinstance(event_id, str) else None
+        if event is None:
+            self.log.error(f"Event {event_dict} could not be mapped to registered event!")
+            return None
+        try:
+            return event.from_api_json(event_dict)
+        except (KeyError, ValueError):
+            self.log.error(f"Event {event_dict} is not mappable to event {event}!")
+            return None
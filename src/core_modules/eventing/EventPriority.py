@@ -0,0 +1,12 @@
+from enum import IntEnum
+
+
+class EventPriority(IntEnum):
+    """
+    Enum containing the priority classes of events. Queued events with a lower value are handled first.
+    """
+    # user-initiated commands like switching a lamp
+    High = 0
+    Normal = 1
+    # background work like periodic refreshes
+    Low = 2
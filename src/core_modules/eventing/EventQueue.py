@@ -0,0 +1,160 @@
+import asyncio
+import time
+from collections import deque
+
+from core_modules.eventing.BaseEvent import BaseEvent
+from core_modules.eventing.EventPriority import EventPriority
+
+
+class EventQueue:
+    """
+    Bounded asyncio queue for events that hands out events of a higher EventPriority first and events of the same
+    priority in the order they were added. Also keeps track of its high-water mark and when each event was added.
+    Mirrors the interface of asyncio.Queue where applicable.
+    """
+
+    def __init__(self, maxsize: int = 0):
+        """
+        Initializes the EventQueue.
+        :param maxsize: How many events the queue can hold. 0 means unbounded.
+        """
+        self.maxsize = maxsize
+        self.high_water_mark = 0
+        # each level holds (enqueue time, event) entries
+        self._levels: dict[EventPriority, deque[tuple[float, BaseEvent]]] = {priority: deque()
+                                                                              for priority in EventPriority}
+        self._size = 0
+        self._getters: deque[asyncio.Future] = deque()
+        self._putters: deque[asyncio.Future] = deque()
+
+    def qsize(self) -> int:
+        """
+        :return: The number of events in the queue.
+        """
+        return self._size
+
+    def empty(self) -> bool:
+        """
+        :return: True if the queue contains no events, False otherwise.
+        """
+        return self._size == 0
+
+    def full(self) -> bool:
+        """
+        :return: True if the queue is bounded and holds maxsize events, False otherwise.
+        """
+        return 0 < self.maxsize <= self._size
+
+    @staticmethod
+    def _wakeup_next(waiters: deque[asyncio.Future]):
+        """
+        Wakes up the next waiter that has not been cancelled yet.
+        :param waiters: The waiters to wake one of.
+        """
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+    def put_nowait(self, event: BaseEvent, priority: EventPriority = EventPriority.Normal):
+        """
+        Adds the event to the queue without waiting.
+        :param event: The event to add.
+        :param priority: The priority the event is queued with.
+        :raises asyncio.QueueFull: If the queue is full.
+        """
+        if self.full():
+            raise asyncio.QueueFull
+        self._levels[priority].append((time.monotonic(), event))
+        self._size += 1
+        self.high_water_mark = max(self.high_water_mark, self._size)
+        self._wakeup_next(self._getters)
+
+    async def put(self, event: BaseEvent, priority: EventPriority = EventPriority.Normal):
+        """
+        Adds the event to the queue, waiting until there is room if the queue is full.
+        :param event: The event to add.
+        :param priority: The priority the event is queued with.
+        """
+        while self.full():
+            putter = asyncio.get_running_loop().create_future()
+            self._putters.append(putter)
+            try:
+                await putter
+            except BaseException:
+                putter.cancel()
+                if putter in self._putters:
+                    self._putters.remove(putter)
+                if not self.full() and not putter.cancelled():
+                    self._wakeup_next(self._putters)
+                raise
+        self.put_nowait(event, priority)
+
+    def get_entry_nowait(self) -> tuple[BaseEvent, float]:
+        """
+        Removes and returns the oldest event of the highest priority without waiting.
+        :return: The removed event and the time.monotonic() timestamp it was added at.
+        :raises asyncio.QueueEmpty: If the queue is empty.
+        """
+        for level in self._levels.values():
+            if level:
+                enqueued_at, event = self._remove_from_level(level.popleft)
+                return event, enqueued_at
+        raise asyncio.QueueEmpty
+
+    def get_nowait(self) -> BaseEvent:
+        """
+        Removes and returns the oldest event of the highest priority without waiting.
+        :return: The removed event.
+        :raises asyncio.QueueEmpty: If the queue is empty.
+        """
+        return self.get_entry_nowait()[0]
+
+    async def get(self) -> BaseEvent:
+        """
+        Removes and returns the oldest event of the highest priority, waiting for an event if the queue is empty.
+        :return: The removed event.
+        """
+        return (await self.get_entry())[0]
+
+    async def get_entry(self) -> tuple[BaseEvent, float]:
+        """
+        Removes and returns the oldest event of the highest priority, waiting for an event if the queue is empty.
+        :return: The removed event and the time.monotonic() timestamp it was added at.
+        """
+        while self.empty():
+            getter = asyncio.get_running_loop().create_future()
+            self._getters.append(getter)
+            try:
+                await getter
+            except BaseException:
+                getter.cancel()
+                if getter in self._getters:
+                    self._getters.remove(getter)
+                if not self.empty() and not getter.cancelled():
+                    self._wakeup_next(self._getters)
+                raise
+        return self.get_entry_nowait()
+
+    def drop_oldest(self) -> BaseEvent:
+        """
+        Removes and returns the oldest event of the lowest priority to make room for a new event.
+        :return: The removed event.
+        :raises asyncio.QueueEmpty: If the queue is empty.
+        """
+        for level in reversed(self._levels.values()):
+            if level:
+                return self._remove_from_level(level.popleft)[1]
+        raise asyncio.QueueEmpty
+
+    def _remove_from_level(self, pop_func) -> tuple[float, BaseEvent]:
+        """
+        Removes an entry from one of the priority levels and wakes up a waiting putter.
+        :param pop_func: The function removing the entry from its level.
+        :return: The removed (enqueue time, event) entry.
+        """
+        entry = pop_func()
+        self._size -= 1
+        self._wakeup_next(self._putters)
+        return entry
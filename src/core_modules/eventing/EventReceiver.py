@@ -1,7 +1,19 @@
 import asyncio
+import time
+from collections import Counter, deque
+from typing import Optional, Hashable
 
 from core_modules.eventing.BaseEvent import BaseEvent
+from core_modules.eventing.EventPriority import EventPriority
+from core_modules.eventing.EventQueue import EventQueue
+from core_modules.eventing.QueueFullPolicy import QueueFullPolicy
+from core_modules.lifecycle.LifecycleManager import get_lifecycle_manager
 from core_modules.logging.lis_logging import get_logger
+from core_modules.util.LatencyHistogram import LatencyHistogram
+
+DEFAULT_EVENT_QUEUE_SIZE = 1000
+# events waiting for the running handler of their ordering key before no further events are taken from the queue
+MAX_PENDING_ORDERED_EVENTS_PER_KEY = 100
 
 
 class EventReceiver:
@@ -11,11 +23,39 @@ class EventReceiver:
 
     log = get_logger(__name__)
 
-    def __init__(self):
+    def __init__(self, max_queue_size: int = DEFAULT_EVENT_QUEUE_SIZE,
+                 queue_full_policy: QueueFullPolicy = QueueFullPolicy.Block,
+                 event_priorities: Optional[dict[type[BaseEvent], EventPriority]] = None,
+                 max_concurrent_handlers: int = 1):
+        """
+        Initializes the EventReceiver and starts the task handling its event queue.
+        :param max_queue_size: How many events can be queued before the queue_full_policy applies. 0 means unbounded.
+        :param queue_full_policy: What to do with new events while the event queue is full.
+        :param event_priorities: Priority classes overriding the priority of specific event types for this receiver.
+        :param max_concurrent_handlers: How many events may be handled at the same time. Events sharing an ordering
+        key (see get_ordering_key) are still handled one after the other.
+        """
         self.log.info("Starting...")
-        self._event_queue = asyncio.Queue()
+        self._event_queue = EventQueue(maxsize=max_queue_size)
+        self.queue_full_policy = queue_full_policy
+        self._event_priorities = event_priorities if event_priorities is not None else {}
+        self.dropped_event_count = 0
+        self.max_concurrent_handlers = max_concurrent_handlers
+        self._handler_slots = asyncio.Semaphore(max_concurrent_handlers)
+        # events waiting for the running handler of their ordering key, which handles them one after the other
+        self._pending_ordered_events: dict[Hashable, deque[tuple[BaseEvent, float]]] = {}
+        # set whenever a handler took over a pending event, to resume taking events once a backlog has room again
+        self._pending_ordered_event_progress = asyncio.Event()
+        # events taken from the queue whose handling has not finished yet
+        self._active_event_count = 0
+        # metrics per event type name - time from entering the queue until the handler starts / until the handler
+        # finished and the number of handled events
+        self._queue_wait_histograms: dict[str, LatencyHistogram] = {}
+        self._handled_histograms: dict[str, LatencyHistogram] = {}
+        self._handled_event_counts: Counter[str] = Counter()
         # schedule _handle_events_task for execution
-        asyncio.create_task(self._handle_events_task())
+        get_lifecycle_manager().register_event_receiver(self)
+        get_lifecycle_manager().create_consumer_task(self._handle_events_task())
 
     def fetch_events_to_register(self) -> list[type[BaseEvent]]:
         """
@@ -25,21 +65,175 @@ class EventReceiver:
         """
         return []
 
-    async def put_internal(self, event: BaseEvent):
+    def is_idle(self) -> bool:
+        """
+        Checks whether all received events were handled. Used to drain the receivers on shutdown.
+        :return: True if the event queue is empty and no event is being handled, False otherwise.
+        """
+        return self._event_queue.empty() and self._active_event_count == 0
+
+    def get_ordering_key(self, event: BaseEvent) -> Optional[Hashable]:
+        """
+        Gets the key of the event that defines which events need to be handled in order when handling events
+        concurrently. Can be overridden by child classes, e.g. to return the id of the device the event targets.
+        :param event: The event to get the key for.
+        :return: The ordering key or None if the event can be handled independently of all other events.
+        """
+        return None
+
+    def get_event_priority(self, event: BaseEvent) -> EventPriority:
+        """
+        Gets the priority class the event is queued with by this receiver.
+        :param event: The event to get the priority for.
+        :return: The priority overridden for this receiver if present, the priority of the event type otherwise.
+        """
+        return self._event_priorities.get(type(event), event.priority)
+
+    def get_queue_metrics(self) -> dict:
+        """
+        Collects metrics about the event queue of this receiver.
+        :return: Dict containing the current depth, the high-water mark, the capacity and the number of dropped events.
+        """
+        return {"depth": self._event_queue.qsize(),
+                "high_water_mark": self._event_queue.high_water_mark,
+                "capacity": self._event_queue.maxsize,
+                "dropped_events": self.dropped_event_count}
+
+    def get_metrics(self) -> dict:
+        """
+        Collects the queue metrics as well as the latency histograms and handled event counts per event type of this
+        receiver.
+        :return: JSON serializable dict containing the metrics.
         """
-        Method that enqueues the event to the internal _event_queue
+        return {"queue": self.get_queue_metrics(),
+                "event_types": {name: {"handled": self._handled_event_counts[name],
+                                       "queue_wait": self._queue_wait_histograms[name].to_dict(),
+                                       "dispatch_to_handled": self._handled_histograms[name].to_dict()}
+                                for name in sorted(self._queue_wait_histograms)}}
+
+    def offer(self, event: BaseEvent) -> bool:
+        """
+        Tries to enqueue the event to the internal _event_queue without waiting, applying the queue_full_policy if
+        the queue is full.
         :param event: The event to add to the event queue.
+        :return: False if the event could not be enqueued without waiting (full queue with QueueFullPolicy.Block),
+        True otherwise - also if the event was dropped.
         """
+        if self._event_queue.full():
+            if self.queue_full_policy is QueueFullPolicy.Block:
+                return False
+            self.dropped_event_count += 1
+            if self.queue_full_policy is QueueFullPolicy.DropNewest:
+                self.log.warning("Event queue is full - dropping " + str(type(event)))
+                return True
+            dropped_event = self._event_queue.drop_oldest()
+            self.log.warning("Event queue is full - dropping oldest event " + str(type(dropped_event)))
         self.log.debug("Adding " + str(type(event)) + " to internal event queue.")
-        await self._event_queue.put(event)
+        self._event_queue.put_nowait(event, self.get_event_priority(event))
+        return True
+
+    async def put_internal(self, event: BaseEvent):
+        """
+        Method that enqueues the event to the internal _event_queue. Waits for room in the queue if it is full and
+        the queue_full_policy is QueueFullPolicy.Block.
+        :param event: The event to add to the event queue.
+        """
+        if not self.offer(event):
+            self.log.debug("Event queue is full - waiting to add " + str(type(event)))
+            await self._event_queue.put(event, self.get_event_priority(event))
 
     async def _handle_events_task(self):
         """
         Loop that is run in an async task to watch the internal event queue and handle events accordingly.
         """
+        if self.max_concurrent_handlers <= 1:
+            while True:
+                event, enqueued_at = await self._event_queue.get_entry()
+                self._active_event_count += 1
+                try:
+                    await self._handle_event_safely(event, enqueued_at)
+                finally:
+                    self._active_event_count -= 1
         while True:
-            event = await self._event_queue.get()
-            await asyncio.create_task(self.handle_specific_event(event))
+            # wait for a free handler slot before taking the next event, so the queue fills up and the
+            # EventDistributor is slowed down instead of spawning an unbounded number of handler tasks
+            await self._handler_slots.acquire()
+            event, enqueued_at = await self._event_queue.get_entry()
+            self._active_event_count += 1
+            ordering_key = self.get_ordering_key(event)
+            if ordering_key is not None:
+                pending_events = self._pending_ordered_events.get(ordering_key)
+                if pending_events is not None:
+                    # the running handler of the key takes the event over with its own slot, so events waiting for
+                    # a slow handler never occupy the slots events with other keys need
+                    pending_events.append((event, enqueued_at))
+                    self._handler_slots.release()
+                    # leave further events in the bounded queue while the backlog is full, so the queue fills up
+                    # and its backpressure reaches the EventDistributor
+                    while len(pending_events) >= MAX_PENDING_ORDERED_EVENTS_PER_KEY \
+                            and self._pending_ordered_events.get(ordering_key) is pending_events:
+                        self._pending_ordered_event_progress.clear()
+                        await self._pending_ordered_event_progress.wait()
+                    continue
+                self._pending_ordered_events[ordering_key] = deque()
+            get_lifecycle_manager().create_consumer_task(
+                self._run_concurrent_handler(event, enqueued_at, ordering_key))
+
+    async def _run_concurrent_handler(self, event: BaseEvent, enqueued_at: float, ordering_key: Optional[Hashable]):
+        """
+        Handles an event in its own task, followed by all events with the same ordering key that arrived in the
+        meantime, and frees its handler slot afterwards.
+        :param event: The event to handle.
+        :param enqueued_at: The time.monotonic() timestamp the event was added to the queue at.
+        :param ordering_key: The ordering key of the event or None if it is handled independently.
+        """
+        try:
+            while True:
+                try:
+                    await self._handle_event_safely(event, enqueued_at)
+                finally:
+                    self._active_event_count -= 1
+                pending_events = self._pending_ordered_events.get(ordering_key) if ordering_key is not None else None
+                if not pending_events:
+                    break
+                event, enqueued_at = pending_events.popleft()
+                self._pending_ordered_event_progress.set()
+        finally:
+            if ordering_key is not None:
+                self._pending_ordered_events.pop(ordering_key, None)
+                self._pending_ordered_event_progress.set()
+            self._handler_slots.release()
+
+    async def _handle_event_safely(self, event: BaseEvent, enqueued_at: float):
+        """
+        Calls handle_specific_event and logs errors instead of letting them end the event handling.
+        Also records the queue wait and handling latency of the event.
+        :param event: The event to handle.
+        :param enqueued_at: The time.monotonic() timestamp the event was added to the queue at.
+        """
+        event_type_name = self._record_queue_wait(event, enqueued_at)
+        try:
+            await self.handle_specific_event(event)
+        except Exception as e:
+            self.log.exception("Error while handling " + str(type(event)) + ": " + str(e))
+        finally:
+            self._handled_histograms[event_type_name].record(time.monotonic() - enqueued_at)
+            self._handled_event_counts[event_type_name] += 1
+
+    def _record_queue_wait(self, event: BaseEvent, enqueued_at: float) -> str:
+        """
+        Records the time the event waited in the queue in the histogram of its event type, creating the histograms of
+        the event type on its first event.
+        :param event: The event taken from the queue.
+        :param enqueued_at: The time.monotonic() timestamp the event was added to the queue at.
+        :return: The event type name the metrics of the event are recorded under.
+        """
+        event_type_name = type(event).__name__
+        if event_type_name not in self._queue_wait_histograms:
+            self._queue_wait_histograms[event_type_name] = LatencyHistogram()
+            self._handled_histograms[event_type_name] = LatencyHistogram()
+        self._queue_wait_histograms[event_type_name].record(time.monotonic() - enqueued_at)
+        return event_type_name
 
     async def handle_specific_event(self, event: BaseEvent):
         """
@@ -0,0 +1,15 @@
+from enum import auto
+
+from core_modules.util.DescriptiveEnum import DescriptiveEnum
+
+
+class QueueFullPolicy(DescriptiveEnum):
+    """
+    Enum containing the ways an EventReceiver can react to a new event when its event queue is full.
+    """
+    # wait until there is room in the queue - applies backpressure to the sender
+    Block = auto()
+    # discard the oldest queued event to make room for the new one
+    DropOldest = auto()
+    # discard the new event
+    DropNewest = auto()
@@ -0,0 +1,17 @@
+from core_modules.eventing.BaseEvent import BaseEvent
+
+
+class ResponseEvent(BaseEvent):
+    """
+    Base class for events that are sent as the answer to a request event. Response events carrying the correlation_id
+    of a pending request are handed directly to the requester by the EventDistributor instead of being distributed.
+    """
+
+    def in_response_to(self, request_event: BaseEvent):
+        """
+        Marks this event as the response to the passed request event by copying its correlation_id.
+        :param request_event: The event this event is the response to.
+        :return: This event to allow chaining when sending it.
+        """
+        self.correlation_id = request_event.correlation_id
+        return self
@@ -1,11 +1,13 @@
 from core_modules.eventing.BaseEvent import BaseEvent
+from core_modules.eventing.EventPriority import EventPriority
 
 
 class SystemEvent(BaseEvent):
     """
     Base class for all system events that should be handled by the EventDistributor itself.
     """
-    ...
+    # handled first so (un-)registrations take effect before events queued alongside them are distributed
+    priority = EventPriority.High
 
 
 class RegisterTempReceiverEvent(SystemEvent):
@@ -1,7 +1,8 @@
 from typing import Callable
 
 from core_modules.eventing.BaseEvent import BaseEvent
-from core_modules.eventing.EventReceiver import EventReceiver
+from core_modules.eventing.EventReceiver import EventReceiver, DEFAULT_EVENT_QUEUE_SIZE
+from core_modules.eventing.QueueFullPolicy import QueueFullPolicy
 from core_modules.eventing.SystemEvents import RegisterTempReceiverEvent, UnregisterTempReceiverEvent
 from core_modules.logging.lis_logging import get_logger
 
@@ -13,9 +14,11 @@ class TemporaryEventReceiver(EventReceiver):
 
     log = get_logger(__name__)
 
-    def __init__(self, put_event: Callable, event_list: list[type(BaseEvent)]):
+    def __init__(self, put_event: Callable, event_list: list[type(BaseEvent)],
+                 max_queue_size: int = DEFAULT_EVENT_QUEUE_SIZE,
+                 queue_full_policy: QueueFullPolicy = QueueFullPolicy.Block):
         self.log.debug("Starting TemporaryEventReceiver for events: " + str(event_list))
-        super().__init__()
+        super().__init__(max_queue_size, queue_full_policy)
         self.put_event = put_event
         self.event_list = event_list
 
@@ -33,6 +36,13 @@ class TemporaryEventReceiver(EventReceiver):
         """
         ...
 
+    def is_idle(self) -> bool:
+        """
+        Overwritten as the events are consumed by whoever waits for them and not by an internal loop.
+        :return: Always True, so the shutdown does not wait for events nobody will consume anymore.
+        """
+        return True
+
     def fetch_events_to_register(self) -> list[type[BaseEvent]]:
         """
         Overwritten to provide response event this TemporaryEventReceiver is listening to.
@@ -47,7 +57,8 @@ class TemporaryEventReceiver(EventReceiver):
         :return: The event that was received.
         """
         self.log.debug("Waiting for Event...")
-        event = await self._event_queue.get()
+        event, enqueued_at = await self._event_queue.get_entry()
+        self._record_queue_wait(event, enqueued_at)
         if unregister_after_receive:
             self.log.debug("Unregistering with EventDistributor...")
             await self.put_event(UnregisterTempReceiverEvent(self))
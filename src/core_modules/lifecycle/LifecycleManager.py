@@ -0,0 +1,164 @@
+import asyncio
+import inspect
+import weakref
+from typing import Callable, Coroutine
+
+from core_modules.logging.lis_logging import get_logger
+
+DEFAULT_DRAIN_DEADLINE_IN_SECONDS = 5
+DRAIN_POLL_INTERVAL_IN_SECONDS = 0.05
+
+
+class LifecycleManager:
+    """
+    Keeps track of every task started by the LIS modules and coordinates the graceful shutdown:
+    producers are stopped first, then the events buffered by producers are flushed by the pre-drain hooks, the event
+    queues are drained up to a deadline, remaining tasks are cancelled and finally the registered shutdown hooks are run
+    (e.g. to flush storage and close sessions).
+    """
+
+    log = get_logger(__name__)
+
+    def __init__(self):
+        # tasks producing new events (e.g. eventstream listeners, the scheduling engine)
+        self._producer_tasks: set[asyncio.Task] = set()
+        # tasks consuming events (event queue loops and their handlers) - only cancelled after draining
+        self._consumer_tasks: set[asyncio.Task] = set()
+        self._event_receivers = weakref.WeakSet()
+        self._pre_drain_hooks: list[Callable] = []
+        self._shutdown_hooks: list[Callable] = []
+        self._shutdown_requested = asyncio.Event()
+
+    def _track_task(self, coro: Coroutine, tasks: set[asyncio.Task]) -> asyncio.Task:
+        """
+        Starts a task and keeps a handle of it in the given set until it is done.
+        :param coro: The coroutine to run.
+        :param tasks: The set to track the task in.
+        :return: The started task.
+        """
+        task = asyncio.create_task(coro)
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        task.add_done_callback(self._log_task_error)
+        return task
+
+    def _log_task_error(self, task: asyncio.Task):
+        """
+        Done callback logging the error a tracked task ended with.
+        :param task: The finished task.
+        """
+        if not task.cancelled() and task.exception() is not None:
+            self.log.error(f"Task {task.get_coro().__qualname__} ended with an error: {task.exception()!r}")
+
+    def create_task(self, coro: Coroutine) -> asyncio.Task:
+        """
+        Starts a task producing events. It is cancelled at the start of the shutdown.
+        :param coro: The coroutine to run.
+        :return: The started task.
+        """
+        return self._track_task(coro, self._producer_tasks)
+
+    def create_consumer_task(self, coro: Coroutine) -> asyncio.Task:
+        """
+        Starts a task consuming events. It is only cancelled after the event queues were drained.
+        :param coro: The coroutine to run.
+        :return: The started task.
+        """
+        return self._track_task(coro, self._consumer_tasks)
+
+    def register_event_receiver(self, event_receiver):
+        """
+        Registers an EventReceiver whose queue is drained during the shutdown. Only weakly referenced, so short-lived
+        receivers do not need to unregister.
+        :param event_receiver: The EventReceiver to drain on shutdown.
+        """
+        self._event_receivers.add(event_receiver)
+
+    def register_pre_drain_hook(self, hook: Callable):
+        """
+        Registers a callable that is run after the producers were stopped and before the event queues are drained,
+        e.g. to send the events a producer still buffers. Hooks are run in the order they were registered and may be
+        coroutine functions.
+        :param hook: The callable to run before draining.
+        """
+        self._pre_drain_hooks.append(hook)
+
+    def register_shutdown_hook(self, hook: Callable):
+        """
+        Registers a callable that is run at the end of the shutdown, after all tasks were stopped. Hooks are run in the
+        order they were registered and may be coroutine functions.
+        :param hook: The callable to run on shutdown.
+        """
+        self._shutdown_hooks.append(hook)
+
+    def request_shutdown(self):
+        """
+        Requests the shutdown of LIS. Used as signal handler.
+        """
+        self.log.info("Shutdown requested")
+        self._shutdown_requested.set()
+
+    async def wait_for_shutdown_request(self):
+        """
+        Waits until the shutdown of LIS was requested.
+        """
+        await self._shutdown_requested.wait()
+
+    async def shutdown(self, drain_deadline_in_seconds: float = DEFAULT_DRAIN_DEADLINE_IN_SECONDS):
+        """
+        Gracefully shuts down all tracked tasks and runs the shutdown hooks.
+        :param drain_deadline_in_seconds: How long to wait for the event queues to run empty before cancelling
+        the consumers anyway.
+        """
+        self.log.info(f"Shutting down - stopping {len(self._producer_tasks)} producer tasks...")
+        await self._cancel_tasks(self._producer_tasks)
+        await self._run_hooks(self._pre_drain_hooks)
+
+        self.log.info(f"Draining {len(self._event_receivers)} event receivers...")
+        deadline = asyncio.get_running_loop().time() + drain_deadline_in_seconds
+        while not all(event_receiver.is_idle() for event_receiver in list(self._event_receivers)):
+            if asyncio.get_running_loop().time() >= deadline:
+                self.log.warning("Event receivers were not drained before the deadline - cancelling remaining events")
+                break
+            await asyncio.sleep(DRAIN_POLL_INTERVAL_IN_SECONDS)
+        await self._cancel_tasks(self._consumer_tasks)
+        # producers may have been started by handlers while draining
+        await self._cancel_tasks(self._producer_tasks)
+
+        await self._run_hooks(self._shutdown_hooks)
+        self.log.info("Shutdown complete")
+
+    async def _run_hooks(self, hooks: list[Callable]):
+        """
+        Runs the given hooks one after the other, logging errors instead of aborting the shutdown.
+        :param hooks: The hooks to run.
+        """
+        for hook in hooks:
+            try:
+                result = hook()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                self.log.exception("Error while running hook " + str(hook) + ": " + str(e))
+
+    @staticmethod
+    async def _cancel_tasks(tasks: set[asyncio.Task]):
+        """
+        Cancels the given tasks and waits for them to finish.
+        :param tasks: The tasks to cancel.
+        """
+        tasks_to_cancel = list(tasks)
+        for task in tasks_to_cancel:
+            task.cancel()
+        await asyncio.gather(*tasks_to_cancel, return_exceptions=True)
+
+
+_lifecycle_manager = LifecycleManager()
+
+
+def get_lifecycle_manager() -> LifecycleManager:
+    """
+    Method to return the LifecycleManager shared by all LIS modules.
+    :return: the LifecycleManager instance
+    """
+    return _lifecycle_manager
@@ -0,0 +1,47 @@
+from functools import partial
+from typing import Callable
+
+from core_modules.logging.lis_logging import get_logger
+from core_modules.rest.AbstractBaseApi import AbstractBaseApi
+from core_modules.rest.RestServer import REST_METHOD_GET
+
+
+class MetricsApi(AbstractBaseApi):
+    """
+    Api to get runtime metrics of the LIS core modules.
+    """
+
+    log = get_logger(__name__)
+
+    def __init__(self, metric_providers: dict[str, Callable[[], dict]]):
+        """
+        Initializes the MetricsApi.
+        :param metric_providers: Callables returning the current metrics of a module as a JSON serializable dict,
+        mapped to the name the metrics are listed under.
+        """
+        self._metric_providers = metric_providers
+
+    def register_endpoints(self, register_handler: Callable):
+        self.log.debug("Registering api endpoints...")
+        register_handler("/metrics", REST_METHOD_GET, self._metrics_response)
+        for name in self._metric_providers:
+            register_handler(f"/metrics/{name}", REST_METHOD_GET, partial(self._provider_metrics_response, name))
+
+    async def _metrics_response(self, _args):
+        """
+        Endpoint handler for the /metrics endpoint.
+        :param _args: contains the arguments of the request
+        :return: Tuple containing the status_code and the metrics of all providers
+        """
+        self.log.info("Received metrics request")
+        return 200, {name: provider() for name, provider in self._metric_providers.items()}
+
+    async def _provider_metrics_response(self, name: str, _args):
+        """
+        Endpoint handler for the /metrics/<name> endpoints.
+        :param name: The name of the metric provider the endpoint was registered for
+        :param _args: contains the arguments of the request
+        :return: Tuple containing the status_code and the metrics of the provider
+        """
+        self.log.info(f"Received {name} metrics request")
+        return 200, self._metric_providers[name]()
@@ -1,6 +1,7 @@
-from typing import Coroutine, Callable
+from typing import Callable, Coroutine, Optional
 
 from tornado import web
+from tornado.httpserver import HTTPServer
 
 from core_modules.logging.lis_logging import get_logger
 from core_modules.rest.AbstractBaseApi import AbstractBaseApi
@@ -24,6 +25,7 @@ class RestServer:
         self.server = web.Application([(r'/v1/sse', SSERequestHandler, {"put_event": put_event}),
                                        (r'/v1/.*', RestOmniRequestHandler,
                                         {"request_handle_callable": self.handle_request})])
+        self._http_server: Optional[HTTPServer] = None
         self.endpoint_map = {
             REST_METHOD_GET: {},
             REST_METHOD_POST: {},
@@ -62,7 +64,16 @@ class RestServer:
         :param port: The port the webserver should run on.
         """
         self.log.info("Starting RestServer on http://" + host + ":" + str(port))
-        self.server.listen(port, host)
+        self._http_server = self.server.listen(port, host)
+
+    def stop_server(self):
+        """
+        Stops the RestServer from accepting new connections.
+        """
+        if self._http_server is not None:
+            self.log.info("Stopping RestServer")
+            self._http_server.stop()
+            self._http_server = None
 
     async def handle_request(self, path: str, args, method):
         """
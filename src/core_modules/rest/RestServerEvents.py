@@ -1,7 +1,10 @@
 """
 Class containing all Events used for RestServer components.
 """
+from typing import Optional
+
 from core_modules.eventing.BaseEvent import BaseEvent
+from core_modules.eventing.BatchEvent import BatchEvent
 
 
 class SSEDataEvent(BaseEvent):
@@ -10,9 +13,17 @@ class SSEDataEvent(BaseEvent):
     event-stream.
     """
 
-    def __init__(self, event: str, data: str):
+    def __init__(self, event: str, data: str, key: Optional[str] = None):
+        """
+        Constructor of SSEDataEvent
+        :param event: The name of the event in the event-stream.
+        :param data: The data of the event.
+        :param key: Optional key of the entity the data belongs to (e.g. a lamp id). Used to coalesce events that
+        update the same entity.
+        """
         self.event = event
         self.data = data
+        self.key = key
 
     def get_data(self):
         """
@@ -21,3 +32,19 @@ class SSEDataEvent(BaseEvent):
         :return: event-stream formatted text containing event and data.
         """
         return "event: " + self.event + "\ndata: " + self.data + "\n\n"
+
+
+class SSEDataBatchEvent(BatchEvent):
+    """
+    Class for sending multiple SSEDataEvents to the SSERequestHandler at once, so they can be written to the
+    event-stream with a single flush.
+    """
+
+    events: list[SSEDataEvent]
+
+    def get_data(self):
+        """
+        Method to return the data of all contained events as one SSE formatted string.
+        :return: event-stream formatted text containing all events and their data.
+        """
+        return "".join(event.get_data() for event in self.events)
@@ -2,11 +2,15 @@ from typing import Callable
 
 from tornado.iostream import StreamClosedError
 
+from core_modules.eventing.QueueFullPolicy import QueueFullPolicy
 from core_modules.eventing.TemporaryEventReceiver import TemporaryEventReceiver
 from core_modules.eventing.SystemEvents import UnregisterTempReceiverEvent
 from core_modules.logging.lis_logging import get_logger
 from core_modules.rest.BaseRequestHandler import BaseRequestHandler
-from core_modules.rest.RestServerEvents import SSEDataEvent
+from core_modules.rest.RestServerEvents import SSEDataEvent, SSEDataBatchEvent
+
+# events queued for a single client before the oldest ones are dropped - a stalled client must not block the event bus
+SSE_MAX_QUEUED_EVENTS = 100
 
 
 class SSERequestHandler(BaseRequestHandler):
@@ -25,7 +29,9 @@ class SSERequestHandler(BaseRequestHandler):
         :param put_event: The callable for sending an Event to the EventDistributor
         """
         self.put_event = put_event
-        self._sse_event_receiver = TemporaryEventReceiver(put_event, [SSEDataEvent])
+        self._sse_event_receiver = TemporaryEventReceiver(put_event, [SSEDataEvent, SSEDataBatchEvent],
+                                                          SSE_MAX_QUEUED_EVENTS,
+                                                          QueueFullPolicy.DropOldest)
 
     async def get(self):
         """
@@ -36,9 +42,9 @@ class SSERequestHandler(BaseRequestHandler):
         self.add_header("Cache-Control", "no-store")
         await self._sse_event_receiver.start()
         while True:
-            event: SSEDataEvent = await self._sse_event_receiver.wait_for_event(
+            event: SSEDataEvent | SSEDataBatchEvent = await self._sse_event_receiver.wait_for_event(
                 unregister_after_receive=False)
-            self.log.debug("Received SSEDataEvent: " + str(event))
+            self.log.debug("Received SSE event: " + str(event))
             self.log.debug("Writing SSE response...")
             self.write(event.get_data())
             try:
@@ -21,3 +21,10 @@ class SessionManager:
         if self._session.closed:
             self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(verify_ssl=False))
         return self._session
+
+    async def close(self):
+        """
+        Closes the current shared session. Used on shutdown.
+        """
+        if not self._session.closed:
+            await self._session.close()
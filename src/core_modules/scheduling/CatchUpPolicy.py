@@ -0,0 +1,23 @@
+from enum import auto
+
+from core_modules.util.DescriptiveEnum import DescriptiveEnum
+
+
+class CatchUpPolicy(DescriptiveEnum):
+    """
+    Enum containing the ways the EventScheduler handles executions of a scheduled event that were missed by more than
+    its grace period (e.g. during a system outage).
+    """
+    # drop the missed executions
+    Skip = auto()
+    # execute the event once for all missed executions
+    FireOnce = auto()
+    # execute the event for every missed execution - up to the catch_up_limit of the scheduled event
+    FireAll = auto()
+
+    @staticmethod
+    def get_catch_up_policy_from_name(catch_up_policy_name: str):
+        for field in CatchUpPolicy:
+            if field == catch_up_policy_name:
+                return field
+        return CatchUpPolicy.Skip
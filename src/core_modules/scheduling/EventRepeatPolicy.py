@@ -15,6 +15,8 @@ class EventRepeatPolicy(DescriptiveEnum):
     Weekly = auto()
     Monthly = auto()
     Yearly = auto()
+    # repeats according to the RFC 5545 recurrence rule passed as repeat_rule
+    Rule = auto()
 
     @staticmethod
     def get_event_repeat_policy_from_name(repeat_policy_name: str):
@@ -1,25 +1,60 @@
 import asyncio
+import bisect
+import heapq
+import itertools
 import json
+import time
+import uuid
+from collections import deque, Counter
 from datetime import datetime, timedelta
-from typing import Callable
+from typing import Callable, Optional
 
 from core_modules.eventing.BaseEvent import BaseEvent
 from core_modules.eventing.EventReceiver import EventReceiver
+from core_modules.lifecycle.LifecycleManager import get_lifecycle_manager
 from core_modules.logging.lis_logging import get_logger
+from core_modules.scheduling.CatchUpPolicy import CatchUpPolicy
 from core_modules.scheduling.EventRepeatPolicy import EventRepeatPolicy
-from core_modules.scheduling.ScheduledEvent import ScheduledEvent, EXEC_DATETIME_FORMAT
-from core_modules.scheduling.SchedulingEvents import ScheduleEventExecutionEvent, UnscheduleEventExecutionEvent
-from core_modules.scheduling.scheduling_helper import get_next_execution_time_for_policy
+from core_modules.scheduling.SchedulableEvent import SchedulableEvent
+from core_modules.scheduling.ScheduledEvent import ScheduledEvent, parse_exec_time, EXEC_DATETIME_FORMAT
+from core_modules.scheduling.SchedulerJournal import SchedulerJournal
+from core_modules.scheduling.SchedulingEvents import ScheduleEventExecutionEvent, UnscheduleEventExecutionEvent, \
+    RescheduleEventExecutionEvent, RemoveScheduledEventEvent, ScheduleModificationResponseEvent, \
+    GetScheduledEventsEvent, ScheduledEventsResponseEvent, ScheduleEventExecutionBatchEvent, DEFAULT_CATCH_UP_LIMIT
+from core_modules.scheduling.scheduling_helper import get_next_execution_time_after, compile_repeat_rule, \
+    count_execution_times_until
 from core_modules.storage.StorageManager import StorageManager
+from core_modules.util.LatencyHistogram import LatencyHistogram
 
 STORAGE_PERSISTENT_EVENTS_FIELD = "SCHEDULED_EVENTS"
 STORAGE_PERSISTENT_EVENTS_SECTION = "SCHEDULING"
+STORAGE_STRUCTURED_METRICS_LOGGING_FIELD = "STRUCTURED_METRICS_LOGGING"
 
 PERSISTENT_EVENT_FIELD_EXEC_TIME = "exec_time"
 PERSISTENT_EVENT_FIELD_EVENT = "event"
 PERSISTENT_EVENT_FIELD_PERSIST_AFTER_REBOOT = "persist_after_reboot"
 PERSISTENT_EVENT_FIELD_REPEAT_POLICY = "repeat_policy"
+PERSISTENT_EVENT_FIELD_REPEAT_RULE = "repeat_rule"
+PERSISTENT_EVENT_FIELD_CATCH_UP_POLICY = "catch_up_policy"
+PERSISTENT_EVENT_FIELD_CATCH_UP_LIMIT = "catch_up_limit"
 PERSISTENT_EVENT_FIELD_GRACE_PERIOD = "grace_period_in_minutes"
+PERSISTENT_EVENT_FIELD_SCHEDULE_ID = "schedule_id"
+# missed executions of the event that were not replayed yet
+PERSISTENT_EVENT_FIELD_PENDING_CATCH_UP_EXECUTIONS = "pending_catch_up_executions"
+# marks entries of events without further executions that are only kept until their missed executions were replayed
+PERSISTENT_EVENT_FIELD_CATCH_UP_ONLY = "catch_up_only"
+
+# the execution heap is only rebuilt once there are enough cancelled entries to make the rebuild worth it
+MIN_CANCELLED_ENTRIES_FOR_COMPACTION = 64
+
+# longest time the scheduling engine sleeps before checking the wall clock again - execution times are wall clock
+# times, so a clock step (e.g. by NTP or a DST change) is noticed well within the default grace period
+MAX_WAKEUP_INTERVAL_IN_SECONDS = 30
+
+# missed executions are replayed one by one with this delay, so catching up never floods the event bus or upstream apis
+CATCH_UP_REPLAY_INTERVAL_IN_SECONDS = 0.25
+# maximum number of missed executions waiting to be replayed - further missed executions are dropped
+MAX_CATCH_UP_REPLAY_QUEUE_SIZE = 500
 
 
 class EventScheduler(EventReceiver):
@@ -27,148 +62,560 @@ class EventScheduler(EventReceiver):
     Class containing the scheduling engine for planing Events to be executed at a later date.
     """
 
-    _event_execution_map = {}
     log = get_logger(__name__)
 
-    def __init__(self, storage: StorageManager, put_event: Callable):
+    def __init__(self, storage: StorageManager, put_event: Callable, journal: SchedulerJournal):
         super().__init__()
         self.storage = storage
         self.put_event = put_event
-        asyncio.create_task(self._scheduling_engine_task())
+        self.journal = journal
+        self._execution_heap: list[tuple[datetime, int, ScheduledEvent]] = []
+        self._sequence = itertools.count()
+        self._scheduled_events_by_id: dict[str, ScheduledEvent] = {}
+        self._scheduled_events_by_event: dict[SchedulableEvent, list[ScheduledEvent]] = {}
+        # schedule_ids per event_id - dicts are used as insertion ordered sets
+        self._schedule_ids_by_event_id: dict[str, dict[str, None]] = {}
+        # (exec_time, schedule_id) of all scheduled events sorted by execution time for range queries
+        self._time_index: list[tuple[datetime, str]] = []
+        self._cancelled_entry_count = 0
+        self._wakeup_engine = asyncio.Event()
+        self._wakeup_timer: Optional[asyncio.TimerHandle] = None
+        # difference between the execution time of an event and the time it was actually forwarded to the event bus
+        self._firing_lag_histogram = LatencyHistogram()
+        # time the engine needs to collect and forward all due events after waking up
+        self._tick_duration_histogram = LatencyHistogram()
+        # events past their grace period that were skipped instead of caught up on by event_id
+        self._skipped_event_counts: Counter[str] = Counter()
+        self._caught_up_execution_count = 0
+        self._dropped_catch_up_execution_count = 0
+        # emit every firing and tick as a json log line that can be parsed by log processors
+        self._structured_metrics_logging = bool(storage.get(STORAGE_STRUCTURED_METRICS_LOGGING_FIELD,
+                                                            STORAGE_PERSISTENT_EVENTS_SECTION, False))
+        # missed executions waiting to be replayed by the _catch_up_replay_task as (schedule_id, event)
+        self._catch_up_replay_queue: deque[tuple[str, SchedulableEvent]] = deque()
+        # number of queued missed executions by schedule_id - persisted in the journal entries, so a restart does not
+        # lose the executions that were not replayed yet
+        self._pending_catch_up_executions: Counter[str] = Counter()
+        # journal entries of persistent events without further executions, kept until their replays are done
+        self._catch_up_only_entries: dict[str, dict] = {}
+        self._catch_up_replay_pending = asyncio.Event()
+        get_lifecycle_manager().create_task(self._scheduling_engine_task())
+        get_lifecycle_manager().create_task(self._catch_up_replay_task())
 
     def fetch_events_to_register(self) -> list[type[BaseEvent]]:
-        return [ScheduleEventExecutionEvent, UnscheduleEventExecutionEvent]
+        return [ScheduleEventExecutionEvent, ScheduleEventExecutionBatchEvent, UnscheduleEventExecutionEvent,
+                RescheduleEventExecutionEvent, RemoveScheduledEventEvent, GetScheduledEventsEvent]
 
     def load_persistent_events(self, event_mapping_func: Callable):
         """
-        Load all persistent events that were written to disk prior.
+        Load all persistent events that were written to the journal prior. Events still stored in the storage by older
+        versions are migrated to the journal first.
         :param event_mapping_func: The function to use to map an events json representation back to an Event instance.
         """
-        self.log.info("Loading scheduled events from storage.")
-        events_to_load = self.storage.get(STORAGE_PERSISTENT_EVENTS_FIELD, STORAGE_PERSISTENT_EVENTS_SECTION, [])
-        for stored_event in events_to_load:
+        self._migrate_events_from_storage()
+        self.log.info("Loading scheduled events from journal.")
+        for schedule_id, stored_event in self.journal.get_entries().items():
             ev = event_mapping_func(json.loads(stored_event[PERSISTENT_EVENT_FIELD_EVENT]))
-            exec_time = datetime.strptime(stored_event[PERSISTENT_EVENT_FIELD_EXEC_TIME], EXEC_DATETIME_FORMAT)
+            if ev is None:
+                self.log.error(f"Could not map stored event {stored_event} - skipping!")
+                continue
+            pending_catch_up_executions = stored_event.get(PERSISTENT_EVENT_FIELD_PENDING_CATCH_UP_EXECUTIONS, 0)
+            if pending_catch_up_executions:
+                self.log.info(f"Resuming {pending_catch_up_executions} missed executions of {schedule_id}")
+                self._queue_catch_up_replays(schedule_id, ev, pending_catch_up_executions)
+            if stored_event.get(PERSISTENT_EVENT_FIELD_CATCH_UP_ONLY, False):
+                self._catch_up_only_entries[schedule_id] = stored_event
+                continue
+            exec_time = parse_exec_time(stored_event[PERSISTENT_EVENT_FIELD_EXEC_TIME])
             repeat_policy = EventRepeatPolicy.get_event_repeat_policy_from_name(
                 stored_event[PERSISTENT_EVENT_FIELD_REPEAT_POLICY])
+            repeat_rule = stored_event.get(PERSISTENT_EVENT_FIELD_REPEAT_RULE)
+            if not self._is_valid_repeat_rule(repeat_policy, repeat_rule):
+                continue
             persist_after_reboot = stored_event[PERSISTENT_EVENT_FIELD_PERSIST_AFTER_REBOOT]
             grace_time_in_minutes = stored_event[PERSISTENT_EVENT_FIELD_GRACE_PERIOD]
+            catch_up_policy = CatchUpPolicy.get_catch_up_policy_from_name(
+                stored_event.get(PERSISTENT_EVENT_FIELD_CATCH_UP_POLICY))
+            catch_up_limit = stored_event.get(PERSISTENT_EVENT_FIELD_CATCH_UP_LIMIT, DEFAULT_CATCH_UP_LIMIT)
             self._add_event_to_execution_map(exec_time, ScheduledEvent(exec_time, ev, persist_after_reboot,
-                                                                       repeat_policy, grace_time_in_minutes))
+                                                                       repeat_policy, grace_time_in_minutes,
+                                                                       schedule_id, repeat_rule, catch_up_policy,
+                                                                       catch_up_limit))
+
+    def _is_valid_repeat_rule(self, repeat_policy: EventRepeatPolicy, repeat_rule: Optional[str]) -> bool:
+        """
+        Checks whether the repeat rule of an event repeating with EventRepeatPolicy.Rule can be compiled.
+        :param repeat_policy: The repeat policy of the event.
+        :param repeat_rule: The repeat rule of the event.
+        :return: False if the event repeats with EventRepeatPolicy.Rule and the rule is missing or invalid, True otherwise.
+        """
+        if repeat_policy is not EventRepeatPolicy.Rule:
+            return True
+        if repeat_rule is None:
+            self.log.error("Event with the repeat policy Rule is missing its repeat_rule - skipping!")
+            return False
+        try:
+            compile_repeat_rule(repeat_rule)
+        except ValueError as e:
+            self.log.error(f"Invalid repeat_rule {repeat_rule} - skipping! {e}")
+            return False
+        return True
+
+    def _migrate_events_from_storage(self):
+        """
+        Moves the persistent events stored in the storage by older versions into the journal, assigning each a
+        schedule_id. Execution times stored in the LEGACY_EXEC_DATETIME_FORMAT are rewritten to the EXEC_DATETIME_FORMAT,
+        so the journal entries match the representation of the scheduled events they are replaced with.
+        """
+        events_to_migrate = self.storage.get(STORAGE_PERSISTENT_EVENTS_FIELD, STORAGE_PERSISTENT_EVENTS_SECTION, [])
+        if not events_to_migrate:
+            return
+        self.log.info(f"Migrating {len(events_to_migrate)} scheduled events from storage to the journal.")
+        migrated_events = {}
+        for stored_event in events_to_migrate:
+            try:
+                exec_time = parse_exec_time(stored_event[PERSISTENT_EVENT_FIELD_EXEC_TIME])
+            except (KeyError, ValueError):
+                self.log.error(f"Stored event {stored_event} has no valid exec_time - skipping!")
+                continue
+            schedule_id = uuid.uuid4().hex
+            migrated_events[schedule_id] = {**stored_event,
+                                            PERSISTENT_EVENT_FIELD_EXEC_TIME: exec_time.strftime(EXEC_DATETIME_FORMAT),
+                                            PERSISTENT_EVENT_FIELD_SCHEDULE_ID: schedule_id}
+        self.journal.put_all(migrated_events)
+        self.storage.update([], STORAGE_PERSISTENT_EVENTS_FIELD, STORAGE_PERSISTENT_EVENTS_SECTION)
 
     def _add_event_to_execution_map(self, exec_time: datetime, scheduled_event: ScheduledEvent):
         """
-        Add an event to the execution map to schedule it for execution.
+        Add an event to the execution heap to schedule it for execution. Wakes up the scheduling engine if the event is
+        due before the event the engine is currently sleeping for.
         :param exec_time: The time the event will be executed at.
         :param scheduled_event: The event to schedule.
         """
         self.log.info("Scheduling " + scheduled_event.event_to_exec.get_event_id()
                       + " for execution at " + str(exec_time))
-        if exec_time in self._event_execution_map:
-            self._event_execution_map[exec_time].append(scheduled_event)
-        else:
-            self._event_execution_map[exec_time] = [scheduled_event]
+        heapq.heappush(self._execution_heap, (exec_time, next(self._sequence), scheduled_event))
+        self._add_to_indexes(scheduled_event)
+        if self._execution_heap[0][2] is scheduled_event:
+            self._wakeup_engine.set()
 
-    def _handle_scheduling_event(self, scheduling_event):
+    def _remove_event_from_execution_map(self, scheduled_event: ScheduledEvent):
         """
-        Handles a scheduling event and stores the event in the scheduling map. Also writes persistent events to disk.
-        :param scheduling_event: The scheduling event that is being handled.
+        Remove an event from the execution heap. The heap entry is only marked as cancelled and dropped once it reaches
+        the top of the heap, the heap gets rebuilt once cancelled entries make up the majority of it.
+        :param scheduled_event: The scheduled event to remove.
+        """
+        self._remove_from_indexes(scheduled_event)
+        scheduled_event.cancelled = True
+        self._cancelled_entry_count += 1
+        if self._cancelled_entry_count > MIN_CANCELLED_ENTRIES_FOR_COMPACTION \
+                and self._cancelled_entry_count * 2 > len(self._execution_heap):
+            self._execution_heap = [entry for entry in self._execution_heap if not entry[2].cancelled]
+            heapq.heapify(self._execution_heap)
+            self._cancelled_entry_count = 0
+
+    def _pop_due_events(self, now: datetime) -> list[ScheduledEvent]:
+        """
+        Pop all events from the execution heap that are due at the passed time.
+        :param now: The time to check the events against.
+        :return: All scheduled events that are due, ordered by their execution time.
+        """
+        due_events = []
+        while self._execution_heap and self._execution_heap[0][0] <= now:
+            scheduled_event = heapq.heappop(self._execution_heap)[2]
+            if scheduled_event.cancelled:
+                self._cancelled_entry_count -= 1
+                continue
+            self._remove_from_indexes(scheduled_event)
+            due_events.append(scheduled_event)
+        return due_events
+
+    def _add_to_indexes(self, scheduled_event: ScheduledEvent):
+        """
+        Add a scheduled event to the indexes by schedule_id, by event, by event_id and by execution time.
+        :param scheduled_event: The scheduled event to add.
+        """
+        self._scheduled_events_by_id[scheduled_event.schedule_id] = scheduled_event
+        self._scheduled_events_by_event.setdefault(scheduled_event.event_to_exec, []).append(scheduled_event)
+        self._schedule_ids_by_event_id.setdefault(scheduled_event.event_to_exec.get_event_id(), {})[
+            scheduled_event.schedule_id] = None
+        bisect.insort(self._time_index, (scheduled_event.exec_time, scheduled_event.schedule_id))
+
+    def _remove_from_indexes(self, scheduled_event: ScheduledEvent):
+        """
+        Remove a scheduled event from all indexes.
+        :param scheduled_event: The scheduled event to remove.
+        """
+        del self._scheduled_events_by_id[scheduled_event.schedule_id]
+        scheduled_events = self._scheduled_events_by_event[scheduled_event.event_to_exec]
+        scheduled_events.remove(scheduled_event)
+        if not scheduled_events:
+            del self._scheduled_events_by_event[scheduled_event.event_to_exec]
+        event_id = scheduled_event.event_to_exec.get_event_id()
+        schedule_ids = self._schedule_ids_by_event_id[event_id]
+        del schedule_ids[scheduled_event.schedule_id]
+        if not schedule_ids:
+            del self._schedule_ids_by_event_id[event_id]
+        time_index_entry = (scheduled_event.exec_time, scheduled_event.schedule_id)
+        del self._time_index[bisect.bisect_left(self._time_index, time_index_entry)]
+
+    def _arm_wakeup_timer(self):
+        """
+        Arms the timer waking up the scheduling engine at the execution time of the next event in the execution heap.
+        The wall clock execution time is converted to a deadline on the monotonic event loop clock, which is at most
+        MAX_WAKEUP_INTERVAL_IN_SECONDS away, so the engine checks again what is due after a wall clock step.
+        Drops cancelled entries from the top of the heap.
+        """
+        if self._wakeup_timer is not None:
+            self._wakeup_timer.cancel()
+            self._wakeup_timer = None
+        while self._execution_heap and self._execution_heap[0][2].cancelled:
+            heapq.heappop(self._execution_heap)
+            self._cancelled_entry_count -= 1
+        if not self._execution_heap:
+            return
+        loop = asyncio.get_running_loop()
+        seconds_until_next_execution = (self._execution_heap[0][0] - datetime.now()).total_seconds()
+        self._wakeup_timer = loop.call_at(
+            loop.time() + min(max(seconds_until_next_execution, 0), MAX_WAKEUP_INTERVAL_IN_SECONDS),
+            self._wakeup_engine.set)
+
+    def get_scheduler_metrics(self) -> dict:
         """
-        exec_time = scheduling_event.exec_time.replace(second=0, microsecond=0)
+        Collects the firing lag and tick duration histograms, the queue sizes and the counts of skipped and caught up
+        executions of the scheduling engine.
+        :return: JSON serializable dict containing the metrics.
+        """
+        return {"firing_lag": self._firing_lag_histogram.to_dict(),
+                "tick_duration": self._tick_duration_histogram.to_dict(),
+                "queue": {"scheduled_events": len(self._scheduled_events_by_id),
+                          "heap_entries": len(self._execution_heap),
+                          "cancelled_heap_entries": self._cancelled_entry_count,
+                          "catch_up_replay_queue": len(self._catch_up_replay_queue)},
+                "skipped_past_grace_period": dict(self._skipped_event_counts),
+                "caught_up_executions": self._caught_up_execution_count,
+                "dropped_catch_up_executions": self._dropped_catch_up_execution_count}
+
+    def _log_structured_metrics(self, metric_type: str, **fields):
+        """
+        Logs a single json line for the metric if structured metrics logging is enabled.
+        :param metric_type: The type of the metric (e.g. "firing").
+        :param fields: The JSON serializable fields of the metric.
+        """
+        if self._structured_metrics_logging:
+            self.log.info(json.dumps({"metric": metric_type, **fields}))
+
+    def _schedule_event(self, scheduling_event: ScheduleEventExecutionEvent,
+                        previous_scheduled_event: Optional[ScheduledEvent] = None) -> Optional[ScheduledEvent]:
+        """
+        Stores the event of a scheduling event in the scheduling map, replacing a scheduled event with the same
+        schedule_id.
+        :param scheduling_event: The scheduling event to store.
+        :param previous_scheduled_event: The scheduled event that is scheduled again (e.g. rescheduled after its
+        execution) and no longer in the scheduling map - its position in the occurrences of its repeat rule is kept.
+        :return: The stored scheduled event or None if the scheduling event was invalid.
+        """
+        if not self._is_valid_repeat_rule(scheduling_event.repeat_policy, scheduling_event.repeat_rule):
+            return None
+        exec_time = scheduling_event.exec_time.replace(microsecond=0)
         scheduled_event = ScheduledEvent(exec_time, scheduling_event.event, scheduling_event.persist_after_reboot,
-                                         scheduling_event.repeat_policy, scheduling_event.grace_period_in_minutes)
-        if scheduling_event.persist_after_reboot:
-            self.log.debug(f"Writing persistent event {str(scheduled_event)} to storage.")
-            self.storage.append_or_add(scheduled_event.to_obj_rep(),
-                                       STORAGE_PERSISTENT_EVENTS_FIELD,
-                                       STORAGE_PERSISTENT_EVENTS_SECTION)
+                                         scheduling_event.repeat_policy, scheduling_event.grace_period_in_minutes,
+                                         scheduling_event.schedule_id, scheduling_event.repeat_rule,
+                                         scheduling_event.catch_up_policy, scheduling_event.catch_up_limit)
+        existing_scheduled_event = self._scheduled_events_by_id.get(scheduled_event.schedule_id)
+        if existing_scheduled_event is not None:
+            self._remove_event_from_execution_map(existing_scheduled_event)
+            scheduled_event.take_over_repeat_rule(existing_scheduled_event)
+        elif previous_scheduled_event is not None:
+            scheduled_event.take_over_repeat_rule(previous_scheduled_event)
+        # the journal entry of the scheduled event replaces the one kept for the replays
+        self._catch_up_only_entries.pop(scheduled_event.schedule_id, None)
         self._add_event_to_execution_map(exec_time, scheduled_event)
+        return scheduled_event
+
+    def _get_journal_entry(self, scheduled_event: ScheduledEvent) -> dict:
+        """
+        Creates the journal entry of a scheduled event, including its missed executions that were not replayed yet.
+        :param scheduled_event: The scheduled event to create the entry for.
+        :return: The json serializable journal entry.
+        """
+        journal_entry = scheduled_event.to_obj_rep()
+        pending_catch_up_executions = self._pending_catch_up_executions[scheduled_event.schedule_id]
+        if pending_catch_up_executions:
+            journal_entry[PERSISTENT_EVENT_FIELD_PENDING_CATCH_UP_EXECUTIONS] = pending_catch_up_executions
+        return journal_entry
 
-    async def _handle_unscheduling_event(self, unscheduling_event):
+    def _handle_scheduling_event(self, scheduling_event: ScheduleEventExecutionEvent,
+                                 previous_scheduled_event: Optional[ScheduledEvent] = None):
+        """
+        Handles a scheduling event and stores the event in the scheduling map. Also writes persistent events to the
+        journal.
+        :param scheduling_event: The scheduling event that is being handled.
+        :param previous_scheduled_event: The scheduled event that is scheduled again, see _schedule_event.
+        """
+        scheduled_event = self._schedule_event(scheduling_event, previous_scheduled_event)
+        if scheduled_event is not None and scheduled_event.persist_after_reboot:
+            self.log.debug(f"Writing persistent event {str(scheduled_event)} to journal.")
+            self.journal.put(scheduled_event.schedule_id, self._get_journal_entry(scheduled_event))
+
+    def _handle_scheduling_batch_event(self, scheduling_batch_event: ScheduleEventExecutionBatchEvent):
+        """
+        Handles a batch of scheduling events and stores all events in the scheduling map. The persistent events are
+        written to the journal at once.
+        :param scheduling_batch_event: The batch scheduling event that is being handled.
+        """
+        self.log.info(f"Scheduling a batch of {len(scheduling_batch_event.scheduling_events)} events")
+        scheduled_events = [self._schedule_event(scheduling_event)
+                            for scheduling_event in scheduling_batch_event.scheduling_events]
+        self.journal.put_all({scheduled_event.schedule_id: self._get_journal_entry(scheduled_event)
+                              for scheduled_event in scheduled_events
+                              if scheduled_event is not None and scheduled_event.persist_after_reboot})
+
+    def _handle_unscheduling_event(self, unscheduling_event):
         """
         Handles an unscheduling event and removes the event in the scheduling map. Also removes all following events
         and from persistence if wanted.
         :param unscheduling_event: event to unschedule
         """
         self.log.info("Unscheduling event: " + str(unscheduling_event.event_to_remove))
-        removed_scheduled_events = []
-        for exec_time in self._event_execution_map:
-            for scheduled_event in self._event_execution_map[exec_time]:
-                if scheduled_event.event_to_exec == unscheduling_event.event_to_remove:
-                    removed_scheduled_events.append((exec_time, scheduled_event))
+        removed_scheduled_events = list(self._scheduled_events_by_event.get(unscheduling_event.event_to_remove, []))
+        now = datetime.now()
         for removed_event in removed_scheduled_events:
-            self._event_execution_map[removed_event[0]].remove(removed_event[1])
-            self.log.info(
-                f"Removed {removed_event[1]} from execution map ({removed_event[1].event_to_exec.get_event_id()})")
-        if not unscheduling_event.remove_following_events:
-            await self._reschedule_events([ev[1] for ev in removed_scheduled_events])
-        if unscheduling_event.remove_from_persistence:
-            for event in [ev[1] for ev in removed_scheduled_events]:
-                self.log.info("Trying to remove " + str(event.to_obj_rep()) + " from persistence..")
-                self.storage.remove_obj_from_list(event.to_obj_rep(),
-                                                  STORAGE_PERSISTENT_EVENTS_FIELD,
-                                                  STORAGE_PERSISTENT_EVENTS_SECTION)
+            self._remove_event_from_execution_map(removed_event)
+            self.log.info(f"Removed {removed_event} from execution map ({removed_event.event_to_exec.get_event_id()})")
+        for event in removed_scheduled_events:
+            # a rescheduled persistent event replaces its journal entry as it keeps its schedule_id
+            rescheduled = not unscheduling_event.remove_following_events and self._reschedule_event(event, now)
+            if not rescheduled and event.persist_after_reboot and unscheduling_event.remove_from_persistence:
+                self.log.info(f"Removing {event.schedule_id} from persistence..")
+                self.journal.remove(event.schedule_id)
+
+    def _handle_rescheduling_event(self, rescheduling_event: RescheduleEventExecutionEvent) -> bool:
+        """
+        Handles a rescheduling event and moves the scheduled event with the given schedule_id to the new execution time.
+        :param rescheduling_event: The rescheduling event that is being handled.
+        :return: True if the scheduled event exists and was moved, False otherwise.
+        """
+        scheduled_event = self._scheduled_events_by_id.get(rescheduling_event.schedule_id)
+        if scheduled_event is None:
+            self.log.warning(f"Can not reschedule unknown scheduled event {rescheduling_event.schedule_id}")
+            return False
+        self.log.info(f"Rescheduling {scheduled_event.schedule_id} to {rescheduling_event.exec_time}")
+        self._handle_scheduling_event(scheduled_event.to_scheduling_event(rescheduling_event.exec_time))
+        return True
+
+    def _handle_removal_event(self, removal_event: RemoveScheduledEventEvent) -> bool:
+        """
+        Handles a removal event and removes the scheduled event with the given schedule_id from the execution map
+        and from persistence.
+        :param removal_event: The removal event that is being handled.
+        :return: True if the scheduled event existed and was removed, False otherwise.
+        """
+        scheduled_event = self._scheduled_events_by_id.get(removal_event.schedule_id)
+        if scheduled_event is None:
+            self.log.warning(f"Can not remove unknown scheduled event {removal_event.schedule_id}")
+            return False
+        self.log.info(f"Removing scheduled event {scheduled_event.schedule_id}")
+        self._remove_event_from_execution_map(scheduled_event)
+        if scheduled_event.persist_after_reboot:
+            self.journal.remove(scheduled_event.schedule_id)
+        return True
+
+    def _query_scheduled_events(self, query: GetScheduledEventsEvent) -> list[ScheduledEvent]:
+        """
+        Gets all scheduled events matching the filters of the query ordered by their execution time. Uses the index
+        that narrows down the candidates the most.
+        :param query: The query event containing the filters.
+        :return: The matching scheduled events.
+        """
+        if query.schedule_id is not None:
+            scheduled_event = self._scheduled_events_by_id.get(query.schedule_id)
+            candidates = [] if scheduled_event is None else [scheduled_event]
+        elif query.start is None and query.end is None and query.event_id is not None:
+            candidates = sorted((self._scheduled_events_by_id[schedule_id]
+                                 for schedule_id in self._schedule_ids_by_event_id.get(query.event_id, {})),
+                                key=lambda ev: (ev.exec_time, ev.schedule_id))
+        else:
+            start_index = 0 if query.start is None else bisect.bisect_left(self._time_index, (query.start,))
+            end_index = len(self._time_index) if query.end is None \
+                else bisect.bisect_left(self._time_index, (query.end,))
+            candidates = [self._scheduled_events_by_id[schedule_id]
+                          for _, schedule_id in self._time_index[start_index:end_index]]
+        return [ev for ev in candidates
+                if (query.event_id is None or ev.event_to_exec.get_event_id() == query.event_id)
+                and (query.start is None or ev.exec_time >= query.start)
+                and (query.end is None or ev.exec_time < query.end)]
 
     async def handle_specific_event(self, event: BaseEvent):
         if isinstance(event, ScheduleEventExecutionEvent):
             self._handle_scheduling_event(event)
+        elif isinstance(event, ScheduleEventExecutionBatchEvent):
+            self._handle_scheduling_batch_event(event)
         elif isinstance(event, UnscheduleEventExecutionEvent):
-            await self._handle_unscheduling_event(event)
+            self._handle_unscheduling_event(event)
+        elif isinstance(event, RescheduleEventExecutionEvent):
+            success = self._handle_rescheduling_event(event)
+            await self.put_event(ScheduleModificationResponseEvent(event.schedule_id, success).in_response_to(event))
+        elif isinstance(event, RemoveScheduledEventEvent):
+            success = self._handle_removal_event(event)
+            await self.put_event(ScheduleModificationResponseEvent(event.schedule_id, success).in_response_to(event))
+        elif isinstance(event, GetScheduledEventsEvent):
+            scheduled_events = self._query_scheduled_events(event)
+            end = None if event.limit is None else event.offset + event.limit
+            await self.put_event(
+                ScheduledEventsResponseEvent([ev.to_obj_rep() for ev in scheduled_events[event.offset:end]],
+                                             len(scheduled_events)).in_response_to(event))
 
-    async def _get_events_to_execute_now(self, now: datetime):
+    def _get_events_to_execute_now(self, now: datetime):
         """
-        Method for fetching all events that should be executed at this point in time and removed from the internal map.
-        :param now: The time the event checking was performed (=> when the async sleep ended).
+        Method for fetching all events that should be executed at this point in time and removed from the internal heap.
+        :param now: The time the event checking was performed (=> when the engine woke up).
         :return: all previously scheduled events that should be forwarded to the event bus now.
         """
         events_to_schedule = []
-        exec_times_to_remove = []
-        for exec_date in self._event_execution_map:
-            if now >= exec_date:
-                events_in_datetime = self._event_execution_map[exec_date]
-                exec_times_to_remove.append(exec_date)
-                for event in events_in_datetime:
-                    if now > exec_date + timedelta(minutes=event.grace_period_in_minutes):
-                        self.log.info(f"Event {str(event)} has passed an is past its grace period - skipping!")
-                        continue
-                    else:
-                        events_to_schedule.append(event.event_to_exec)
-        for exec_time in exec_times_to_remove:
-            executed_events = self._event_execution_map.pop(exec_time)
-            await self._reschedule_events(executed_events)
-            for event in executed_events:
-                # not called with events_to_schedule to also remove events past their grace period from persistence
-                if event.persist_after_reboot:
-                    self.log.info("Trying to remove " + str(event.to_obj_rep()) + " from persistence..")
-                    self.storage.remove_obj_from_list(event.to_obj_rep(),
-                                                      STORAGE_PERSISTENT_EVENTS_FIELD,
-                                                      STORAGE_PERSISTENT_EVENTS_SECTION)
+        executed_events = self._pop_due_events(now)
+        for event in executed_events:
+            if now > event.exec_time + timedelta(minutes=event.grace_period_in_minutes):
+                self._catch_up_missed_executions(event, now)
+            else:
+                lag = (now - event.exec_time).total_seconds()
+                self._firing_lag_histogram.record(lag)
+                self.log.debug(f"Firing {event.event_to_exec.get_event_id()} {lag * 1000:.1f}ms after its exec_time")
+                self._log_structured_metrics("scheduler_firing", schedule_id=event.schedule_id,
+                                             event_id=event.event_to_exec.get_event_id(),
+                                             exec_time=event.exec_time.isoformat(), lag_ms=round(lag * 1000, 3))
+                events_to_schedule.append(event.event_to_exec)
+        for event in executed_events:
+            # not called with events_to_schedule to also remove events past their grace period from persistence
+            if self._reschedule_event(event, now) or not event.persist_after_reboot:
+                continue
+            if self._pending_catch_up_executions[event.schedule_id]:
+                self.log.info(f"Keeping {event.schedule_id} in persistence until its missed executions were replayed")
+                self._catch_up_only_entries[event.schedule_id] = {**self._get_journal_entry(event),
+                                                                  PERSISTENT_EVENT_FIELD_CATCH_UP_ONLY: True}
+                self.journal.put(event.schedule_id, self._catch_up_only_entries[event.schedule_id])
+            else:
+                self.log.info(f"Removing {event.schedule_id} from persistence..")
+                self.journal.remove(event.schedule_id)
         return events_to_schedule
 
-    async def _reschedule_events(self, executed_events):
+    def _catch_up_missed_executions(self, missed_event: ScheduledEvent, now: datetime):
         """
-        Internal method for rescheduling events that have a repeat policy defined
-        :param executed_events: A list containing all executed event that need to be checked for a re-schedule
+        Handles a scheduled event that is past its grace period according to its catch up policy. The executions to
+        catch up on are queued for the rate limited _catch_up_replay_task and persisted with the journal entry of the
+        event once it is rescheduled or kept.
+        :param missed_event: The scheduled event that is past its grace period.
+        :param now: The time the event checking was performed.
         """
-        for event in executed_events:
-            if event.repeat_policy is EventRepeatPolicy.NoRepeat:
-                continue
-            next_exec_time = event.exec_time
-            while next_exec_time < datetime.now():
-                next_exec_time = get_next_execution_time_for_policy(next_exec_time, event.repeat_policy)
-            await self.put_event(
-                ScheduleEventExecutionEvent(next_exec_time, event.event_to_exec, event.persist_after_reboot,
-                                            event.repeat_policy, event.grace_period_in_minutes))
+        if missed_event.catch_up_policy is CatchUpPolicy.Skip:
+            self.log.info(f"Event {str(missed_event)} has passed an is past its grace period - skipping!")
+            self._skipped_event_counts[missed_event.event_to_exec.get_event_id()] += 1
+            self._log_structured_metrics("scheduler_skip", schedule_id=missed_event.schedule_id,
+                                         event_id=missed_event.event_to_exec.get_event_id(),
+                                         exec_time=missed_event.exec_time.isoformat(),
+                                         lag_ms=round((now - missed_event.exec_time).total_seconds() * 1000, 3))
+            return
+        if missed_event.catch_up_policy is CatchUpPolicy.FireOnce:
+            missed_execution_count = 1
+        else:
+            missed_execution_count = count_execution_times_until(missed_event.exec_time, missed_event.repeat_policy,
+                                                                 now, missed_event.catch_up_limit,
+                                                                 missed_event.get_repeat_rule())
+        self.log.info(f"Catching up on {missed_execution_count} missed executions of {missed_event.schedule_id}")
+        self._queue_catch_up_replays(missed_event.schedule_id, missed_event.event_to_exec, missed_execution_count)
+
+    def _queue_catch_up_replays(self, schedule_id: str, event: SchedulableEvent, missed_execution_count: int):
+        """
+        Queues missed executions of a scheduled event for the _catch_up_replay_task.
+        :param schedule_id: The schedule_id of the scheduled event.
+        :param event: The event to replay.
+        :param missed_execution_count: How often the event has to be replayed.
+        """
+        for queued_execution_count in range(missed_execution_count):
+            if len(self._catch_up_replay_queue) >= MAX_CATCH_UP_REPLAY_QUEUE_SIZE:
+                self.log.warning(f"Catch up replay queue is full - dropping missed executions of {schedule_id}")
+                self._dropped_catch_up_execution_count += missed_execution_count - queued_execution_count
+                break
+            self._catch_up_replay_queue.append((schedule_id, event))
+            self._pending_catch_up_executions[schedule_id] += 1
+        self._catch_up_replay_pending.set()
+
+    def _advance_catch_up_replays(self, schedule_id: str):
+        """
+        Updates the persisted missed executions of a scheduled event after one of them was replayed. The journal entry
+        of an event without further executions is removed once all of them were replayed.
+        :param schedule_id: The schedule_id of the replayed scheduled event.
+        """
+        self._pending_catch_up_executions[schedule_id] -= 1
+        pending_catch_up_executions = self._pending_catch_up_executions[schedule_id]
+        if pending_catch_up_executions <= 0:
+            del self._pending_catch_up_executions[schedule_id]
+        catch_up_only_entry = self._catch_up_only_entries.get(schedule_id)
+        if catch_up_only_entry is not None:
+            if pending_catch_up_executions <= 0:
+                del self._catch_up_only_entries[schedule_id]
+                self.log.info(f"Removing {schedule_id} from persistence..")
+                self.journal.remove(schedule_id)
+                return
+            catch_up_only_entry[PERSISTENT_EVENT_FIELD_PENDING_CATCH_UP_EXECUTIONS] = pending_catch_up_executions
+            self.journal.put(schedule_id, catch_up_only_entry)
+            return
+        scheduled_event = self._scheduled_events_by_id.get(schedule_id)
+        if scheduled_event is not None and scheduled_event.persist_after_reboot:
+            self.journal.put(schedule_id, self._get_journal_entry(scheduled_event))
+
+    async def _catch_up_replay_task(self):
+        """
+        Task for replaying the missed executions queued by _catch_up_missed_executions. Replays one execution every
+        CATCH_UP_REPLAY_INTERVAL_IN_SECONDS.
+        """
+        while True:
+            await self._catch_up_replay_pending.wait()
+            while self._catch_up_replay_queue:
+                schedule_id, event = self._catch_up_replay_queue.popleft()
+                self.log.info(f"Replaying missed execution of {event}")
+                await self.put_event(event)
+                # only counted once replayed, queued executions may still be dropped or lost
+                self._caught_up_execution_count += 1
+                self._advance_catch_up_replays(schedule_id)
+                await asyncio.sleep(CATCH_UP_REPLAY_INTERVAL_IN_SECONDS)
+            self._catch_up_replay_pending.clear()
+
+    def _reschedule_event(self, executed_event: ScheduledEvent, now: datetime) -> bool:
+        """
+        Internal method for rescheduling an event that has a repeat policy defined to its first occurrence after now.
+        The rescheduled event keeps the schedule_id of the executed event.
+        :param executed_event: The executed event that needs to be checked for a re-schedule.
+        :param now: The time the next occurrence has to lie after.
+        :return: True if the event was rescheduled, False otherwise.
+        """
+        if executed_event.repeat_policy is EventRepeatPolicy.NoRepeat:
+            return False
+        next_exec_time = get_next_execution_time_after(executed_event.exec_time, executed_event.repeat_policy, now,
+                                                       executed_event.get_repeat_rule())
+        if next_exec_time is None:
+            self.log.info(f"Repeat rule of {executed_event.schedule_id} has no further occurrences.")
+            return False
+        self._handle_scheduling_event(executed_event.to_scheduling_event(next_exec_time), executed_event)
+        return True
 
     async def _scheduling_engine_task(self):
         """
-        Task for checking which events to execute at the given time. Will always fire around XX:XX:00.
+        Task for executing the scheduled events. Sleeps until the wakeup timer fires for the next due event or until an
+        event is scheduled that is due before it.
         """
         while True:
-            now = datetime.now()
-            events = await self._get_events_to_execute_now(now)
+            tick_start = time.perf_counter()
+            events = self._get_events_to_execute_now(datetime.now())
             for event in events:
                 self.log.info(f"Executing prior scheduled event {event}")
                 await self.put_event(event)
-            now = datetime.now()
-            await asyncio.sleep(60 - now.second)
+            tick_duration = time.perf_counter() - tick_start
+            self._tick_duration_histogram.record(tick_duration)
+            self._log_structured_metrics("scheduler_tick", fired_events=len(events),
+                                         duration_ms=round(tick_duration * 1000, 3),
+                                         scheduled_events=len(self._scheduled_events_by_id),
+                                         catch_up_replay_queue=len(self._catch_up_replay_queue))
+            self._wakeup_engine.clear()
+            self._arm_wakeup_timer()
+            await self._wakeup_engine.wait()
@@ -0,0 +1,63 @@
+from datetime import datetime
+from typing import Optional, Union
+
+from dateutil.rrule import rrule, rruleset
+
+RULE_DATETIME_FORMAT = "%Y%m%dT%H%M%S"
+
+
+class RepeatRule:
+    """
+    Iterator over the occurrences of an RFC 5545 recurrence rule (RRULE) used by the EventRepeatPolicy.Rule. Keeps its
+    position in the occurrences of the rule, so looking up the next occurrence after the last one only advances the
+    rule by a step instead of iterating all occurrences since its DTSTART again. As the position is state of a single
+    schedule, every scheduled event uses its own RepeatRule - only the compiled rule is shared
+    (see scheduling_helper.compile_repeat_rule).
+    """
+
+    def __init__(self, rule_text: str, rule: Union[rrule, rruleset]):
+        """
+        Initializes the RepeatRule at the DTSTART of the rule.
+        :param rule_text: The rule in RFC 5545 format including a DTSTART line.
+        :param rule: The compiled rule.
+        """
+        self.rule_text = rule_text
+        self._rule = rule
+        self._restart()
+
+    @staticmethod
+    def normalize_rule_text(rule: str, dtstart: datetime) -> str:
+        """
+        Normalizes a recurrence rule to the RFC 5545 format including a DTSTART line, so its occurrences stay anchored
+        to the same start when the rule is compiled again (e.g. after a reboot).
+        :param rule: The rule, either complete or only the rule part (e.g. "FREQ=DAILY;BYHOUR=7").
+        :param dtstart: The start of the rule, used if the rule does not contain a DTSTART line.
+        :return: The normalized rule text.
+        """
+        rule = rule.strip()
+        if "DTSTART" in rule.upper():
+            return rule
+        if not rule.upper().startswith("RRULE:"):
+            rule = "RRULE:" + rule
+        return f"DTSTART:{dtstart.strftime(RULE_DATETIME_FORMAT)}\n{rule}"
+
+    def _restart(self):
+        """
+        Restarts the iteration over the occurrences of the rule at its DTSTART.
+        """
+        self._occurrences = iter(self._rule)
+        self._previous_occurrence: Optional[datetime] = None
+        self._current_occurrence: Optional[datetime] = next(self._occurrences, None)
+
+    def get_next_occurrence_after(self, after: datetime) -> Optional[datetime]:
+        """
+        Gets the first occurrence of the rule after the passed time.
+        :param after: The time the occurrence has to lie after.
+        :return: The first occurrence after the passed time or None if the rule has no more occurrences.
+        """
+        if self._previous_occurrence is not None and after < self._previous_occurrence:
+            self._restart()
+        while self._current_occurrence is not None and self._current_occurrence <= after:
+            self._previous_occurrence = self._current_occurrence
+            self._current_occurrence = next(self._occurrences, None)
+        return self._current_occurrence
@@ -1,9 +1,29 @@
 from datetime import datetime
+from typing import Optional
 
+from core_modules.scheduling.CatchUpPolicy import CatchUpPolicy
 from core_modules.scheduling.EventRepeatPolicy import EventRepeatPolicy
+from core_modules.scheduling.RepeatRule import RepeatRule
 from core_modules.scheduling.SchedulableEvent import SchedulableEvent
+from core_modules.scheduling.SchedulingEvents import ScheduleEventExecutionEvent, DEFAULT_CATCH_UP_LIMIT
+from core_modules.scheduling.scheduling_helper import create_repeat_rule
 
-EXEC_DATETIME_FORMAT = "%Y-%m-%dT%H:%M"
+EXEC_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+# format used before second precision was supported - still accepted when parsing
+LEGACY_EXEC_DATETIME_FORMAT = "%Y-%m-%dT%H:%M"
+
+
+def parse_exec_time(exec_time: str) -> datetime:
+    """
+    Parses an execution time in either the EXEC_DATETIME_FORMAT or the LEGACY_EXEC_DATETIME_FORMAT.
+    :param exec_time: The execution time str to parse.
+    :return: The parsed datetime.
+    :raises ValueError: If the str matches neither format.
+    """
+    try:
+        return datetime.strptime(exec_time, EXEC_DATETIME_FORMAT)
+    except ValueError:
+        return datetime.strptime(exec_time, LEGACY_EXEC_DATETIME_FORMAT)
 
 
 class ScheduledEvent:
@@ -13,16 +33,57 @@ class ScheduledEvent:
     """
 
     def __init__(self, exec_time: datetime, event_to_exec: SchedulableEvent, persist_after_reboot: bool,
-                 repeat_policy: EventRepeatPolicy, grace_period_in_minutes: int):
+                 repeat_policy: EventRepeatPolicy, grace_period_in_minutes: int, schedule_id: str,
+                 repeat_rule: Optional[str] = None, catch_up_policy: CatchUpPolicy = CatchUpPolicy.Skip,
+                 catch_up_limit: int = DEFAULT_CATCH_UP_LIMIT):
+        self.schedule_id = schedule_id
         self.exec_time = exec_time
         self.event_to_exec = event_to_exec
         self.persist_after_reboot = persist_after_reboot
         self.repeat_policy = repeat_policy
         self.grace_period_in_minutes = grace_period_in_minutes
+        self.repeat_rule = repeat_rule
+        self.catch_up_policy = catch_up_policy
+        self.catch_up_limit = catch_up_limit
+        # set once the event was unscheduled, the entry is then skipped by the scheduling engine
+        self.cancelled = False
+        self._repeat_rule_iterator: Optional[RepeatRule] = None
+
+    def get_repeat_rule(self) -> Optional[RepeatRule]:
+        """
+        Gets the RepeatRule keeping the position of this scheduled event in the occurrences of its repeat_rule.
+        :return: The RepeatRule, created on first use, or None if the event has no repeat_rule.
+        """
+        if self.repeat_rule is not None and self._repeat_rule_iterator is None:
+            self._repeat_rule_iterator = create_repeat_rule(self.repeat_rule)
+        return self._repeat_rule_iterator
+
+    def take_over_repeat_rule(self, previous_scheduled_event: "ScheduledEvent"):
+        """
+        Continues the position in the occurrences of the repeat_rule of the scheduled event this one replaces (e.g. when
+        rescheduled to its next occurrence), instead of iterating the occurrences from the DTSTART again.
+        :param previous_scheduled_event: The replaced scheduled event.
+        """
+        if previous_scheduled_event.repeat_rule == self.repeat_rule:
+            self._repeat_rule_iterator = previous_scheduled_event._repeat_rule_iterator
 
     def to_obj_rep(self):
-        return {"exec_time": self.exec_time.strftime(EXEC_DATETIME_FORMAT),
+        return {"schedule_id": self.schedule_id,
+                "exec_time": self.exec_time.strftime(EXEC_DATETIME_FORMAT),
                 "grace_period_in_minutes": self.grace_period_in_minutes,
                 "persist_after_reboot": self.persist_after_reboot,
                 "repeat_policy": self.repeat_policy.value,
+                "repeat_rule": self.repeat_rule,
+                "catch_up_policy": self.catch_up_policy.value,
+                "catch_up_limit": self.catch_up_limit,
                 "event": self.event_to_exec.to_json()}
+
+    def to_scheduling_event(self, exec_time: datetime) -> ScheduleEventExecutionEvent:
+        """
+        Creates a scheduling event scheduling this event again with the same schedule_id and settings.
+        :param exec_time: The time the event will be executed at.
+        :return: The scheduling event.
+        """
+        return ScheduleEventExecutionEvent(exec_time, self.event_to_exec, self.persist_after_reboot, self.repeat_policy,
+                                           self.grace_period_in_minutes, self.schedule_id, self.repeat_rule,
+                                           self.catch_up_policy, self.catch_up_limit)
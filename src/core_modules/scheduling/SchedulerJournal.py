@@ -0,0 +1,206 @@
+import json
+import os
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+from core_modules.logging.lis_logging import get_logger
+
+JOURNAL_RECORD_FIELD_OPERATION = "op"
+JOURNAL_RECORD_FIELD_SCHEDULE_ID = "schedule_id"
+JOURNAL_RECORD_FIELD_ENTRY = "entry"
+
+JOURNAL_OPERATION_PUT = "put"
+JOURNAL_OPERATION_REMOVE = "remove"
+
+# the journal is only compacted once it contains enough records to make rewriting it worth it
+MIN_RECORDS_FOR_COMPACTION = 256
+
+
+class SchedulerJournal:
+    """
+    Append-only journal persisting the scheduled events of the EventScheduler. Each schedule and removal is appended
+    as a single json line keyed by the stable schedule_id of the scheduled event, so changes never rewrite the whole
+    file. The journal is compacted to the currently scheduled entries once superseded records dominate it.
+    The entries are kept in memory, so only the file I/O is handed to the I/O worker if one is set.
+    """
+
+    log = get_logger(__name__)
+
+    def __init__(self, path: str, submit_io: Optional[Callable[..., Future]] = None):
+        """
+        Initializes the SchedulerJournal and replays the existing journal file.
+        :param path: The path to the .jsonl journal file to use, created if it does not exist.
+        :param submit_io: Runs the file I/O on a worker thread in the order it was submitted (e.g.
+        AsyncStorageManager.submit_io), None to run it directly.
+        """
+        self.journal_file_path = path
+        self._submit_io = submit_io
+        self._entries: dict[str, dict] = {}
+        self._record_count = 0
+        # set while a write to the journal file is in progress, so a write interrupted by an error is detected
+        self._line_interrupted = False
+        journal_file_intact = self._replay()
+        self._journal_file = open(self.journal_file_path, "a", encoding="utf-8")
+        if not journal_file_intact:
+            # appending to a torn last line would corrupt the next record as well
+            self.log.warning(f"Rewriting {self.journal_file_path} without its invalid records.")
+            self._rewrite_journal_file(list(self._entries.items()))
+            self._record_count = len(self._entries)
+
+    def _replay(self) -> bool:
+        """
+        Replays all records of the journal file to restore the currently scheduled entries. Lines that can not be parsed
+        (e.g. a record that was only partially written before a crash) are skipped.
+        :return: False if the journal file contains invalid records or does not end with a complete line, True otherwise.
+        """
+        if not os.path.exists(self.journal_file_path):
+            return True
+        journal_file_intact = True
+        with open(self.journal_file_path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.endswith("\n"):
+                    journal_file_intact = False
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    self._apply_record(record)
+                except (json.decoder.JSONDecodeError, KeyError, TypeError):
+                    self.log.error(f"Skipping invalid record in line {line_number} of {self.journal_file_path}")
+                    journal_file_intact = False
+                    continue
+                self._record_count += 1
+        self.log.info(f"Replayed {self._record_count} records containing {len(self._entries)} scheduled events.")
+        return journal_file_intact
+
+    def _apply_record(self, record: dict) -> None:
+        """
+        Applies a single journal record to the current entries.
+        :param record: The record to apply.
+        """
+        schedule_id = record[JOURNAL_RECORD_FIELD_SCHEDULE_ID]
+        if record[JOURNAL_RECORD_FIELD_OPERATION] == JOURNAL_OPERATION_PUT:
+            self._entries[schedule_id] = record[JOURNAL_RECORD_FIELD_ENTRY]
+        elif record[JOURNAL_RECORD_FIELD_OPERATION] == JOURNAL_OPERATION_REMOVE:
+            self._entries.pop(schedule_id, None)
+
+    def get_entries(self) -> dict[str, dict]:
+        """
+        Gets all currently scheduled entries.
+        :return: A dict mapping the schedule_ids to their entries.
+        """
+        return dict(self._entries)
+
+    def put(self, schedule_id: str, entry: dict) -> None:
+        """
+        Adds or replaces the entry with the given schedule_id.
+        :param schedule_id: The stable id of the scheduled event.
+        :param entry: The json serializable representation of the scheduled event.
+        """
+        self._entries[schedule_id] = entry
+        self._append_records([{JOURNAL_RECORD_FIELD_OPERATION: JOURNAL_OPERATION_PUT,
+                               JOURNAL_RECORD_FIELD_SCHEDULE_ID: schedule_id,
+                               JOURNAL_RECORD_FIELD_ENTRY: entry}])
+
+    def put_all(self, entries: dict[str, dict]) -> None:
+        """
+        Adds or replaces multiple entries with a single write to the journal file.
+        :param entries: The json serializable representations of the scheduled events by their schedule_id.
+        """
+        self._entries.update(entries)
+        self._append_records([{JOURNAL_RECORD_FIELD_OPERATION: JOURNAL_OPERATION_PUT,
+                               JOURNAL_RECORD_FIELD_SCHEDULE_ID: schedule_id,
+                               JOURNAL_RECORD_FIELD_ENTRY: entry} for schedule_id, entry in entries.items()])
+
+    def remove(self, schedule_id: str) -> None:
+        """
+        Removes the entry with the given schedule_id if it exists.
+        :param schedule_id: The stable id of the scheduled event.
+        """
+        if self._entries.pop(schedule_id, None) is None:
+            return
+        self._append_records([{JOURNAL_RECORD_FIELD_OPERATION: JOURNAL_OPERATION_REMOVE,
+                               JOURNAL_RECORD_FIELD_SCHEDULE_ID: schedule_id}])
+
+    def _run_io(self, func: Callable, *args) -> None:
+        """
+        Runs file I/O on the I/O worker if one is set, directly otherwise. Errors of the worker are logged.
+        :param func: The function doing the I/O.
+        """
+        if self._submit_io is None:
+            func(*args)
+            return
+        self._submit_io(func, *args).add_done_callback(self._log_io_error)
+
+    def _log_io_error(self, future: Future) -> None:
+        """
+        Done callback logging the error the file I/O on the worker ended with.
+        :param future: The future of the finished I/O.
+        """
+        if future.exception() is not None:
+            self.log.error(f"Writing {self.journal_file_path} failed: {future.exception()!r}")
+
+    def _append_records(self, records: list[dict]) -> None:
+        """
+        Appends records to the journal file with a single write and compacts the journal if necessary.
+        :param records: The records to append.
+        """
+        self._run_io(self._write_lines, "".join(json.dumps(record) + "\n" for record in records))
+        self._record_count += len(records)
+        if self._record_count > MIN_RECORDS_FOR_COMPACTION and self._record_count > 2 * len(self._entries):
+            self.compact()
+
+    def _write_lines(self, lines: str) -> None:
+        """
+        Appends the serialized records to the journal file.
+        :param lines: The records as json lines.
+        """
+        if self._line_interrupted:
+            # a failed write may have left a partial record, which must not swallow the following records
+            lines = "\n" + lines
+        self._line_interrupted = True
+        self._journal_file.write(lines)
+        self._journal_file.flush()
+        self._line_interrupted = False
+
+    def compact(self) -> None:
+        """
+        Rewrites the journal so it only contains a single record per currently scheduled entry.
+        """
+        self.log.debug(f"Compacting journal from {self._record_count} records to {len(self._entries)} records.")
+        self._run_io(self._rewrite_journal_file, list(self._entries.items()))
+        self._record_count = len(self._entries)
+
+    def _rewrite_journal_file(self, entries: list[tuple[str, dict]]) -> None:
+        """
+        Rewrites the journal file with a single record per entry. The compacted journal is written to a temporary file
+        first and then atomically replaces the old journal.
+        :param entries: The currently scheduled entries as (schedule_id, entry) tuples.
+        """
+        tmp_file_path = self.journal_file_path + ".tmp"
+        with open(tmp_file_path, "w", encoding="utf-8") as f:
+            for schedule_id, entry in entries:
+                f.write(json.dumps({JOURNAL_RECORD_FIELD_OPERATION: JOURNAL_OPERATION_PUT,
+                                    JOURNAL_RECORD_FIELD_SCHEDULE_ID: schedule_id,
+                                    JOURNAL_RECORD_FIELD_ENTRY: entry}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_file.close()
+        os.replace(tmp_file_path, self.journal_file_path)
+        self._journal_file = open(self.journal_file_path, "a", encoding="utf-8")
+
+    def close(self) -> None:
+        """
+        Syncs the journal file to disk and closes it, after all previously submitted I/O.
+        """
+        self._run_io(self._close_journal_file)
+
+    def _close_journal_file(self) -> None:
+        """
+        Syncs the journal file to disk and closes it.
+        """
+        if self._journal_file.closed:
+            return
+        self._journal_file.flush()
+        os.fsync(self._journal_file.fileno())
+        self._journal_file.close()
@@ -1,15 +1,26 @@
+import asyncio
 import json
 from typing import Callable, Union
 
 from core_modules.logging.lis_logging import get_logger
 from core_modules.rest.AbstractBaseApi import AbstractBaseApi
-from core_modules.rest.RestServer import REST_METHOD_POST
+from core_modules.rest.RestServer import REST_METHOD_POST, REST_METHOD_GET, REST_METHOD_PUT, REST_METHOD_DELETE
 from core_modules.rest.request_util import get_bool_from_args_obj, get_string_from_args_obj, get_int_from_args_obj
+from core_modules.scheduling.CatchUpPolicy import CatchUpPolicy
 from core_modules.scheduling.EventRepeatPolicy import EventRepeatPolicy
-from core_modules.scheduling.ScheduledEvent import EXEC_DATETIME_FORMAT
-from core_modules.scheduling.SchedulingEvents import ScheduleEventExecutionEvent, DEFAULT_GRACE_PERIOD_IN_MINUTES
+from core_modules.scheduling.RepeatRule import RepeatRule
+from core_modules.scheduling.ScheduledEvent import EXEC_DATETIME_FORMAT, parse_exec_time
+from core_modules.scheduling.SchedulingEvents import ScheduleEventExecutionEvent, DEFAULT_GRACE_PERIOD_IN_MINUTES, \
+    GetScheduledEventsEvent, ScheduledEventsResponseEvent, RescheduleEventExecutionEvent, RemoveScheduledEventEvent, \
+    ScheduleModificationResponseEvent, ScheduleEventExecutionBatchEvent, DEFAULT_CATCH_UP_LIMIT
+from core_modules.scheduling.scheduling_helper import compile_repeat_rule
 from datetime import datetime
 
+DEFAULT_SCHEDULES_PAGE_SIZE = 50
+MAX_SCHEDULES_PAGE_SIZE = 500
+MAX_SCHEDULE_BATCH_SIZE = 1000
+MAX_CATCH_UP_LIMIT = 100
+
 
 class SchedulingApi(AbstractBaseApi):
     """
@@ -18,13 +29,19 @@ class SchedulingApi(AbstractBaseApi):
 
     log = get_logger(__name__)
 
-    def __init__(self, put_event: Callable, event_mapping_func: Callable):
+    def __init__(self, put_event: Callable, request: Callable, event_mapping_func: Callable):
         self.put_event = put_event
+        self.request = request
         self._event_mapping_func = event_mapping_func
 
     def register_endpoints(self, register_handler: Callable):
         self.log.debug("Registering api endpoints...")
         register_handler("/schedule", REST_METHOD_POST, self.handle_schedule_request)
+        register_handler("/schedule/batch", REST_METHOD_POST, self.handle_schedule_batch_request)
+        register_handler("/schedule", REST_METHOD_GET, self.handle_get_schedule_request)
+        register_handler("/schedule", REST_METHOD_PUT, self.handle_reschedule_request)
+        register_handler("/schedule", REST_METHOD_DELETE, self.handle_delete_schedule_request)
+        register_handler("/schedules", REST_METHOD_GET, self.handle_list_schedules_request)
 
     def _parse_exec_time(self, exec_time: str) -> Union[datetime | None]:
         """
@@ -34,13 +51,31 @@ class SchedulingApi(AbstractBaseApi):
         """
         if exec_time is not None:
             try:
-                exec_time = datetime.strptime(exec_time, EXEC_DATETIME_FORMAT)
+                exec_time = parse_exec_time(exec_time)
                 return exec_time
             except ValueError:
                 self.log.error(f"Supplied time {exec_time} did not conform to format {EXEC_DATETIME_FORMAT}")
                 return None
         return None
 
+    def _parse_repeat_rule(self, repeat_rule: str, exec_time: datetime) -> Union[str | None]:
+        """
+        Normalizes and validates the repeat_rule param of the schedule request. Rules without a DTSTART start at the
+        exec_time of the request.
+        :param repeat_rule: The RFC 5545 recurrence rule str to parse (e.g. "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR").
+        :param exec_time: The parsed exec_time of the request.
+        :return: The normalized rule if it is valid, None otherwise
+        """
+        if repeat_rule is None:
+            return None
+        repeat_rule = RepeatRule.normalize_rule_text(repeat_rule, exec_time)
+        try:
+            compile_repeat_rule(repeat_rule)
+        except ValueError as e:
+            self.log.error(f"Supplied repeat_rule {repeat_rule} is invalid: {e}")
+            return None
+        return repeat_rule
+
     def _load_event_json(self, event_json: str) -> Union[dict | None]:
         """
         Loads the event_json str into a dict
@@ -53,6 +88,46 @@ class SchedulingApi(AbstractBaseApi):
             self.log.error(f"Supplied event {event_json} is not valid JSON!")
             return None
 
+    def _create_scheduling_event(self, exec_time: str, event_dict: dict, persist: bool, repeat_policy: str,
+                                 repeat_rule: str, grace_period_minutes: int, catch_up_policy: str,
+                                 catch_up_limit: int) -> ScheduleEventExecutionEvent:
+        """
+        Validates the parameters of a schedule request and creates the corresponding scheduling event.
+        :param exec_time: The unparsed time to execute the event at.
+        :param event_dict: The json representation of the event to schedule.
+        :param persist: Whether the event will persist after a system reboot.
+        :param repeat_policy: The name of the repeat policy.
+        :param repeat_rule: The RFC 5545 recurrence rule, only used with the repeat policy Rule.
+        :param grace_period_minutes: Grace period after which the event will no longer be executed on time.
+        :param catch_up_policy: The name of the policy for executions missed by more than the grace period.
+        :param catch_up_limit: The maximum number of missed executions replayed with CatchUpPolicy.FireAll.
+        :return: The scheduling event.
+        :raises ValueError: If a parameter is invalid, containing the error message for the response.
+        """
+        parsed_exec_time = self._parse_exec_time(exec_time)
+        if parsed_exec_time is None:
+            raise ValueError(f"Supplied exec_time is not parseable! {exec_time}")
+
+        repeat_policy = EventRepeatPolicy.get_event_repeat_policy_from_name(repeat_policy)
+        if repeat_policy is EventRepeatPolicy.Rule:
+            repeat_rule = self._parse_repeat_rule(repeat_rule, parsed_exec_time)
+            if repeat_rule is None:
+                raise ValueError("Supplied repeat_rule is not a valid RFC 5545 recurrence rule!")
+        else:
+            repeat_rule = None
+
+        if not 0 < catch_up_limit <= MAX_CATCH_UP_LIMIT:
+            raise ValueError(f"catch_up_limit has to be between 1 and {MAX_CATCH_UP_LIMIT}!")
+
+        event_to_schedule = self._event_mapping_func(event_dict)
+        if event_to_schedule is None:
+            raise ValueError("Event could not be mapped to registered event!")
+
+        return ScheduleEventExecutionEvent(parsed_exec_time, event_to_schedule, persist, repeat_policy,
+                                           grace_period_minutes, repeat_rule=repeat_rule,
+                                           catch_up_policy=CatchUpPolicy.get_catch_up_policy_from_name(catch_up_policy),
+                                           catch_up_limit=catch_up_limit)
+
     async def handle_schedule_request(self, args):
         """
         Endpoint handler for the /schedule endpoint.
@@ -63,25 +138,170 @@ class SchedulingApi(AbstractBaseApi):
         exec_time = get_string_from_args_obj("exec_time", args)
         persist = get_bool_from_args_obj("persist_after_reboot", args, False)
         repeat_policy = get_string_from_args_obj("repeat_policy", args)
+        repeat_rule = get_string_from_args_obj("repeat_rule", args)
         grace_period_minutes = get_int_from_args_obj("grace_period_in_minutes", args, DEFAULT_GRACE_PERIOD_IN_MINUTES)
+        catch_up_policy = get_string_from_args_obj("catch_up_policy", args)
+        try:
+            catch_up_limit = get_int_from_args_obj("catch_up_limit", args, DEFAULT_CATCH_UP_LIMIT)
+        except ValueError:
+            return 400, "catch_up_limit has to be an integer!"
 
         event_json = get_string_from_args_obj("event", args)
 
-        exec_time = self._parse_exec_time(exec_time)
-        if exec_time is None:
-            return 400, f"Supplied exec_time is not parseable! {exec_time}"
-
         event_dict = self._load_event_json(event_json)
         if event_dict is None:
             return 400, "Supplied event is not valid JSON!"
 
-        repeat_policy = EventRepeatPolicy.get_event_repeat_policy_from_name(repeat_policy)
+        try:
+            scheduling_event = self._create_scheduling_event(exec_time, event_dict, persist, repeat_policy,
+                                                             repeat_rule, grace_period_minutes, catch_up_policy,
+                                                             catch_up_limit)
+        except ValueError as e:
+            return 400, str(e)
 
-        event_to_schedule = self._event_mapping_func(event_dict)
-        if event_to_schedule is None:
-            return 400, "Event could not be mapped to registered event!"
+        self.log.info("Sending event to schedule " + str(scheduling_event.event) + " for execution at "
+                      + str(scheduling_event.exec_time))
+        await self.put_event(scheduling_event)
+        return 200, {"schedule_id": scheduling_event.schedule_id}
+
+    async def handle_schedule_batch_request(self, args):
+        """
+        Endpoint handler for the /schedule/batch endpoint. Schedules all events of the schedules param - a json array
+        of objects with the same fields as the params of the /schedule endpoint. Either all schedules are valid and get
+        scheduled at once or none of them are scheduled.
+        :param args: contains the arguments of the request
+        :return: Tuple containing of (status_code, response)
+        """
+        schedules_json = get_string_from_args_obj("schedules", args)
+        if schedules_json is None:
+            return 400, "Missing schedules!"
+        schedules = self._load_event_json(schedules_json)
+        if not isinstance(schedules, list) or not schedules:
+            return 400, "Supplied schedules are not a non-empty JSON array!"
+        if len(schedules) > MAX_SCHEDULE_BATCH_SIZE:
+            return 400, f"A batch can contain at most {MAX_SCHEDULE_BATCH_SIZE} schedules!"
+        self.log.info(f"Received request to schedule a batch of {len(schedules)} events!")
+
+        scheduling_events = []
+        errors = {}
+        for index, schedule in enumerate(schedules):
+            try:
+                if not isinstance(schedule, dict):
+                    raise ValueError("Schedule is not a JSON object!")
+                event_dict = schedule.get("event")
+                if isinstance(event_dict, str):
+                    event_dict = self._load_event_json(event_dict)
+                if not isinstance(event_dict, dict):
+                    raise ValueError("Supplied event is not valid JSON!")
+                if any(not isinstance(schedule.get(field), (str, type(None)))
+                       for field in ("exec_time", "repeat_policy", "repeat_rule", "catch_up_policy")):
+                    raise ValueError("exec_time, repeat_policy, repeat_rule and catch_up_policy have to be strings!")
+                persist = schedule.get("persist_after_reboot", False)
+                grace_period_minutes = schedule.get("grace_period_in_minutes", DEFAULT_GRACE_PERIOD_IN_MINUTES)
+                catch_up_limit = schedule.get("catch_up_limit", DEFAULT_CATCH_UP_LIMIT)
+                # bool is a subclass of int, so true/false have to be rejected explicitly
+                if not isinstance(persist, bool) or any(isinstance(value, bool) or not isinstance(value, int)
+                                                        for value in (grace_period_minutes, catch_up_limit)):
+                    raise ValueError("persist_after_reboot has to be a bool, grace_period_in_minutes and "
+                                     "catch_up_limit ints!")
+                scheduling_events.append(
+                    self._create_scheduling_event(schedule.get("exec_time"), event_dict, persist,
+                                                  schedule.get("repeat_policy"), schedule.get("repeat_rule"),
+                                                  grace_period_minutes, schedule.get("catch_up_policy"),
+                                                  catch_up_limit))
+            except ValueError as e:
+                errors[index] = str(e)
+        if errors:
+            return 400, {"errors": errors}
+
+        await self.put_event(ScheduleEventExecutionBatchEvent(scheduling_events))
+        return 200, {"schedule_ids": [scheduling_event.schedule_id for scheduling_event in scheduling_events]}
+
+    async def handle_get_schedule_request(self, args):
+        """
+        Endpoint handler for getting a single scheduled event by its schedule_id via the /schedule endpoint.
+        :param args: contains the arguments of the request
+        :return: Tuple containing of (status_code, response)
+        """
+        schedule_id = get_string_from_args_obj("schedule_id", args)
+        if schedule_id is None:
+            return 400, "Missing schedule_id!"
+        try:
+            response: ScheduledEventsResponseEvent = await self.request(GetScheduledEventsEvent(schedule_id))
+        except asyncio.TimeoutError:
+            return 504, "Timed out while getting the scheduled event!"
+        if not response.scheduled_events:
+            return 404, f"No scheduled event with id {schedule_id}!"
+        return 200, response.scheduled_events[0]
+
+    async def handle_list_schedules_request(self, args):
+        """
+        Endpoint handler for the /schedules endpoint. Lists the scheduled events ordered by their execution time,
+        optionally filtered by event_id and an execution time range [from, to).
+        :param args: contains the arguments of the request
+        :return: Tuple containing of (status_code, response)
+        """
+        event_id = get_string_from_args_obj("event_id", args)
+        start = get_string_from_args_obj("from", args)
+        end = get_string_from_args_obj("to", args)
+        try:
+            offset = get_int_from_args_obj("offset", args, 0)
+            limit = get_int_from_args_obj("limit", args, DEFAULT_SCHEDULES_PAGE_SIZE)
+        except ValueError:
+            return 400, "offset and limit have to be integers!"
+        if offset < 0 or not 0 < limit <= MAX_SCHEDULES_PAGE_SIZE:
+            return 400, f"offset has to be positive and limit between 1 and {MAX_SCHEDULES_PAGE_SIZE}!"
+
+        parsed_start = self._parse_exec_time(start)
+        parsed_end = self._parse_exec_time(end)
+        if (start is not None and parsed_start is None) or (end is not None and parsed_end is None):
+            return 400, "Supplied time range is not parseable!"
 
-        self.log.info("Sending event to schedule " + str(event_to_schedule) + " for execution at " + str(exec_time))
-        await self.put_event(ScheduleEventExecutionEvent(exec_time, event_to_schedule, persist,
-                                                         repeat_policy, grace_period_minutes))
+        try:
+            response: ScheduledEventsResponseEvent = await self.request(
+                GetScheduledEventsEvent(event_id=event_id, start=parsed_start, end=parsed_end, offset=offset,
+                                        limit=limit))
+        except asyncio.TimeoutError:
+            return 504, "Timed out while getting the scheduled events!"
+        return 200, {"total_count": response.total_count,
+                     "offset": offset,
+                     "limit": limit,
+                     "scheduled_events": response.scheduled_events}
+
+    async def handle_reschedule_request(self, args):
+        """
+        Endpoint handler for moving a scheduled event to a new exec_time via the /schedule endpoint.
+        :param args: contains the arguments of the request
+        :return: Tuple containing of (status_code, response)
+        """
+        schedule_id = get_string_from_args_obj("schedule_id", args)
+        if schedule_id is None:
+            return 400, "Missing schedule_id!"
+        exec_time = self._parse_exec_time(get_string_from_args_obj("exec_time", args))
+        if exec_time is None:
+            return 400, "Supplied exec_time is not parseable!"
+        try:
+            response: ScheduleModificationResponseEvent = await self.request(
+                RescheduleEventExecutionEvent(schedule_id, exec_time))
+        except asyncio.TimeoutError:
+            return 504, "Timed out while rescheduling the event!"
+        if not response.success:
+            return 404, f"No scheduled event with id {schedule_id}!"
+        return 200, ""
+
+    async def handle_delete_schedule_request(self, args):
+        """
+        Endpoint handler for removing a scheduled event via the /schedule endpoint.
+        :param args: contains the arguments of the request
+        :return: Tuple containing of (status_code, response)
+        """
+        schedule_id = get_string_from_args_obj("schedule_id", args)
+        if schedule_id is None:
+            return 400, "Missing schedule_id!"
+        try:
+            response: ScheduleModificationResponseEvent = await self.request(RemoveScheduledEventEvent(schedule_id))
+        except asyncio.TimeoutError:
+            return 504, "Timed out while removing the scheduled event!"
+        if not response.success:
+            return 404, f"No scheduled event with id {schedule_id}!"
         return 200, ""
@@ -1,11 +1,17 @@
+import uuid
 from datetime import datetime
+from typing import Optional
 
 from core_modules.eventing.BaseEvent import BaseEvent
+from core_modules.eventing.ResponseEvent import ResponseEvent
+from core_modules.scheduling.CatchUpPolicy import CatchUpPolicy
 from core_modules.scheduling.EventRepeatPolicy import EventRepeatPolicy
 from core_modules.scheduling.SchedulableEvent import SchedulableEvent
 
 # set to one to prevent event scheduling problems when the event execution lacks one second behind (minute, hour change)
 DEFAULT_GRACE_PERIOD_IN_MINUTES = 1
+# maximum number of missed executions replayed with CatchUpPolicy.FireAll
+DEFAULT_CATCH_UP_LIMIT = 10
 
 
 class ScheduleEventExecutionEvent(BaseEvent):
@@ -15,7 +21,9 @@ class ScheduleEventExecutionEvent(BaseEvent):
 
     def __init__(self, exec_time: datetime, event: SchedulableEvent, persist_after_reboot: bool = False,
                  repeat_policy: EventRepeatPolicy = EventRepeatPolicy.NoRepeat,
-                 grace_period_in_minutes: int = DEFAULT_GRACE_PERIOD_IN_MINUTES):
+                 grace_period_in_minutes: int = DEFAULT_GRACE_PERIOD_IN_MINUTES, schedule_id: Optional[str] = None,
+                 repeat_rule: Optional[str] = None, catch_up_policy: CatchUpPolicy = CatchUpPolicy.Skip,
+                 catch_up_limit: int = DEFAULT_CATCH_UP_LIMIT):
         """
         Constructor of ScheduleEventExecutionEvent
         :param datetime exec_time: The time the passed event will be executed at.
@@ -25,12 +33,29 @@ class ScheduleEventExecutionEvent(BaseEvent):
         :param int grace_period_in_minutes: Grace period after which the event will no longer be executed.
         Useful for persistent events that have long passed after a reboot and should no longer be executed or for the
         exact opposite - for events that have long since passed but need to be executed anyway!
+        :param str schedule_id: Stable id of the scheduled event - kept across repetitions. Generated if not passed.
+        :param str repeat_rule: The normalized RFC 5545 recurrence rule used with EventRepeatPolicy.Rule.
+        :param CatchUpPolicy catch_up_policy: How executions missed by more than the grace period are handled.
+        :param int catch_up_limit: The maximum number of missed executions replayed with CatchUpPolicy.FireAll.
         """
         self.event = event
         self.exec_time = exec_time
         self.persist_after_reboot = persist_after_reboot
         self.repeat_policy = repeat_policy
         self.grace_period_in_minutes = grace_period_in_minutes
+        self.schedule_id = schedule_id if schedule_id is not None else uuid.uuid4().hex
+        self.repeat_rule = repeat_rule
+        self.catch_up_policy = catch_up_policy
+        self.catch_up_limit = catch_up_limit
+
+
+class ScheduleEventExecutionBatchEvent(BaseEvent):
+    """
+    Event for scheduling multiple events at once, persisting all of them with a single write.
+    """
+
+    def __init__(self, scheduling_events: list[ScheduleEventExecutionEvent]):
+        self.scheduling_events = scheduling_events
 
 
 class UnscheduleEventExecutionEvent(BaseEvent):
@@ -40,3 +65,79 @@ class UnscheduleEventExecutionEvent(BaseEvent):
         self.event_to_remove = event_to_remove
         self.remove_following_events = remove_following_events
         self.remove_from_persistence = remove_from_persistence
+
+
+class RescheduleEventExecutionEvent(BaseEvent):
+    """
+    Event to move a scheduled event to a new execution time. Answered with a ScheduleModificationResponseEvent.
+    """
+
+    def __init__(self, schedule_id: str, exec_time: datetime):
+        """
+        Constructor of RescheduleEventExecutionEvent
+        :param str schedule_id: The id of the scheduled event to move.
+        :param datetime exec_time: The new time the scheduled event will be executed at.
+        """
+        self.schedule_id = schedule_id
+        self.exec_time = exec_time
+
+
+class RemoveScheduledEventEvent(BaseEvent):
+    """
+    Event to remove a scheduled event including its following events and its persistence.
+    Answered with a ScheduleModificationResponseEvent.
+    """
+
+    def __init__(self, schedule_id: str):
+        self.schedule_id = schedule_id
+
+
+class ScheduleModificationResponseEvent(ResponseEvent):
+    """
+    Response event for the RescheduleEventExecutionEvent and RemoveScheduledEventEvent.
+    """
+
+    def __init__(self, schedule_id: str, success: bool):
+        self.schedule_id = schedule_id
+        self.success = success
+
+
+class GetScheduledEventsEvent(BaseEvent):
+    """
+    Event to query the scheduled events. All passed filters have to match. Answered with a
+    ScheduledEventsResponseEvent containing the matching events ordered by their execution time.
+    """
+
+    def __init__(self, schedule_id: Optional[str] = None, event_id: Optional[str] = None,
+                 start: Optional[datetime] = None, end: Optional[datetime] = None, offset: int = 0,
+                 limit: Optional[int] = None):
+        """
+        Constructor of GetScheduledEventsEvent
+        :param str schedule_id: Only return the scheduled event with this id.
+        :param str event_id: Only return scheduled events executing an event with this event_id.
+        :param datetime start: Only return scheduled events executed at or after this time.
+        :param datetime end: Only return scheduled events executed before this time.
+        :param int offset: The number of matching scheduled events to skip.
+        :param int limit: The maximum number of scheduled events to return, None for all.
+        """
+        self.schedule_id = schedule_id
+        self.event_id = event_id
+        self.start = start
+        self.end = end
+        self.offset = offset
+        self.limit = limit
+
+
+class ScheduledEventsResponseEvent(ResponseEvent):
+    """
+    Response event for the GetScheduledEventsEvent.
+    """
+
+    def __init__(self, scheduled_events: list[dict], total_count: int):
+        """
+        Constructor of ScheduledEventsResponseEvent
+        :param list scheduled_events: The object representations of the requested page of scheduled events.
+        :param int total_count: The number of scheduled events matching the query across all pages.
+        """
+        self.scheduled_events = scheduled_events
+        self.total_count = total_count
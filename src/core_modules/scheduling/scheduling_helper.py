@@ -1,11 +1,33 @@
 """
 Class containing helper functions used for scheduling.
 """
+import functools
 from datetime import datetime, timedelta
+from typing import Optional, Union
 
 from dateutil.relativedelta import relativedelta
+from dateutil.rrule import rrulestr, rrule, rruleset
 
 from core_modules.scheduling.EventRepeatPolicy import EventRepeatPolicy
+from core_modules.scheduling.RepeatRule import RepeatRule
+
+# repeat policies with an interval of fixed length
+FIXED_REPEAT_POLICY_INTERVALS = {
+    EventRepeatPolicy.QuarterHourly: timedelta(minutes=15),
+    EventRepeatPolicy.HalfHourly: timedelta(minutes=30),
+    EventRepeatPolicy.Hourly: timedelta(hours=1),
+    EventRepeatPolicy.Daily: timedelta(days=1),
+    EventRepeatPolicy.Weekly: timedelta(weeks=1)
+}
+
+# repeat policies with an interval depending on the length of the months - in months
+CALENDAR_REPEAT_POLICY_INTERVALS = {
+    EventRepeatPolicy.Monthly: 1,
+    EventRepeatPolicy.Yearly: 12
+}
+
+# number of compiled repeat rules kept - scheduled events with the same rule share the compiled (immutable) rule
+REPEAT_RULE_CACHE_SIZE = 256
 
 
 def get_next_execution_time_for_policy(exec_time: datetime, repeat_policy: EventRepeatPolicy) -> datetime:
@@ -31,6 +53,88 @@ def get_next_execution_time_for_policy(exec_time: datetime, repeat_policy: Event
         return get_next_year_for_date(exec_time)
 
 
+@functools.lru_cache(maxsize=REPEAT_RULE_CACHE_SIZE)
+def compile_repeat_rule(rule_text: str) -> Union[rrule, rruleset]:
+    """
+    Function to compile the passed rule text. The compiled rule is never iterated in place, so it can be shared.
+    :param rule_text: The normalized rule text (see RepeatRule.normalize_rule_text).
+    :return: The compiled rule.
+    :raises ValueError: If the rule is invalid or uses timezone aware datetimes.
+    """
+    rule = rrulestr(rule_text)
+    first_occurrence = next(iter(rule), None)
+    if first_occurrence is not None and first_occurrence.tzinfo is not None:
+        raise ValueError("Repeat rules with timezones are not supported!")
+    return rule
+
+
+def create_repeat_rule(rule_text: str) -> RepeatRule:
+    """
+    Function to create a RepeatRule with its own position in the occurrences of the passed rule text.
+    :param rule_text: The normalized rule text (see RepeatRule.normalize_rule_text).
+    :return: The RepeatRule starting at the DTSTART of the rule.
+    :raises ValueError: If the rule is invalid.
+    """
+    return RepeatRule(rule_text, compile_repeat_rule(rule_text))
+
+
+def get_next_execution_time_after(exec_time: datetime, repeat_policy: EventRepeatPolicy, now: datetime,
+                                  repeat_rule: Optional[RepeatRule] = None) -> Optional[datetime]:
+    """
+    Function to get the first execution time of the repeat policy that lies after both the last execution time and the
+    passed time, computed in constant time regardless of how many executions were missed.
+    Monthly and yearly occurrences are anchored to the last execution time and clamped to the end of shorter months
+    (e.g. the 31st of January is followed by the 28th/29th of February and the 31st of March).
+    :param exec_time: The old execution time.
+    :param repeat_policy: The repeat policy to schedule the next execution time for.
+    :param now: The time the next execution time has to lie after - usually the current time.
+    :param repeat_rule: The RepeatRule of the scheduled event for EventRepeatPolicy.Rule.
+    :return: The next execution time, None for EventRepeatPolicy.NoRepeat or a rule without further occurrences.
+    """
+    if repeat_policy in FIXED_REPEAT_POLICY_INTERVALS:
+        interval = FIXED_REPEAT_POLICY_INTERVALS[repeat_policy]
+        if now < exec_time:
+            return exec_time + interval
+        return exec_time + ((now - exec_time) // interval + 1) * interval
+    if repeat_policy in CALENDAR_REPEAT_POLICY_INTERVALS:
+        interval_in_months = CALENDAR_REPEAT_POLICY_INTERVALS[repeat_policy]
+        elapsed_months = (now.year - exec_time.year) * 12 + now.month - exec_time.month
+        intervals = max(elapsed_months // interval_in_months, 1)
+        next_exec_time = exec_time + relativedelta(months=intervals * interval_in_months)
+        # the month difference is only exact up to the day - at most one more interval is needed
+        while next_exec_time <= now:
+            intervals += 1
+            next_exec_time = exec_time + relativedelta(months=intervals * interval_in_months)
+        return next_exec_time
+    if repeat_policy is EventRepeatPolicy.Rule and repeat_rule is not None:
+        return repeat_rule.get_next_occurrence_after(max(exec_time, now))
+    return None
+
+
+def count_execution_times_until(exec_time: datetime, repeat_policy: EventRepeatPolicy, until: datetime, limit: int,
+                                repeat_rule: Optional[RepeatRule] = None) -> int:
+    """
+    Function to count the execution times of the repeat policy from the passed execution time up to and including the
+    passed time, e.g. to find out how many executions were missed during a system outage.
+    :param exec_time: The first execution time to count.
+    :param repeat_policy: The repeat policy of the executions.
+    :param until: The time up to which the executions are counted.
+    :param limit: The maximum count - the executions are only iterated up to it.
+    :param repeat_rule: The RepeatRule of the scheduled event for EventRepeatPolicy.Rule.
+    :return: The number of execution times, at most limit.
+    """
+    if until < exec_time:
+        return 0
+    if repeat_policy in FIXED_REPEAT_POLICY_INTERVALS:
+        return min((until - exec_time) // FIXED_REPEAT_POLICY_INTERVALS[repeat_policy] + 1, limit)
+    count = 0
+    next_exec_time = exec_time
+    while next_exec_time is not None and next_exec_time <= until and count < limit:
+        count += 1
+        next_exec_time = get_next_execution_time_after(next_exec_time, repeat_policy, next_exec_time, repeat_rule)
+    return count
+
+
 def get_next_quarter_hour_for_date(old_datetime: datetime):
     """
     Calculates a date for the passed datetime + 15 min.
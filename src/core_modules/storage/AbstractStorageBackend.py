@@ -0,0 +1,50 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class AbstractStorageBackend(ABC):
+    """
+    Base class for the backends the StorageManager stores its fields in. Fields are addressed by their section and
+    name, fields without a section (None) are stored at the top level.
+    """
+
+    @abstractmethod
+    def get(self, field: str, section: Optional[str], fallback=None):
+        """
+        Gets the value of a field.
+        :param field: The field to get.
+        :param section: The section to get the field from.
+        :param fallback: The value that is returned if either the field or section does not exist.
+        :return: The value of the field if it exists, otherwise the provided fallback value.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def put(self, value, field: str, section: Optional[str]) -> None:
+        """
+        Inserts or replaces the value of a field, creating the section if it does not exist.
+        :param value: The value to store.
+        :param field: The field to store the value at.
+        :param section: The section of the field.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def delete(self, field: str, section: Optional[str]) -> None:
+        """
+        Deletes a field if it exists.
+        :param field: The field to delete.
+        :param section: The section of the field.
+        """
+        raise NotImplementedError()
+
+    def flush(self) -> None:
+        """
+        Persists pending changes immediately. Backends persisting every change directly do not need to override this.
+        """
+
+    def close(self) -> None:
+        """
+        Persists pending changes and releases the resources of the backend.
+        """
+        self.flush()
@@ -0,0 +1,107 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, Future
+from functools import partial
+from typing import Callable
+
+from core_modules.logging.lis_logging import get_logger
+from core_modules.storage.StorageManager import StorageManager
+from core_modules.storage.config_section_helper import ConfigSectionType
+
+
+class AsyncStorageManager:
+    """
+    Async facade of a StorageManager for use inside async handlers. Mutations including their serialization and disk
+    I/O run on a single dedicated worker thread, so they never block the event loop. As there is only one worker,
+    mutations are applied and persisted in the order they were issued. Awaiting a mutation returns once it was
+    applied to the storage backend. Reads are served directly, as the backends answer them from memory or an index.
+    """
+
+    log = get_logger(__name__)
+
+    def __init__(self, storage: StorageManager):
+        """
+        Initializes the AsyncStorageManager.
+        :param storage: The StorageManager to run the mutations of.
+        """
+        self.storage = storage
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="storage")
+
+    async def _run_in_worker(self, func: Callable, *args, **kwargs):
+        """
+        Runs a StorageManager method on the worker thread.
+        :param func: The method to run.
+        :return: The result of the method.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    def submit_io(self, func: Callable, *args) -> Future:
+        """
+        Runs blocking file I/O of another module (e.g. the SchedulerJournal) on the worker thread, after all previously
+        issued mutations and without waiting for it.
+        :param func: The function to run.
+        :return: The future of the result of the function.
+        """
+        return self._executor.submit(func, *args)
+
+    def get(self, field: str, section: str = None, fallback=None):
+        """
+        Gets a value from a specified field and section, see StorageManager.get.
+        """
+        return self.storage.get(field, section, fallback)
+
+    def get_section(self, config_type: type[ConfigSectionType]) -> ConfigSectionType:
+        """
+        Gets the immutable snapshot of a config section, see StorageManager.get_section.
+        """
+        return self.storage.get_section(config_type)
+
+    async def add(self, value, field: str, section: str = None, overwrite_if_exists: bool = False) -> None:
+        """
+        Adds the value at the provided field and section on the worker thread, see StorageManager.add.
+        """
+        await self._run_in_worker(self.storage.add, value, field, section, overwrite_if_exists)
+
+    async def append_or_add(self, value, field: str, section: str = None) -> None:
+        """
+        Appends the value to a list at the provided field or section on the worker thread, see
+        StorageManager.append_or_add.
+        """
+        await self._run_in_worker(self.storage.append_or_add, value, field, section)
+
+    async def update(self, value, field: str, section: str = None) -> None:
+        """
+        Updates the value at the given field and section on the worker thread, see StorageManager.update.
+        """
+        await self._run_in_worker(self.storage.update, value, field, section)
+
+    async def remove(self, field: str, section: str = None) -> None:
+        """
+        Removes the value at the specified field and section on the worker thread, see StorageManager.remove.
+        """
+        await self._run_in_worker(self.storage.remove, field, section)
+
+    async def remove_obj_from_list(self, obj_to_remove: dict, field: str, section: str = None) -> None:
+        """
+        Removes an object out of a list at the specified field and section on the worker thread, see
+        StorageManager.remove_obj_from_list.
+        """
+        await self._run_in_worker(self.storage.remove_obj_from_list, obj_to_remove, field, section)
+
+    async def reload_config(self) -> list[str]:
+        """
+        Reloads the .toml file on the worker thread if it was changed, see StorageManager.reload_config.
+        """
+        return await self._run_in_worker(self.storage.reload_config)
+
+    async def flush(self) -> None:
+        """
+        Waits until all previously issued mutations are written to disk.
+        """
+        await self._run_in_worker(self.storage.flush)
+
+    async def close(self) -> None:
+        """
+        Waits for all previously issued mutations, closes the StorageManager and stops the worker thread.
+        """
+        await self._run_in_worker(self.storage.close)
+        self._executor.shutdown()
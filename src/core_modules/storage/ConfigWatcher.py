@@ -0,0 +1,42 @@
+import asyncio
+from typing import Callable
+
+from core_modules.lifecycle.LifecycleManager import get_lifecycle_manager
+from core_modules.logging.lis_logging import get_logger
+from core_modules.storage.AsyncStorageManager import AsyncStorageManager
+from core_modules.storage.StorageEvents import ConfigChangedEvent
+
+DEFAULT_CONFIG_POLL_INTERVAL_IN_SECONDS = 2
+
+
+class ConfigWatcher:
+    """
+    Watches the lis_data.toml for changes by polling its modification time. Changed files are reloaded and a
+    ConfigChangedEvent is published for every changed section, so the modules can apply the new configuration without
+    a restart of LIS.
+    """
+
+    log = get_logger(__name__)
+
+    def __init__(self, storage: AsyncStorageManager, put_event: Callable,
+                 poll_interval_in_seconds: float = DEFAULT_CONFIG_POLL_INTERVAL_IN_SECONDS):
+        """
+        Initializes the ConfigWatcher and starts watching.
+        :param storage: The storage to reload.
+        :param put_event: The callable used to publish the ConfigChangedEvents.
+        :param poll_interval_in_seconds: The interval the modification time of the file is checked in.
+        """
+        self.storage = storage
+        self.put_event = put_event
+        self.poll_interval_in_seconds = poll_interval_in_seconds
+        get_lifecycle_manager().create_task(self._watch_config_task())
+
+    async def _watch_config_task(self):
+        """
+        Task reloading the configuration every poll interval and publishing the changed sections.
+        """
+        while True:
+            await asyncio.sleep(self.poll_interval_in_seconds)
+            for section in await self.storage.reload_config():
+                self.log.info("Configuration of section " + str(section) + " changed")
+                await self.put_event(ConfigChangedEvent(section))
@@ -0,0 +1,67 @@
+import json
+import sqlite3
+import threading
+from typing import Optional
+
+from core_modules.logging.lis_logging import get_logger
+from core_modules.storage.AbstractStorageBackend import AbstractStorageBackend
+
+# sqlite does not treat NULLs as equal in primary keys, so fields without a section are stored in this section
+TOP_LEVEL_SECTION = ""
+
+
+class SqliteStorageBackend(AbstractStorageBackend):
+    """
+    Storage backend keeping every field in its own row of an embedded SQLite database in WAL mode. Lookups use the
+    primary key index and every change only writes a single row instead of rewriting the whole document.
+    Values are stored as json, so they have to be json serializable.
+    """
+
+    log = get_logger(__name__)
+
+    def __init__(self, path: str):
+        """
+        Initializes the SqliteStorageBackend, creating the database if it does not exist.
+        :param path: The path to the sqlite database file to use.
+        """
+        self.database_file_path = path
+        # the connection is shared by the event loop and the worker thread of the AsyncStorageManager - the sqlite3
+        # module does not serialize its use across threads, so every statement holds the lock. Statements only touch
+        # a single row, so reads never wait long.
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # in WAL mode a commit is still atomic and durable against application crashes without syncing every commit
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS storage ("
+                                 "section TEXT NOT NULL, "
+                                 "field TEXT NOT NULL, "
+                                 "value TEXT NOT NULL, "
+                                 "PRIMARY KEY (section, field)) WITHOUT ROWID")
+        self._connection.commit()
+
+    def get(self, field: str, section: Optional[str], fallback=None):
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM storage WHERE section = ? AND field = ?",
+                                           (TOP_LEVEL_SECTION if section is None else section, field)).fetchone()
+        if row is None:
+            return fallback
+        return json.loads(row[0])
+
+    def put(self, value, field: str, section: Optional[str]) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("INSERT INTO storage (section, field, value) VALUES (?, ?, ?) "
+                                     "ON CONFLICT (section, field) DO UPDATE SET value = excluded.value",
+                                     (TOP_LEVEL_SECTION if section is None else section, field, json.dumps(value)))
+
+    def delete(self, field: str, section: Optional[str]) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM storage WHERE section = ? AND field = ?",
+                                     (TOP_LEVEL_SECTION if section is None else section, field))
+
+    def close(self) -> None:
+        """
+        Closes the database connection.
+        """
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,18 @@
+"""
+Class containing all Events used for the storage components.
+"""
+from core_modules.eventing.BaseEvent import BaseEvent
+
+
+class ConfigChangedEvent(BaseEvent):
+    """
+    Event published by the ConfigWatcher for every section of the lis_data.toml that changed while LIS was running.
+    The new values can be read from the StorageManager.
+    """
+
+    def __init__(self, section: str):
+        """
+        Constructor of ConfigChangedEvent
+        :param section: The section of the lis_data.toml that changed.
+        """
+        self.section = section
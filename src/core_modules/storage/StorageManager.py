@@ -1,57 +1,165 @@
-import os.path
-import tomllib
-from tomllib import TOMLDecodeError
-
-import tomli_w
+import threading
+from typing import Optional
 
 from core_modules.logging.lis_logging import get_logger
+from core_modules.storage.AbstractStorageBackend import AbstractStorageBackend
+from core_modules.storage.TomlStorageBackend import TomlStorageBackend, DEFAULT_WRITE_BEHIND_DELAY_IN_SECONDS
+from core_modules.storage.config_section_helper import load_config_section, ConfigSectionType
 
 SECTION_HEADER_SERVER = "SERVER"
 
 FIELD_SERVER_IP = "SERVER_IP"
 FIELD_SERVER_PORT = "SERVER_PORT"
 
+# section of the runtime backend keeping the .toml value each runtime value was written over
+SECTION_HEADER_CONFIG_BASELINE = "_CONFIG_BASELINE"
+
+# marks fields that do not exist in a backend, as None can not be used for that
+_MISSING = object()
+
 
 class StorageManager:
     """
     The StorageManager is responsible for loading data from the data.toml file as well as providing an interface
-    to use and manipulate the loaded data (get, add, update, remove)
+    to use and manipulate the loaded data (get, add, update, remove). Changes are written behind: all mutations within
+    a short window are coalesced into a single write that atomically replaces the file, so it is never left torn.
+    If a runtime backend is set, all changes are stored in it instead and the .toml file stays read-only
+    configuration. A field stored in the runtime backend takes precedence over the same field in the .toml file until
+    the value of the field in the .toml file changes (edited while LIS is running or stopped) - then the edited .toml
+    value wins and the runtime value is dropped.
+    Typed, immutable snapshots of whole sections are provided by get_section and kept until the section changes.
+    The StorageManager may be used from the event loop and the worker thread of the AsyncStorageManager at the same
+    time, so mutations (including their read-modify-write) are serialized by a lock.
     """
 
     log = get_logger(__name__)
 
-    def __init__(self, path: str):
+    def __init__(self, path: str, write_behind_delay_in_seconds: float = DEFAULT_WRITE_BEHIND_DELAY_IN_SECONDS,
+                 runtime_backend: Optional[AbstractStorageBackend] = None):
         """
         Initializes the StorageManager
         :param path: The path to the .toml file to use
+        :param write_behind_delay_in_seconds: The time mutations are collected before they are written to the file.
+        Mutations are written immediately if it is 0 or no event loop is running.
+        :param runtime_backend: The backend to store changes in, None to store them in the .toml file.
         """
         self.log.info("Starting...")
         self.data_file_path = path
-        self._read_toml_file()
+        self._config_backend = TomlStorageBackend(path, write_behind_delay_in_seconds)
+        self._runtime_backend = runtime_backend
+        self._write_backend = self._config_backend if runtime_backend is None else runtime_backend
+        self._config_sections: dict[type, object] = {}
+        # reentrant, as mutations call each other (e.g. add calls update)
+        self._lock = threading.RLock()
+        self._drop_outdated_runtime_values()
+
+    def flush(self) -> None:
+        """
+        Writes pending mutations immediately.
+        """
+        with self._lock:
+            self._write_backend.flush()
+
+    def close(self) -> None:
+        """
+        Writes pending mutations and closes the storage backends. Should be called before shutting down.
+        """
+        with self._lock:
+            self._config_backend.close()
+            if self._runtime_backend is not None:
+                self._runtime_backend.close()
+
+    def reload_config(self) -> list[str]:
+        """
+        Reloads the .toml file if it was changed by another process (e.g. edited by the user).
+        :return: The sections whose values changed.
+        """
+        with self._lock:
+            changed_sections = self._config_backend.reload_if_changed()
+            if changed_sections:
+                self.log.info("Reloaded " + self.data_file_path + ", changed sections: " + str(changed_sections))
+                self._drop_outdated_runtime_values()
+                self._refresh_config_sections(changed_sections)
+            return changed_sections
 
-    def _read_toml_file(self) -> None:
+    def get_section(self, config_type: type[ConfigSectionType]) -> ConfigSectionType:
         """
-        Reads the content of the .toml file this StorageManager instance is associated with.
-        Will create an empty file if no .toml exists with the given path.
+        Gets the immutable snapshot of a config section, which is created and validated on the first call and then
+        only recreated when the section changes.
+        :param config_type: The config section dataclass to get, see config_section_helper.load_config_section.
+        :return: The config section containing the current values.
+        :raises ValueError: If the section is invalid when it is first requested.
         """
-        if not os.path.exists(self.data_file_path):
-            # create empty file if it does not exist
-            open(self.data_file_path, 'a').close()
+        config_section = self._config_sections.get(config_type)
+        if config_section is None:
+            # a snapshot created while a mutation of the section is applied could otherwise outlive the mutation
+            with self._lock:
+                config_section = load_config_section(config_type, self.get)
+                self._config_sections[config_type] = config_section
+        return config_section
 
-        with open(self.data_file_path, "rb") as f:
-            try:
-                self._storage = tomllib.load(f)
-            except TOMLDecodeError as e:
-                self.log.error(self.data_file_path + " is not a valid toml file: " + str(e))
-                exit(-1)
+    @staticmethod
+    def _get_baseline_field(field: str, section: Optional[str]) -> str:
+        """
+        Gets the field the .toml value a runtime value was written over is kept at.
+        :param field: The overridden field.
+        :param section: The section of the overridden field.
+        :return: The field in the SECTION_HEADER_CONFIG_BASELINE section.
+        """
+        return ("" if section is None else section) + "." + field
 
-    def _write_toml_file(self) -> None:
+    def _drop_outdated_runtime_values(self) -> None:
         """
-        Dumps and writes the current _storage object into a .toml file at the path this
-        StorageManager instance is associated with.
+        Drops the runtime values of all fields whose value in the .toml file changed since the runtime value was
+        written, so the edited configuration takes effect. Runtime values written before their .toml value was
+        recorded adopt the current .toml value.
         """
-        with open(self.data_file_path, "wb") as f:
-            tomli_w.dump(self._storage, f)
+        if self._runtime_backend is None:
+            return
+        with self._lock:
+            for section, field in self._config_backend.get_fields():
+                if self._runtime_backend.get(field, section, _MISSING) is _MISSING:
+                    continue
+                baseline_field = self._get_baseline_field(field, section)
+                baseline_value = self._runtime_backend.get(baseline_field, SECTION_HEADER_CONFIG_BASELINE, _MISSING)
+                config_value = self._config_backend.get(field, section)
+                if baseline_value is _MISSING:
+                    self._runtime_backend.put(config_value, baseline_field, SECTION_HEADER_CONFIG_BASELINE)
+                elif baseline_value != config_value:
+                    self.log.info(f"Field {field} in section {section} was changed in {self.data_file_path} - "
+                                  f"dropping its runtime value")
+                    self._runtime_backend.delete(field, section)
+                    self._runtime_backend.delete(baseline_field, SECTION_HEADER_CONFIG_BASELINE)
+
+    def _refresh_config_sections(self, sections: list[str]) -> None:
+        """
+        Recreates the cached snapshots of the config sections after their values changed. A snapshot is kept if the
+        changed section is invalid, so a broken edit does not break the modules using it.
+        :param sections: The sections that changed.
+        """
+        for config_type in list(self._config_sections):
+            if config_type.SECTION in sections:
+                try:
+                    self._config_sections[config_type] = load_config_section(config_type, self.get)
+                except ValueError as e:
+                    self.log.error(str(e) + " Keeping the previous configuration.")
+
+    def _put(self, value, field: str, section: str = None) -> None:
+        """
+        Stores a value in the write backend and refreshes the config section snapshots of its section.
+        :param value: The value to store.
+        :param field: The field to store the value at.
+        :param section: The section of the field.
+        """
+        self._write_backend.put(value, field, section)
+        if self._runtime_backend is not None:
+            # remember the .toml value this runtime value overrides, to notice when the .toml value is edited
+            config_value = self._config_backend.get(field, section, _MISSING)
+            baseline_field = self._get_baseline_field(field, section)
+            if config_value is not _MISSING and config_value != self._runtime_backend.get(
+                    baseline_field, SECTION_HEADER_CONFIG_BASELINE, _MISSING):
+                self._runtime_backend.put(config_value, baseline_field, SECTION_HEADER_CONFIG_BASELINE)
+        self._refresh_config_sections([section])
 
     def get(self, field: str, section: str = None, fallback=None):
         """
@@ -61,12 +169,11 @@ class StorageManager:
         :param fallback: The value that is returned if either the field or section does not exist.
         :return: The value at the specified section and field if they exist, otherwise the provided fallback value.
         """
-        if section is not None:
-            if section in self._storage and field in self._storage[section]:
-                return self._storage[section][field]
-        elif field in self._storage:
-            return self._storage[field]
-        return fallback
+        if self._runtime_backend is not None:
+            value = self._runtime_backend.get(field, section, _MISSING)
+            if value is not _MISSING:
+                return value
+        return self._config_backend.get(field, section, fallback)
 
     def add(self, value, field: str, section: str = None, overwrite_if_exists: bool = False) -> None:
         """
@@ -77,21 +184,12 @@ class StorageManager:
         :param overwrite_if_exists: Whether to overwrite and existing field if it already exists.
         """
         self.log.debug("Adding " + str(value) + " to field " + field + " in section " + str(section))
-        if section is None:
-            storage_area = self._storage
-        else:
-            if section in self._storage:
-                storage_area = self._storage[section]
+        with self._lock:
+            if self.get(field, section, _MISSING) is not _MISSING:
+                if overwrite_if_exists:
+                    self.update(value, field, section)
             else:
-                self._storage[section] = {}
-                storage_area = self._storage[section]
-
-        if field in storage_area:
-            if overwrite_if_exists:
-                self.update(value, field, section)
-        else:
-            storage_area[field] = value
-            self._write_toml_file()
+                self._put(value, field, section)
 
     def append_or_add(self, value, field: str, section: str = None) -> None:
         """
@@ -101,21 +199,12 @@ class StorageManager:
         :param section: The section in which the field will be inserted into.
         """
         self.log.info("Appending or adding " + str(value) + " to field " + field + " in section " + str(section))
-        if section is None:
-            storage_area = self._storage
-        else:
-            if section in self._storage:
-                storage_area = self._storage[section]
-            else:
-                self._storage[section] = {}
-                storage_area = self._storage[section]
-
-        if field in storage_area:
-            if type(storage_area[field]) == list:
-                storage_area[field].extend([value])
-        else:
-            storage_area[field] = [value]
-        self._write_toml_file()
+        with self._lock:
+            current_value = self.get(field, section, _MISSING)
+            if current_value is _MISSING:
+                self._put([value], field, section)
+            elif type(current_value) == list:
+                self._put(current_value + [value], field, section)
 
     def update(self, value, field: str, section: str = None) -> None:
         """
@@ -125,14 +214,10 @@ class StorageManager:
         :param section: The section to update
         """
         self.log.debug("Updating " + str(value) + " to field " + field + " in section " + str(section))
-        if section is None and field in self._storage:
-            self._storage[field] = value
-            self._write_toml_file()
-            return
-        elif section in self._storage and field in self._storage[section]:
-            self._storage[section][field] = value
-            self._write_toml_file()
-            return
+        with self._lock:
+            if self.get(field, section, _MISSING) is not _MISSING:
+                self._put(value, field, section)
+                return
         self.log.warning("Failed to update because section or field does not exist!")
 
     def remove(self, field: str, section: str = None) -> None:
@@ -142,14 +227,11 @@ class StorageManager:
         :param section: The section the field should be removed in.
         """
         self.log.debug("Removing field " + field + " in section " + str(section))
-        if section is None and field in self._storage:
-            self._storage[field].pop()
-            self._write_toml_file()
-            return
-        elif section in self._storage and field in self._storage[section]:
-            self._storage[section][field].pop()
-            self._write_toml_file()
-            return
+        with self._lock:
+            current_value = self.get(field, section, _MISSING)
+            if current_value is not _MISSING:
+                self._put(current_value[:-1], field, section)
+                return
         self.log.warning("Failed to remove because section or field does not exist!")
 
     def remove_obj_from_list(self, obj_to_remove: dict, field: str, section: str = None) -> None:
@@ -160,12 +242,9 @@ class StorageManager:
         :param section: The section the field is contained inside.
         """
         self.log.debug("Removing object from field " + field + " in section " + str(section))
-        if section is None and field in self._storage:
-            self._storage[field] = list(filter(obj_to_remove.__ne__, self._storage[field]))
-            self._write_toml_file()
-            return
-        elif section in self._storage and field in self._storage[section]:
-            self._storage[section][field] = list(filter(obj_to_remove.__ne__, self._storage[section][field]))
-            self._write_toml_file()
-            return
+        with self._lock:
+            current_value = self.get(field, section, _MISSING)
+            if current_value is not _MISSING:
+                self._put(list(filter(obj_to_remove.__ne__, current_value)), field, section)
+                return
         self.log.warning("Failed to remove because section or field does not exist!")
@@ -0,0 +1,190 @@
+import asyncio
+import os.path
+import threading
+import tomllib
+from tomllib import TOMLDecodeError
+from typing import Optional
+
+import tomli_w
+
+from core_modules.logging.lis_logging import get_logger
+from core_modules.storage.AbstractStorageBackend import AbstractStorageBackend
+
+# mutations within this window after the first unwritten mutation are coalesced into a single write of the file
+DEFAULT_WRITE_BEHIND_DELAY_IN_SECONDS = 0.5
+
+
+class TomlStorageBackend(AbstractStorageBackend):
+    """
+    Storage backend keeping all fields in a single .toml document. Changes are written behind: all mutations within
+    a short window are coalesced into a single write that atomically replaces the file, so it is never left torn.
+    The document and the file are guarded by a lock, as the write behind timer flushes on the event loop while
+    mutations may run on the worker thread of the AsyncStorageManager.
+    """
+
+    log = get_logger(__name__)
+
+    def __init__(self, path: str, write_behind_delay_in_seconds: float = DEFAULT_WRITE_BEHIND_DELAY_IN_SECONDS):
+        """
+        Initializes the TomlStorageBackend and reads the .toml file.
+        :param path: The path to the .toml file to use
+        :param write_behind_delay_in_seconds: The time mutations are collected before they are written to the file.
+        Mutations are written immediately if it is 0 or no event loop is running.
+        """
+        self.data_file_path = path
+        self.write_behind_delay_in_seconds = write_behind_delay_in_seconds
+        self._write_timer: Optional[asyncio.TimerHandle] = None
+        # the loop the write timer runs on, it may only be cancelled from the thread of that loop
+        self._write_timer_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.RLock()
+        # (mtime, size) of the file when it was last read or written, to detect changes by other processes
+        self._file_stat: Optional[tuple[int, int]] = None
+        self._read_toml_file()
+
+    def _read_toml_file(self) -> None:
+        """
+        Reads the content of the .toml file this backend is associated with.
+        Will create an empty file if no .toml exists with the given path.
+        """
+        if not os.path.exists(self.data_file_path):
+            # create empty file if it does not exist
+            open(self.data_file_path, 'a').close()
+
+        with open(self.data_file_path, "rb") as f:
+            try:
+                self._storage = tomllib.load(f)
+            except TOMLDecodeError as e:
+                self.log.error(self.data_file_path + " is not a valid toml file: " + str(e))
+                exit(-1)
+        self._file_stat = self._get_file_stat()
+
+    def _get_file_stat(self) -> Optional[tuple[int, int]]:
+        """
+        Gets the modification time and size of the .toml file.
+        :return: Tuple of (mtime in ns, size) or None if the file does not exist.
+        """
+        try:
+            stat = os.stat(self.data_file_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload_if_changed(self) -> list[str]:
+        """
+        Reads the .toml file again if it was changed since it was last read or written by this backend. Changes are
+        not reloaded while own mutations are waiting to be written, they would be overwritten by them anyway.
+        A file that is not valid toml is not reloaded, so a half saved edit keeps the last valid configuration.
+        :return: The top level keys (sections) whose values changed.
+        """
+        with self._lock:
+            file_stat = self._get_file_stat()
+            if file_stat is None or file_stat == self._file_stat or self._write_timer is not None:
+                return []
+            self._file_stat = file_stat
+            with open(self.data_file_path, "rb") as f:
+                try:
+                    new_storage = tomllib.load(f)
+                except TOMLDecodeError as e:
+                    self.log.error(self.data_file_path + " is not a valid toml file - not reloading: " + str(e))
+                    return []
+            changed_sections = [key for key in {**self._storage, **new_storage}
+                                if self._storage.get(key) != new_storage.get(key)]
+            self._storage = new_storage
+            return changed_sections
+
+    def _write_toml_file(self) -> None:
+        """
+        Dumps and writes the current _storage object into a .toml file at the path this backend is associated with.
+        The data is written to a temporary file first, which then atomically replaces the old file.
+        """
+        tmp_file_path = self.data_file_path + ".tmp"
+        with open(tmp_file_path, "wb") as f:
+            tomli_w.dump(self._storage, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file_path, self.data_file_path)
+        self._file_stat = self._get_file_stat()
+
+    def _schedule_write(self) -> None:
+        """
+        Schedules writing the _storage object to the .toml file after the write behind delay, unless a write is already
+        scheduled. Writes immediately if write behind is disabled or no event loop is running.
+        """
+        if self._write_timer is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is None or self.write_behind_delay_in_seconds <= 0:
+            self._write_toml_file()
+            return
+        self._write_timer = loop.call_later(self.write_behind_delay_in_seconds, self.flush)
+        self._write_timer_loop = loop
+
+    def _get_storage_area(self, section: Optional[str]) -> Optional[dict]:
+        """
+        Gets the dict containing the fields of a section.
+        :param section: The section to get, None for the top level.
+        :return: The fields of the section or None if the section does not exist.
+        """
+        if section is None:
+            return self._storage
+        return self._storage.get(section)
+
+    def get_fields(self) -> list[tuple[Optional[str], str]]:
+        """
+        Gets all fields of the document.
+        :return: The fields as (section, field) tuples, the section is None for fields at the top level.
+        """
+        with self._lock:
+            return [(key, field) if isinstance(value, dict) else (None, key)
+                    for key, value in self._storage.items()
+                    for field in (value if isinstance(value, dict) else (key,))]
+
+    def get(self, field: str, section: Optional[str], fallback=None):
+        storage_area = self._get_storage_area(section)
+        if storage_area is not None and field in storage_area:
+            return storage_area[field]
+        return fallback
+
+    def put(self, value, field: str, section: Optional[str]) -> None:
+        with self._lock:
+            storage_area = self._get_storage_area(section)
+            if storage_area is None:
+                storage_area = self._storage[section] = {}
+            storage_area[field] = value
+            self._schedule_write()
+
+    def delete(self, field: str, section: Optional[str]) -> None:
+        with self._lock:
+            storage_area = self._get_storage_area(section)
+            if storage_area is not None and storage_area.pop(field, None) is not None:
+                self._schedule_write()
+
+    def flush(self) -> None:
+        """
+        Writes pending mutations to the .toml file immediately.
+        """
+        with self._lock:
+            if self._write_timer is None:
+                return
+            self._cancel_write_timer()
+            self.log.debug("Flushing storage to " + self.data_file_path)
+            self._write_toml_file()
+
+    def _cancel_write_timer(self) -> None:
+        """
+        Cancels the scheduled write. TimerHandle.cancel is not thread-safe, so it is handed to the loop of the timer
+        when called from another thread (e.g. when the AsyncStorageManager flushes on its worker thread).
+        """
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self._write_timer_loop or self._write_timer_loop.is_closed():
+            self._write_timer.cancel()
+        else:
+            self._write_timer_loop.call_soon_threadsafe(self._write_timer.cancel)
+        self._write_timer = None
+        self._write_timer_loop = None
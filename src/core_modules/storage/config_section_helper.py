@@ -0,0 +1,60 @@
+import dataclasses
+from typing import Callable, TypeVar
+
+CONFIG_FIELD_METADATA_STORAGE_FIELD = "storage_field"
+
+# marks fields that do not exist in the storage, as None can not be used for that
+_MISSING = object()
+
+ConfigSectionType = TypeVar("ConfigSectionType")
+
+
+def config_field(storage_field: str, default=dataclasses.MISSING):
+    """
+    Declares a field of a config section dataclass.
+    :param storage_field: The name of the field in the storage (e.g. "HUE_BRIDGE_IP").
+    :param default: The value used if the field does not exist, the field is required if omitted.
+    :return: The dataclass field.
+    """
+    return dataclasses.field(default=default, metadata={CONFIG_FIELD_METADATA_STORAGE_FIELD: storage_field})
+
+
+def _is_valid_config_value(value, expected_type: type) -> bool:
+    """
+    Checks whether a value read from the storage matches the declared type of a config field. Integers are accepted
+    for float fields, as toml does not distinguish 1 from 1.0 for the user.
+    :param value: The value to check.
+    :param expected_type: The declared type of the field.
+    :return: True if the value can be used for the field.
+    """
+    if isinstance(value, bool):
+        return expected_type is bool
+    if expected_type is float:
+        return isinstance(value, (int, float))
+    return isinstance(value, expected_type)
+
+
+def load_config_section(config_type: type[ConfigSectionType], get: Callable) -> ConfigSectionType:
+    """
+    Creates an immutable snapshot of a config section. The config_type is a frozen dataclass declaring the name of the
+    section in the class variable SECTION and its fields with config_field.
+    :param config_type: The config section dataclass to create.
+    :param get: The getter of the storage, called with (field, section, fallback).
+    :return: The config section containing the current values.
+    :raises ValueError: If a required field is missing or a value does not match the declared type.
+    """
+    values = {}
+    for field in dataclasses.fields(config_type):
+        storage_field = field.metadata[CONFIG_FIELD_METADATA_STORAGE_FIELD]
+        value = get(storage_field, config_type.SECTION, _MISSING)
+        if value is _MISSING:
+            if field.default is dataclasses.MISSING:
+                raise ValueError(f"Missing required field {storage_field} in section [{config_type.SECTION}]!")
+            value = field.default
+        elif not _is_valid_config_value(value, field.type):
+            raise ValueError(f"Field {storage_field} in section [{config_type.SECTION}] has to be of type "
+                             f"{field.type.__name__}, got {value!r}!")
+        if field.type is float:
+            value = float(value)
+        values[field.name] = value
+    return config_type(**values)
@@ -0,0 +1,63 @@
+from bisect import bisect_left
+
+DEFAULT_LATENCY_BUCKETS_IN_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket histogram for durations. Recording a value costs a binary search over the bucket bounds, so it can
+    be used on hot paths.
+    """
+
+    def __init__(self, bucket_bounds_in_ms: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS_IN_MS):
+        """
+        Initializes the LatencyHistogram.
+        :param bucket_bounds_in_ms: The ascending upper bounds of the buckets. Values above the last bound are counted
+        in an additional overflow bucket.
+        """
+        self.bucket_bounds_in_ms = bucket_bounds_in_ms
+        self.bucket_counts = [0] * (len(bucket_bounds_in_ms) + 1)
+        self.count = 0
+        self.sum_in_ms = 0.0
+        self.max_in_ms = 0.0
+
+    def record(self, duration_in_seconds: float):
+        """
+        Adds a duration to the histogram.
+        :param duration_in_seconds: The duration to add.
+        """
+        duration_in_ms = duration_in_seconds * 1000
+        self.bucket_counts[bisect_left(self.bucket_bounds_in_ms, duration_in_ms)] += 1
+        self.count += 1
+        self.sum_in_ms += duration_in_ms
+        self.max_in_ms = max(self.max_in_ms, duration_in_ms)
+
+    def get_percentile(self, percentile: float) -> float:
+        """
+        Estimates a percentile as the upper bound of the bucket it falls into.
+        :param percentile: The percentile to estimate (e.g. 99).
+        :return: The estimated percentile in ms - the max recorded value for the overflow bucket, 0 if empty.
+        """
+        rank = self.count * percentile / 100
+        seen = 0
+        for bound, bucket_count in zip(self.bucket_bounds_in_ms, self.bucket_counts):
+            seen += bucket_count
+            if seen >= rank and seen > 0:
+                return min(bound, self.max_in_ms)
+        return self.max_in_ms
+
+    def to_dict(self) -> dict:
+        """
+        Creates a JSON serializable representation of the histogram.
+        :return: Dict containing count, sum, mean, max, estimated p50/p99 and the (non-cumulative) bucket counts.
+        """
+        buckets = {f"le_{bound}ms": bucket_count
+                   for bound, bucket_count in zip(self.bucket_bounds_in_ms, self.bucket_counts)}
+        buckets["inf"] = self.bucket_counts[-1]
+        return {"count": self.count,
+                "sum_ms": round(self.sum_in_ms, 3),
+                "mean_ms": round(self.sum_in_ms / self.count, 3) if self.count else 0.0,
+                "max_ms": round(self.max_in_ms, 3),
+                "p50_ms": round(self.get_percentile(50), 3),
+                "p99_ms": round(self.get_percentile(99), 3),
+                "buckets": buckets}
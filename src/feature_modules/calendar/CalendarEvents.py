@@ -1,4 +1,6 @@
 from core_modules.eventing.BaseEvent import BaseEvent
+from core_modules.eventing.EventPriority import EventPriority
+from core_modules.eventing.ResponseEvent import ResponseEvent
 from core_modules.scheduling.SimpleSchedulableEvent import SimpleSchedulableEvent
 from feature_modules.calendar.SpecificCalendarEvent import SpecificCalendarEvent
 
@@ -7,6 +9,7 @@ class CalendarRefreshEvent(BaseEvent, SimpleSchedulableEvent):
     """
     Event to trigger a refresh of the calendar events
     """
+    priority = EventPriority.Low
 
 
 class CalendarFetchNextEvent(BaseEvent):
@@ -17,7 +20,7 @@ class CalendarFetchNextEvent(BaseEvent):
         self.limit = limit
 
 
-class CalendarFetchNextResponseEvent(BaseEvent):
+class CalendarFetchNextResponseEvent(ResponseEvent):
     """
     Event containing the response of the FetchNext event
     """
@@ -33,7 +36,7 @@ class CalendarFetchTodayEvent(BaseEvent):
         self.limit = limit
 
 
-class CalendarFetchTodayResponseEvent(BaseEvent):
+class CalendarFetchTodayResponseEvent(ResponseEvent):
     """
     Event containing the response of the FetchToday event
     """
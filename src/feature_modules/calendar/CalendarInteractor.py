@@ -1,13 +1,13 @@
-import asyncio
 from datetime import datetime, date, time, timezone
 from enum import auto, Enum
-from typing import Callable
+from typing import Callable, Optional, Hashable
 
 import tzlocal
 from icalendar import Calendar
 
 from core_modules.eventing.BaseEvent import BaseEvent
 from core_modules.eventing.EventReceiver import EventReceiver
+from core_modules.lifecycle.LifecycleManager import get_lifecycle_manager
 from core_modules.logging.lis_logging import get_logger
 from core_modules.rest.RestServerEvents import SSEDataEvent
 from core_modules.rest.SessionManager import SessionManager
@@ -15,6 +15,7 @@ from core_modules.scheduling.EventRepeatPolicy import EventRepeatPolicy
 from core_modules.scheduling.SchedulingEvents import ScheduleEventExecutionEvent, UnscheduleEventExecutionEvent
 from core_modules.scheduling.scheduling_helper import get_next_week_for_date, get_next_day_for_date, \
     get_next_year_for_date, get_next_month_for_date, get_next_quarter_hour
+from core_modules.storage.StorageEvents import ConfigChangedEvent
 from core_modules.storage.StorageManager import StorageManager
 from feature_modules.calendar.CalendarEventSchedule import CalendarEventSchedule
 from feature_modules.calendar.CalendarEventType import CalendarEventType
@@ -42,6 +43,9 @@ CALENDAR_COMPONENT_RRULE_UNTIL = "UNTIL"
 
 CALENDAR_SSE_UPDATE_ENDPOINT = "calendar/update"
 
+CALENDAR_MAX_CONCURRENT_HANDLERS = 3
+CALENDAR_REFRESH_ORDERING_KEY = "refresh"
+
 
 class CalendarInteractor(EventReceiver):
     """
@@ -50,17 +54,26 @@ class CalendarInteractor(EventReceiver):
     log = get_logger(__name__)
 
     def __init__(self, put_event: Callable, storage: StorageManager, session_manager: SessionManager):
-        super().__init__()
+        super().__init__(max_concurrent_handlers=CALENDAR_MAX_CONCURRENT_HANDLERS)
         self.put_event = put_event
+        self.storage = storage
         self.calendar_url = storage.get(CALENDAR_URL_FIELD, CALENDAR_SECTION)
         self.last_fetched_events = []
         self.current_expire_refresh_event = None
         self.session_manager = session_manager
-        asyncio.create_task(self.fetch_and_schedule_refresh_task())
-        asyncio.create_task(self.schedule_auto_refresh_task())
+        get_lifecycle_manager().create_task(self.fetch_and_schedule_refresh_task())
+        get_lifecycle_manager().create_task(self.schedule_auto_refresh_task())
 
     def fetch_events_to_register(self) -> list[type[BaseEvent]]:
-        return [CalendarRefreshEvent, CalendarFetchNextEvent, CalendarFetchTodayEvent]
+        return [CalendarRefreshEvent, CalendarFetchNextEvent, CalendarFetchTodayEvent, ConfigChangedEvent]
+
+    def get_ordering_key(self, event: BaseEvent) -> Optional[Hashable]:
+        """
+        Refreshes update the last fetched events and the scheduled expire refresh, so they must not overlap.
+        """
+        if isinstance(event, (CalendarRefreshEvent, ConfigChangedEvent)):
+            return CALENDAR_REFRESH_ORDERING_KEY
+        return None
 
     async def handle_specific_event(self, event: BaseEvent):
         if isinstance(event, CalendarRefreshEvent):
@@ -68,11 +81,17 @@ class CalendarInteractor(EventReceiver):
         elif isinstance(event, CalendarFetchNextEvent):
             next_events = self.get_next_events(await self.fetch_events_and_refresh(), limit=event.limit)
             next_events_json = list(map(lambda ev: ev.to_dict(), next_events))
-            await self.put_event(CalendarFetchNextResponseEvent(next_events_json))
+            await self.put_event(CalendarFetchNextResponseEvent(next_events_json).in_response_to(event))
         elif isinstance(event, CalendarFetchTodayEvent):
             today_events = self.get_events_for_today(await self.fetch_events_and_refresh(), limit=event.limit)
             today_events_json = list(map(lambda ev: ev.to_dict(), today_events))
-            await self.put_event(CalendarFetchTodayResponseEvent(today_events_json))
+            await self.put_event(CalendarFetchTodayResponseEvent(today_events_json).in_response_to(event))
+        elif isinstance(event, ConfigChangedEvent) and event.section == CALENDAR_SECTION:
+            self.calendar_url = self.storage.get(CALENDAR_URL_FIELD, CALENDAR_SECTION)
+            self.log.info("Calendar url changed - refreshing")
+            # forget the events of the old calendar so the events of the new calendar are always published
+            self.last_fetched_events = []
+            await self.fetch_and_schedule_refresh_task()
 
     async def fetch_and_schedule_refresh_task(self):
         """
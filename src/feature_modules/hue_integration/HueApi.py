@@ -1,6 +1,6 @@
+import asyncio
 from typing import Callable
 
-from core_modules.eventing.TemporaryEventReceiver import TemporaryEventReceiver
 from core_modules.logging.lis_logging import get_logger
 from core_modules.rest.AbstractBaseApi import AbstractBaseApi
 from core_modules.rest.RestServer import REST_METHOD_PUT, REST_METHOD_GET
@@ -15,8 +15,9 @@ class HueApi(AbstractBaseApi):
 
     log = get_logger(__name__)
 
-    def __init__(self, put_event):
+    def __init__(self, put_event: Callable, request: Callable):
         self.put_event = put_event
+        self.request = request
 
     def register_endpoints(self, register_endpoint: Callable):
         self.log.debug("Registering api endpoints...")
@@ -41,11 +42,11 @@ class HueApi(AbstractBaseApi):
         Endpoint handler to get all connected lamps. Returned info will contain the lamp name as well as the
         light service id.
         :param _args: The args passed to the request.
-        :return: Status code 200, JSON containing all registered lamps
+        :return: Status code 200, JSON containing all registered lamps or 504 if the HueInteractor did not respond
         """
         self.log.info("Received request - getting connected lamps")
-        response_receiver = TemporaryEventReceiver(self.put_event, [HueGetLampsResponseEvent])
-        await response_receiver.start()
-        await self.put_event(HueGetLampsEvent())
-        event: HueGetLampsResponseEvent = await response_receiver.wait_for_event()
+        try:
+            event: HueGetLampsResponseEvent = await self.request(HueGetLampsEvent())
+        except asyncio.TimeoutError:
+            return 504, "Timed out while getting connected lamps!"
         return 200, event.get_lamp_json()
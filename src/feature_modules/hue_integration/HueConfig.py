@@ -1,7 +1,20 @@
+from dataclasses import dataclass
+from typing import ClassVar
+
+from core_modules.storage.config_section_helper import config_field
+
+SECTION_HEADER_HUE = "PHILIPPS_HUE"
+
+FIELD_HUE_BRIDGE_IP = "HUE_BRIDGE_IP"
+FIELD_HUE_CLIENT_KEY = "HUE_CLIENT_KEY"
+
+
+@dataclass(frozen=True, slots=True)
 class HueConfig:
     """
     Configuration object for the philipps hue integration to pass to sub-modules.
     """
-    def __init__(self, bridge_ip: str, client_key: str):
-        self.bridge_ip = bridge_ip
-        self.client_key = client_key
+    SECTION: ClassVar[str] = SECTION_HEADER_HUE
+
+    bridge_ip: str = config_field(FIELD_HUE_BRIDGE_IP)
+    client_key: str = config_field(FIELD_HUE_CLIENT_KEY)
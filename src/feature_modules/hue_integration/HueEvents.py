@@ -4,6 +4,8 @@ File containing all the Events used by the HueInteractor and HueApi
 import json
 
 from core_modules.eventing.BaseEvent import BaseEvent
+from core_modules.eventing.EventPriority import EventPriority
+from core_modules.eventing.ResponseEvent import ResponseEvent
 from core_modules.scheduling.SchedulableEvent import SchedulableEvent, EVENT_ID_DATA_FIELD
 from feature_modules.hue_integration.HueLamp import HueLamp
 
@@ -12,6 +14,7 @@ class HueLampSetStateEvent(BaseEvent, SchedulableEvent):
     """
     Event for changing the on/off state of a specific lamp.
     """
+    priority = EventPriority.High
 
     def __init__(self, lamp_id: str, on: bool):
         self.lamp_id = lamp_id
@@ -39,7 +42,7 @@ class HueGetLampsEvent(BaseEvent):
     """
 
 
-class HueGetLampsResponseEvent(BaseEvent):
+class HueGetLampsResponseEvent(ResponseEvent):
     """
     Response event for listing all lamps and their id
     """
@@ -1,20 +1,18 @@
-from typing import Callable
+from typing import Callable, Optional, Hashable
 
 from core_modules.eventing.BaseEvent import BaseEvent
 from core_modules.eventing.EventReceiver import EventReceiver
 from core_modules.logging.lis_logging import get_logger
 from core_modules.rest.RestServer import REST_METHOD_PUT, REST_METHOD_GET
 from core_modules.rest.SessionManager import SessionManager
+from core_modules.storage.StorageEvents import ConfigChangedEvent
 from core_modules.storage.StorageManager import StorageManager
-from feature_modules.hue_integration.HueConfig import HueConfig
+from feature_modules.hue_integration.HueConfig import HueConfig, SECTION_HEADER_HUE
 from feature_modules.hue_integration.HueEvents import HueGetLampsEvent, HueGetLampsResponseEvent, HueLampSetStateEvent
 from feature_modules.hue_integration.HueLamp import HueLamp
 from feature_modules.hue_integration.HueSSEReceiver import HueSSEReceiver
 
-SECTION_HEADER_HUE = "PHILIPPS_HUE"
-
-FIELD_HUE_BRIDGE_IP = "HUE_BRIDGE_IP"
-FIELD_HUE_CLIENT_KEY = "HUE_CLIENT_KEY"
+HUE_MAX_CONCURRENT_HANDLERS = 4
 
 
 class HueInteractor(EventReceiver):
@@ -25,15 +23,23 @@ class HueInteractor(EventReceiver):
     log = get_logger(__name__)
 
     def __init__(self, put_event: Callable, storage: StorageManager, session_manager: SessionManager):
-        super().__init__()
+        super().__init__(max_concurrent_handlers=HUE_MAX_CONCURRENT_HANDLERS)
         self.put_event = put_event
-        self.hue_config = HueConfig(storage.get(FIELD_HUE_BRIDGE_IP, SECTION_HEADER_HUE),
-                                    storage.get(FIELD_HUE_CLIENT_KEY, SECTION_HEADER_HUE))
+        self.storage = storage
+        self.hue_config = storage.get_section(HueConfig)
         self.session_manager = session_manager
         self.hue_sse_receiver = HueSSEReceiver(put_event, self.hue_config)
 
     def fetch_events_to_register(self) -> list[type[BaseEvent]]:
-        return [HueLampSetStateEvent, HueGetLampsEvent]
+        return [HueLampSetStateEvent, HueGetLampsEvent, ConfigChangedEvent]
+
+    def get_ordering_key(self, event: BaseEvent) -> Optional[Hashable]:
+        """
+        State changes of the same lamp are applied in order, while different lamps are switched concurrently.
+        """
+        if isinstance(event, HueLampSetStateEvent):
+            return event.lamp_id
+        return None
 
     async def handle_specific_event(self, event: BaseEvent):
         self.log.info("Handling " + str(event))
@@ -41,7 +47,10 @@ class HueInteractor(EventReceiver):
             await self.set_state_of_lamp(event.lamp_id, event.on)
         elif isinstance(event, HueGetLampsEvent):
             lamps = await self.get_lamps()
-            await self.put_event(HueGetLampsResponseEvent(lamps))
+            await self.put_event(HueGetLampsResponseEvent(lamps).in_response_to(event))
+        elif isinstance(event, ConfigChangedEvent) and event.section == SECTION_HEADER_HUE:
+            self.hue_config = self.storage.get_section(HueConfig)
+            self.hue_sse_receiver.reconnect(self.hue_config)
 
     async def _send_request(self, method, endpoint, data=None):
         """
@@ -1,11 +1,12 @@
-import asyncio
 import json
 from typing import Callable
 
 import aiohttp
 
+from core_modules.eventing.EventCoalescer import EventCoalescer
+from core_modules.lifecycle.LifecycleManager import get_lifecycle_manager
 from core_modules.logging.lis_logging import get_logger
-from core_modules.rest.RestServerEvents import SSEDataEvent
+from core_modules.rest.RestServerEvents import SSEDataEvent, SSEDataBatchEvent
 from feature_modules.hue_integration.BridgeEvents.HueBridgeBrightnessChangeEvent import HueBridgeBrightnessChangeEvent
 from feature_modules.hue_integration.BridgeEvents.HueBridgeColorChangeEvent import HueBridgeColorChangeEvent
 from feature_modules.hue_integration.BridgeEvents.HueBridgeStateChangeEvent import HueBridgeStateChangeEvent
@@ -25,7 +26,8 @@ SSE_EVENT_ID_BRIGHTNESS_CHANGE = HUE_SSE_EVENT_PREFIX + "/brightness_changed"
 class HueSSEReceiver:
     """
     Class responsible for receiving and filtering SSEs from the Hue-Bridge as well as forwarding them to the outward
-    facing SSE-Stream (-> Frontend)
+    facing SSE-Stream (-> Frontend). Changes arriving in quick succession (e.g. a scene change across many lamps) are
+    coalesced per lamp and change type and forwarded as one batch.
     """
 
     log = get_logger(__name__)
@@ -33,7 +35,19 @@ class HueSSEReceiver:
     def __init__(self, put_event: Callable, hue_config: HueConfig):
         self.put_event = put_event
         self.hue_config = hue_config
-        asyncio.create_task(self.receive_hue_events())
+        self._sse_coalescer = EventCoalescer(put_event, lambda ev: (ev.event, ev.key), SSEDataBatchEvent)
+        self._receive_task = get_lifecycle_manager().create_task(self.receive_hue_events())
+
+    def reconnect(self, hue_config: HueConfig):
+        """
+        Closes the connection to the Hue-Bridge eventstream (if still open) and connects again using the passed
+        hue_config.
+        :param hue_config: The changed configuration to connect with.
+        """
+        self.hue_config = hue_config
+        self.log.info("Reconnecting to the Hue-Bridge eventstream of " + str(self.hue_config.bridge_ip))
+        self._receive_task.cancel()
+        self._receive_task = get_lifecycle_manager().create_task(self.receive_hue_events())
 
     async def _parse_and_forward_hue_event(self, event: dict):
         """
@@ -54,7 +68,7 @@ class HueSSEReceiver:
             ev = HueBridgeBrightnessChangeEvent.from_dict(event)
             event_id = SSE_EVENT_ID_BRIGHTNESS_CHANGE
         if ev is not None:
-            await self.put_event(SSEDataEvent(event_id, ev.to_json()))
+            await self._sse_coalescer.put(SSEDataEvent(event_id, ev.to_json(), ev.id))
         else:
             self.log.warning(f"Received event {str(event)} could not be mapped to known event type")
 
@@ -1,7 +1,6 @@
-import json
+import asyncio
 from typing import Callable
 
-from core_modules.eventing.TemporaryEventReceiver import TemporaryEventReceiver
 from core_modules.logging.lis_logging import get_logger
 from core_modules.rest.AbstractBaseApi import AbstractBaseApi
 from core_modules.rest.RestServer import REST_METHOD_PUT, REST_METHOD_GET
@@ -17,8 +16,9 @@ class SpotifyApi(AbstractBaseApi):
 
     log = get_logger(__name__)
 
-    def __init__(self, put_event):
+    def __init__(self, put_event: Callable, request: Callable):
         self.put_event = put_event
+        self.request = request
 
     def register_endpoints(self, register_endpoint: Callable):
         self.log.debug("Registering api endpoints...")
@@ -70,8 +70,8 @@ class SpotifyApi(AbstractBaseApi):
         :param _args: contains the arguments of the request
         :return: Tuple containing the status_code and the JSON string of the current playback
         """
-        response_receiver = TemporaryEventReceiver(self.put_event, [SpotifyGetCurrentTrackResponseEvent])
-        await response_receiver.start()
-        await self.put_event(SpotifyGetCurrentTrackEvent())
-        event: SpotifyGetCurrentTrackResponseEvent = await response_receiver.wait_for_event()
+        try:
+            event: SpotifyGetCurrentTrackResponseEvent = await self.request(SpotifyGetCurrentTrackEvent())
+        except asyncio.TimeoutError:
+            return 504, "Timed out while getting the current playback!"
         return 200, event.playback_state.to_json()
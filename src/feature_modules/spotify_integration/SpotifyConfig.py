@@ -0,0 +1,23 @@
+from dataclasses import dataclass
+from typing import ClassVar
+
+from core_modules.storage.config_section_helper import config_field
+
+SPOTIFY_STORAGE_SECTION = "SPOTIFY"
+
+ACCESS_TOKEN_FIELD = "ACCESS_TOKEN"
+REFRESH_TOKEN_FIELD = "REFRESH_TOKEN"
+AUTH_CODE_FIELD = "AUTH_CODE"
+
+
+@dataclass(frozen=True, slots=True)
+class SpotifyConfig:
+    """
+    Configuration and tokens of the spotify integration. The access_token is refreshed while LIS is running.
+    """
+    SECTION: ClassVar[str] = SPOTIFY_STORAGE_SECTION
+
+    refresh_token: str = config_field(REFRESH_TOKEN_FIELD)
+    auth_code: str = config_field(AUTH_CODE_FIELD)
+    # obtained with the refresh_token if it is missing or expired
+    access_token: str = config_field(ACCESS_TOKEN_FIELD, "")
@@ -1,7 +1,7 @@
 import asyncio
 from typing import Callable
 
-from core_modules.eventing.TemporaryEventReceiver import TemporaryEventReceiver
+from core_modules.lifecycle.LifecycleManager import get_lifecycle_manager
 from core_modules.logging.lis_logging import get_logger
 from core_modules.rest.RestServerEvents import SSEDataEvent
 from feature_modules.spotify_integration.SpotifyEvents import SpotifyGetCurrentTrackResponseEvent, \
@@ -17,26 +17,28 @@ class SpotifyCurrentPlaybackSSEProvider:
     """
     log = get_logger(__name__)
 
-    def __init__(self, put_event: Callable):
+    def __init__(self, put_event: Callable, request: Callable):
         self.put_event = put_event
+        self.request = request
         self.last_event = None
-        asyncio.create_task(self._spotify_playback_provider_task())
+        get_lifecycle_manager().create_task(self._spotify_playback_provider_task())
 
     async def _spotify_playback_provider_task(self):
         """
         Infinite task that is responsible for periodically query the spotify api for the current playback state and
-        forward it to the LIS eventbus
+        forward it to the LIS eventbus. Queries are sent as requests, so they are coalesced with concurrent
+        /spotify/current api calls.
         """
-        response_receiver = TemporaryEventReceiver(self.put_event, [SpotifyGetCurrentTrackResponseEvent])
-        await response_receiver.start()
         self.log.debug("Started current playback provider task.")
         while True:
-            await self.put_event(SpotifyGetCurrentTrackEvent())
-            event: SpotifyGetCurrentTrackResponseEvent = await response_receiver.wait_for_event(
-                unregister_after_receive=False)
-            self.log.debug(event.playback_state)
-            if event != self.last_event:
-                self.log.debug("Playback differs => forwarding to SSE")
-                await self.put_event(SSEDataEvent(SPOTIFY_CURRENT_SSE_ENDPOINT, event.playback_state.to_json()))
-                self.last_event = event
+            try:
+                event: SpotifyGetCurrentTrackResponseEvent = await self.request(SpotifyGetCurrentTrackEvent())
+            except asyncio.TimeoutError:
+                self.log.warning("Timed out while querying the current playback state - retrying later")
+            else:
+                self.log.debug(event.playback_state)
+                if event != self.last_event:
+                    self.log.debug("Playback differs => forwarding to SSE")
+                    await self.put_event(SSEDataEvent(SPOTIFY_CURRENT_SSE_ENDPOINT, event.playback_state.to_json()))
+                    self.last_event = event
             await asyncio.sleep(SPOTIFY_SECONDS_BETWEEN_PLAYBACK_STATE_QUERIES)
@@ -2,6 +2,8 @@
 This files contains all Events used by the Spotify feature module.
 """
 from core_modules.eventing.BaseEvent import BaseEvent
+from core_modules.eventing.EventPriority import EventPriority
+from core_modules.eventing.ResponseEvent import ResponseEvent
 from core_modules.scheduling.SimpleSchedulableEvent import SimpleSchedulableEvent
 from feature_modules.spotify_integration.SpotifyPlayerState import SpotifyPlayerState
 
@@ -10,28 +12,28 @@ class SpotifyPausePlaybackEvent(BaseEvent, SimpleSchedulableEvent):
     """
     Event to pause the current spotify playback
     """
-    ...
+    priority = EventPriority.High
 
 
 class SpotifyStartResumePlaybackEvent(BaseEvent, SimpleSchedulableEvent):
     """
     Event to start or resume the current spotify playback
     """
-    ...
+    priority = EventPriority.High
 
 
 class SpotifyNextTrackEvent(BaseEvent, SimpleSchedulableEvent):
     """
     Event to switch to the next spotify track
     """
-    ...
+    priority = EventPriority.High
 
 
 class SpotifyPreviousTrackEvent(BaseEvent, SimpleSchedulableEvent):
     """
     Event to switch to the previous spotify track
     """
-    ...
+    priority = EventPriority.High
 
 
 class SpotifyGetCurrentTrackEvent(BaseEvent):
@@ -41,7 +43,7 @@ class SpotifyGetCurrentTrackEvent(BaseEvent):
     ...
 
 
-class SpotifyGetCurrentTrackResponseEvent(BaseEvent):
+class SpotifyGetCurrentTrackResponseEvent(ResponseEvent):
     """
     Event to act as a response to the SpotifyGetCurrentTrackEvent
     """
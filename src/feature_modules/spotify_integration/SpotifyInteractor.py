@@ -1,12 +1,14 @@
-from typing import Callable
-
+import asyncio
+from typing import Callable, Optional, Hashable
 
 from core_modules.eventing.BaseEvent import BaseEvent
 from core_modules.eventing.EventReceiver import EventReceiver
 from core_modules.logging.lis_logging import get_logger
 from core_modules.rest.RestServer import REST_METHOD_PUT, REST_METHOD_GET, REST_METHOD_POST
 from core_modules.rest.SessionManager import SessionManager
-from core_modules.storage.StorageManager import StorageManager
+from core_modules.storage.AsyncStorageManager import AsyncStorageManager
+from feature_modules.spotify_integration.SpotifyConfig import SpotifyConfig, ACCESS_TOKEN_FIELD, \
+    SPOTIFY_STORAGE_SECTION
 from feature_modules.spotify_integration.SpotifyCurrentPlaybackSSEProvider import SpotifyCurrentPlaybackSSEProvider
 from feature_modules.spotify_integration.SpotifyEvents import SpotifyPausePlaybackEvent, \
     SpotifyStartResumePlaybackEvent, SpotifyPreviousTrackEvent, SpotifyNextTrackEvent, SpotifyGetCurrentTrackEvent, \
@@ -18,11 +20,11 @@ WEB_API_BASE_URL = "https://api.spotify.com/v1"
 TOKEN_URL = "https://accounts.spotify.com/api/token"
 PLAYER_BASE_ENDPOINT = "/me/player"
 
-ACCESS_TOKEN_FIELD = "ACCESS_TOKEN"
-SPOTIFY_STORAGE_SECTION = "SPOTIFY"
-
 SPOTIFY_TRACK_NONE = SpotifyTrack("None", "None", "")
 
+SPOTIFY_MAX_CONCURRENT_HANDLERS = 4
+SPOTIFY_PLAYBACK_COMMAND_ORDERING_KEY = "playback_command"
+
 
 class SpotifyInteractor(EventReceiver):
     """
@@ -30,12 +32,15 @@ class SpotifyInteractor(EventReceiver):
     """
     log = get_logger(__name__)
 
-    def __init__(self, put_event: Callable, storage: StorageManager, session_manager: SessionManager):
-        super().__init__()
+    def __init__(self, put_event: Callable, request: Callable, storage: AsyncStorageManager,
+                 session_manager: SessionManager):
+        super().__init__(max_concurrent_handlers=SPOTIFY_MAX_CONCURRENT_HANDLERS)
         self.put_event = put_event
         self.storage = storage
         self.session_manager = session_manager
-        self.current_playback_sse_provider = SpotifyCurrentPlaybackSSEProvider(put_event)
+        # handlers run concurrently, so several of them may notice an expired access token at the same time
+        self._token_refresh_lock = asyncio.Lock()
+        self.current_playback_sse_provider = SpotifyCurrentPlaybackSSEProvider(put_event, request)
 
     def fetch_events_to_register(self) -> list[type[BaseEvent]]:
         return [SpotifyPausePlaybackEvent,
@@ -44,6 +49,16 @@ class SpotifyInteractor(EventReceiver):
                 SpotifyPreviousTrackEvent,
                 SpotifyGetCurrentTrackEvent]
 
+    def get_ordering_key(self, event: BaseEvent) -> Optional[Hashable]:
+        """
+        Playback commands are sent to spotify in the order they arrived, while querying the current track runs
+        independently so a slow query does not delay a command.
+        """
+        if isinstance(event, (SpotifyPausePlaybackEvent, SpotifyStartResumePlaybackEvent, SpotifyNextTrackEvent,
+                              SpotifyPreviousTrackEvent)):
+            return SPOTIFY_PLAYBACK_COMMAND_ORDERING_KEY
+        return None
+
     async def handle_specific_event(self, event: BaseEvent):
         self.log.debug("Received event: " + str(event))
         if isinstance(event, SpotifyPausePlaybackEvent):
@@ -56,14 +71,14 @@ class SpotifyInteractor(EventReceiver):
             await self._prev_track()
         elif isinstance(event, SpotifyGetCurrentTrackEvent):
             playback_state = await self._get_current_track()
-            await self.put_event(SpotifyGetCurrentTrackResponseEvent(playback_state))
+            await self.put_event(SpotifyGetCurrentTrackResponseEvent(playback_state).in_response_to(event))
 
     def _get_bearer_auth_header(self):
         """
         Construct a dictionary containing the auth header for the spotify web api
         :return: The constructed header dictionary
         """
-        return {"Authorization": "Bearer " + self.storage.get(ACCESS_TOKEN_FIELD, SPOTIFY_STORAGE_SECTION, "")}
+        return {"Authorization": "Bearer " + self.storage.get_section(SpotifyConfig).access_token}
 
     async def _start_resume_playback(self):
         """
@@ -121,23 +136,24 @@ class SpotifyInteractor(EventReceiver):
             return SpotifyPlayerState(playback, track)
         return SpotifyPlayerState(SpotifyPlayback.NONE, SPOTIFY_TRACK_NONE)
 
-    async def _refresh_access_token(self):
-        """
-        Method to refresh and update the access_token by sending a request with the refresh_token.
-        """
-        status, response = await self._send_request(REST_METHOD_POST, TOKEN_URL,
-                                                    data={"grant_type": "refresh_token",
-                                                          "refresh_token": self.storage.get(
-                                                              "REFRESH_TOKEN", SPOTIFY_STORAGE_SECTION, "")
-                                                          },
-                                                    headers={
-                                                        "Authorization": "Basic " + self.storage.get(
-                                                            "AUTH_CODE",
-                                                            SPOTIFY_STORAGE_SECTION,
-                                                            ""),
-                                                        "Content-Type": "application/x-www-form-urlencoded"})
-        if status == 200:
-            self.storage.update(response["access_token"], ACCESS_TOKEN_FIELD, SPOTIFY_STORAGE_SECTION)
+    async def _refresh_access_token(self, rejected_access_token: str):
+        """
+        Method to refresh and update the access_token by sending a request with the refresh_token. Only one refresh
+        runs at a time and no refresh is sent if the rejected token was already replaced by another handler.
+        :param rejected_access_token: The access token the spotify api rejected.
+        """
+        async with self._token_refresh_lock:
+            spotify_config = self.storage.get_section(SpotifyConfig)
+            if spotify_config.access_token != rejected_access_token:
+                return
+            status, response = await self._send_request(REST_METHOD_POST, TOKEN_URL,
+                                                        data={"grant_type": "refresh_token",
+                                                              "refresh_token": spotify_config.refresh_token},
+                                                        headers={
+                                                            "Authorization": "Basic " + spotify_config.auth_code,
+                                                            "Content-Type": "application/x-www-form-urlencoded"})
+            if status == 200:
+                await self.storage.update(response["access_token"], ACCESS_TOKEN_FIELD, SPOTIFY_STORAGE_SECTION)
 
     async def _send_request(self, method, url, headers=None, data=None):
         """
@@ -180,8 +196,8 @@ class SpotifyInteractor(EventReceiver):
         if status == 200:
             return status, response
         if status in [400, 401]:  # status codes that may indicate an expired access token
-            await self._refresh_access_token()
-            headers["Authorization"] = "Bearer " + self.storage.get(ACCESS_TOKEN_FIELD, SPOTIFY_STORAGE_SECTION, "")
+            await self._refresh_access_token(headers["Authorization"].removeprefix("Bearer "))
+            headers["Authorization"] = "Bearer " + self.storage.get_section(SpotifyConfig).access_token
             status, response = await self._send_request(method, url, headers, data)
             return status, response
         return 500, None
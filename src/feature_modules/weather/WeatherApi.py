@@ -1,6 +1,6 @@
+import asyncio
 from typing import Callable
 
-from core_modules.eventing.TemporaryEventReceiver import TemporaryEventReceiver
 from core_modules.logging.lis_logging import get_logger
 from core_modules.rest.AbstractBaseApi import AbstractBaseApi
 from core_modules.rest.RestServer import REST_METHOD_GET
@@ -14,8 +14,9 @@ class WeatherApi(AbstractBaseApi):
 
     log = get_logger(__name__)
 
-    def __init__(self, put_event):
+    def __init__(self, put_event: Callable, request: Callable):
         self.put_event = put_event
+        self.request = request
 
     def register_endpoints(self, register_endpoint: Callable):
         self.log.debug("Registering api endpoints...")
@@ -27,8 +28,8 @@ class WeatherApi(AbstractBaseApi):
         :param _args: contains the arguments of the request
         :return: Tuple containing the status_code and response
         """
-        response_receiver = TemporaryEventReceiver(self.put_event, [CurrentWeatherResponseEvent])
-        await response_receiver.start()
-        await self.put_event(GetCurrentWeatherEvent())
-        event: CurrentWeatherResponseEvent = await response_receiver.wait_for_event()
+        try:
+            event: CurrentWeatherResponseEvent = await self.request(GetCurrentWeatherEvent())
+        except asyncio.TimeoutError:
+            return 504, "Timed out while getting the current weather!"
         return 200, event.current_weather.to_json()
@@ -0,0 +1,21 @@
+from dataclasses import dataclass
+from typing import ClassVar
+
+from core_modules.storage.config_section_helper import config_field
+
+WEATHER_STORAGE_SECTION = "WEATHER"
+API_TOKEN_FIELD = "OPEN_WEATHERMAP_API_TOKEN"
+LOC_LONGITUDE_FIELD = "LONGITUDE"
+LOC_LATITUDE_FIELD = "LATITUDE"
+
+
+@dataclass(frozen=True, slots=True)
+class WeatherConfig:
+    """
+    Configuration of the openweathermap integration.
+    """
+    SECTION: ClassVar[str] = WEATHER_STORAGE_SECTION
+
+    api_token: str = config_field(API_TOKEN_FIELD)
+    latitude: float = config_field(LOC_LATITUDE_FIELD)
+    longitude: float = config_field(LOC_LONGITUDE_FIELD)
@@ -1,4 +1,6 @@
 from core_modules.eventing.BaseEvent import BaseEvent
+from core_modules.eventing.EventPriority import EventPriority
+from core_modules.eventing.ResponseEvent import ResponseEvent
 from core_modules.scheduling.SimpleSchedulableEvent import SimpleSchedulableEvent
 from feature_modules.weather.WeatherData import WeatherData
 
@@ -9,7 +11,7 @@ class GetCurrentWeatherEvent(BaseEvent):
     """
 
 
-class CurrentWeatherResponseEvent(BaseEvent):
+class CurrentWeatherResponseEvent(ResponseEvent):
     """
     Response event for the GetCurrentWeatherEvent.
     """
@@ -23,3 +25,4 @@ class RefreshWeatherEvent(BaseEvent, SimpleSchedulableEvent):
     """
     Event to refresh the current WeatherData object.
     """
+    priority = EventPriority.Low
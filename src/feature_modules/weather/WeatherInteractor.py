@@ -1,24 +1,21 @@
-import asyncio
-from typing import Callable
+from typing import Callable, Optional
 
 from core_modules.eventing.BaseEvent import BaseEvent
 from core_modules.eventing.EventReceiver import EventReceiver
+from core_modules.lifecycle.LifecycleManager import get_lifecycle_manager
 from core_modules.logging.lis_logging import get_logger
 from core_modules.rest.RestServerEvents import SSEDataEvent
 from core_modules.rest.SessionManager import SessionManager
 from core_modules.scheduling.EventRepeatPolicy import EventRepeatPolicy
 from core_modules.scheduling.SchedulingEvents import ScheduleEventExecutionEvent
 from core_modules.scheduling.scheduling_helper import get_next_full_hour
+from core_modules.storage.StorageEvents import ConfigChangedEvent
 from core_modules.storage.StorageManager import StorageManager
+from feature_modules.weather.WeatherConfig import WeatherConfig, WEATHER_STORAGE_SECTION
 from feature_modules.weather.WeatherData import WeatherData
 from feature_modules.weather.WeatherEvents import GetCurrentWeatherEvent, CurrentWeatherResponseEvent, \
     RefreshWeatherEvent
 
-WEATHER_STORAGE_SECTION = "WEATHER"
-API_TOKEN_FIELD = "OPEN_WEATHERMAP_API_TOKEN"
-LOC_LONGITUDE_FIELD = "LONGITUDE"
-LOC_LATITUDE_FIELD = "LATITUDE"
-
 BASE_WEATHER_URL = "https://api.openweathermap.org/data/2.5/weather"
 
 
@@ -35,10 +32,13 @@ class WeatherInteractor(EventReceiver):
         self.session_manager = session_manager
 
         self.cur_weather_data = None
-        asyncio.create_task(self._initial_fetch_task())
+        # the query params are only rebuilt when the WeatherConfig they were built from changed
+        self._weather_params_config: Optional[WeatherConfig] = None
+        self._weather_params: dict = {}
+        get_lifecycle_manager().create_task(self._initial_fetch_task())
 
     def fetch_events_to_register(self) -> list[type[BaseEvent]]:
-        return [GetCurrentWeatherEvent, RefreshWeatherEvent]
+        return [GetCurrentWeatherEvent, RefreshWeatherEvent, ConfigChangedEvent]
 
     async def _initial_fetch_task(self):
         """
@@ -53,8 +53,9 @@ class WeatherInteractor(EventReceiver):
         if isinstance(event, GetCurrentWeatherEvent):
             if self.cur_weather_data is None:
                 await self.get_current_weather_data()
-            await self.put_event(CurrentWeatherResponseEvent(self.cur_weather_data))
-        elif isinstance(event, RefreshWeatherEvent):
+            await self.put_event(CurrentWeatherResponseEvent(self.cur_weather_data).in_response_to(event))
+        elif isinstance(event, RefreshWeatherEvent) or \
+                (isinstance(event, ConfigChangedEvent) and event.section == WEATHER_STORAGE_SECTION):
             await self.get_current_weather_data()
             await self.put_event(SSEDataEvent("weather/current", self.cur_weather_data.to_json()))
 
@@ -63,12 +64,16 @@ class WeatherInteractor(EventReceiver):
         Internal method to get the query params for the openweathermap api.
         :return: The dictionary that contains the query params.
         """
-        params = {
-            "lat": str(self.storage.get(LOC_LATITUDE_FIELD, WEATHER_STORAGE_SECTION, "")),
-            "lon": str(self.storage.get(LOC_LONGITUDE_FIELD, WEATHER_STORAGE_SECTION, "")),
-            "appid": str(self.storage.get(API_TOKEN_FIELD, WEATHER_STORAGE_SECTION, "")),
-            "units": "metric"
-        }
+        weather_config = self.storage.get_section(WeatherConfig)
+        if weather_config is not self._weather_params_config:
+            self._weather_params = {
+                "lat": str(weather_config.latitude),
+                "lon": str(weather_config.longitude),
+                "appid": weather_config.api_token,
+                "units": "metric"
+            }
+            self._weather_params_config = weather_config
+        params = self._weather_params
         self.log.debug(f"Querying weather for lat: " + params["lat"] + ", lon: " + params["lon"])
         return params
 